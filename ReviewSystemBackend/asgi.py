@@ -3,6 +3,18 @@ ASGI config for ReviewSystemBackend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Most views are sync DRF views, which an ASGI worker runs one at a time per worker through a single thread, so keep
+serving the app from wsgi.py with threaded workers and run this application next to it only for the async and
+streaming paths:
+
+    gunicorn ReviewSystemBackend.wsgi:application -k gthread --workers 4 --threads 8
+    gunicorn ReviewSystemBackend.asgi:application -k uvicorn.workers.UvicornWorker --workers 2
+
+The reverse proxy sends /api/login/, /api/register/, /api/reset-password/, /api/profile/,
+/api/student/assessment/<id>/timer-stream and /api/teacher/assessment/<id>/progress-stream to the ASGI process and
+everything else to WSGI. The WSGI workers still answer the async views, one thread each, and refuse the event streams
+(api.decorators.asgi_required).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
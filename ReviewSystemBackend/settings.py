@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     "django.middleware.security.SecurityMiddleware",
+    "api.middleware.PerformanceMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -85,9 +86,92 @@ DATABASES = {
         'PASSWORD': os.environ.get('SUPABASE_DB_PASSWORD'),
         'HOST': os.environ.get('SUPABASE_DB_HOST'),
         'PORT': os.environ.get('SUPABASE_DB_PORT'),
+        # Assessment.is_final and Question.difficulty predate the migrations, so tests build their database
+        # from the models
+        'TEST': {'MIGRATE': False},
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Cached content, answer keys, exam sessions and ETags are invalidated by bumping version stamps in the cache
+# (api.utils.cache_versions), so every worker has to share one cache. Defaults to the database cache table
+# (created by migration 0028); set CACHE_BACKEND/CACHE_LOCATION for a faster shared backend such as
+# django.core.cache.backends.redis.RedisCache. The per-process locmem cache is only allowed with DEBUG on.
+
+DATABASE_CACHE_BACKEND = 'django.core.cache.backends.db.DatabaseCache'
+LOCMEM_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', LOCMEM_CACHE_BACKEND if DEBUG else DATABASE_CACHE_BACKEND)
+
+if CACHE_BACKEND == LOCMEM_CACHE_BACKEND and not DEBUG:
+    raise ValueError("CACHE_BACKEND is the per-process locmem cache, which workers cannot share. "
+                     "Use a shared cache backend or turn DEBUG on.")
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION',
+                                   'api_cache' if CACHE_BACKEND == DATABASE_CACHE_BACKEND else 'review-system'),
+    }
+}
+
+if CACHE_BACKEND == LOCMEM_CACHE_BACKEND:
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 5000}
+elif CACHE_BACKEND == DATABASE_CACHE_BACKEND:
+    # The default of 300 entries would keep culling exam payloads, answer keys and session clocks
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 100000}
+
+# Request profiling (api.middleware.PerformanceMiddleware)
+# Share of requests profiled for Server-Timing headers and /api/metrics/; 0 turns profiling off.
+# /api/metrics/ answers 404 unless PERFORMANCE_METRICS_TOKEN is set, then requires it as a Bearer token.
+
+PERFORMANCE_SAMPLE_RATE = float(os.environ.get('PERFORMANCE_SAMPLE_RATE', '0.1'))
+PERFORMANCE_METRICS_TOKEN = os.environ.get('PERFORMANCE_METRICS_TOKEN')
+
+# Logging
+# JSON lines written from a background thread (api.utils.structured_logging.NonBlockingHandler).
+# LOG_LEVEL is the default level, LOG_LEVELS overrides it per module: "api.ai=DEBUG,django.db.backends=DEBUG".
+# ABILITY_TRACE_SAMPLE_RATE logs that share of the per-answer ability updates to the api.ability_trace logger.
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+ABILITY_TRACE_SAMPLE_RATE = float(os.environ.get('ABILITY_TRACE_SAMPLE_RATE', '0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'api.utils.structured_logging.JsonFormatter'},
+    },
+    'filters': {
+        'ability_trace_sample': {
+            '()': 'api.utils.structured_logging.SampleFilter',
+            'rate': ABILITY_TRACE_SAMPLE_RATE,
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'api.utils.structured_logging.NonBlockingHandler',
+            'formatter': 'json',
+        },
+    },
+    'root': {'handlers': ['console'], 'level': LOG_LEVEL},
+    'loggers': {
+        'django': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+        'api': {'level': LOG_LEVEL},
+        'api.ability_trace': {
+            'handlers': ['console'],
+            'filters': ['ability_trace_sample'],
+            'level': 'DEBUG' if ABILITY_TRACE_SAMPLE_RATE > 0 else 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+for _item in filter(None, os.environ.get('LOG_LEVELS', '').split(',')):
+    _name, _, _level = _item.partition('=')
+    LOGGING['loggers'].setdefault(_name.strip(), {})['level'] = _level.strip().upper()
+
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_ANON_KEY = os.environ.get('SUPABASE_ANON_KEY')
 
@@ -1,7 +1,11 @@
 from api.models import AssessmentResult, Answer, Question, User, Assessment, UserAbility, Category
 from scipy.optimize import minimize
 import math
+import logging
 import numpy as np
+from api.utils.structured_logging import ABILITY_TRACE_LOGGER
+
+ability_trace = logging.getLogger(ABILITY_TRACE_LOGGER)
 
 
 def three_pl_probability(theta, difficulty, discrimination, guessing):
@@ -140,7 +144,10 @@ def estimate_ability_elo(user_id):
                 user_ability.elo_ability += round(k * (actual_score - expected_score))
                 new_ability = user_ability.elo_ability
 
-                print(f"Category: {category}, Prev Ability: {prev_ability}, New Ability: {new_ability}")
+                ability_trace.debug('Updated elo ability', extra={
+                    'user_id': user.id, 'category_id': category.id, 'question_id': answer.question_id,
+                    'prev_ability': prev_ability, 'new_ability': new_ability,
+                })
 
             user_ability.save()
 
@@ -184,11 +191,10 @@ def estimate_ability_elo_time(user_id):
 
                 user_ability.elo_time_ability += combined_update
 
-                print(
-                    f"Category: {category}, "
-                    f"Prev Ability: {user_ability.elo_time_ability - combined_update:.2f}, "
-                    f"New Ability: {user_ability.elo_time_ability:.2f}, "
-                    f"Time Impact: {time_score:.2f}"
-                )
+                ability_trace.debug('Updated elo time ability', extra={
+                    'user_id': user.id, 'category_id': category.id, 'question_id': answer.question_id,
+                    'prev_ability': user_ability.elo_time_ability - combined_update,
+                    'new_ability': user_ability.elo_time_ability, 'time_impact': time_score,
+                })
 
             user_ability.save()
@@ -8,9 +8,14 @@ from api.models import RLAgentState, Question, AssessmentResult, User, Category
 import random
 import os
 import math
+import logging
+from api.utils.structured_logging import ABILITY_TRACE_LOGGER
 
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 
+logger = logging.getLogger(__name__)
+ability_trace = logging.getLogger(ABILITY_TRACE_LOGGER)
+
 
 class DQNAgent:
     _instance = None
@@ -45,7 +50,7 @@ class DQNAgent:
         return model
 
     def save_state_to_db(self):
-        print('Saving model to db')
+        logger.debug('Saving model to db')
         model_weights = pickle.dumps(self.model.get_weights())
         state = self.state.tolist()
         memory = pickle.dumps(list(self.memory))  # Convert deque to list first
@@ -60,7 +65,7 @@ class DQNAgent:
         )
 
     def load_state_from_db(self):
-        print('Loading model from db')
+        logger.debug('Loading model from db')
         try:
             agent_state = RLAgentState.objects.get(pk=1)
             self.state = np.array(agent_state.state)
@@ -171,8 +176,11 @@ def update_rl_model(rl_agent, assessment_id, user, batch_size=32):
         total_reward += reward
 
         # Update UserAbility's Elo rating
-        print('Update user elo rating');
         user_ability.elo_ability = round(user_elo + reward)
+        ability_trace.debug('Updated elo rating', extra={
+            'user_id': user_ability.user_id, 'category_id': category_id, 'question_id': question.id,
+            'prev_ability': user_elo, 'new_ability': user_ability.elo_ability, 'reward': reward,
+        })
         user_ability.save()  # Save immediately
 
         # Build RL state
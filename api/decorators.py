@@ -1,12 +1,33 @@
 from functools import wraps
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from django.http import JsonResponse
 from rest_framework.response import Response
 from rest_framework import status
-from api.utils.supabase_client import get_supabase_client
+from api.utils.supabase_client import get_supabase_client, async_supabase_client
 from api.models import User
-from django.shortcuts import get_object_or_404
+from django.shortcuts import get_object_or_404, aget_object_or_404
 from gotrue.errors import AuthApiError
 
 
+def set_auth_cookies(response, access_token, refresh_token):
+    response.set_cookie(
+        key='access_token',
+        value=access_token,
+        httponly=True,
+        secure=True,
+        samesite='None',
+    )
+    response.set_cookie(
+        key='refresh_token',
+        value=refresh_token,
+        httponly=True,
+        secure=True,
+        samesite='None',
+        max_age=2592000,
+    )
+
+
 def auth_required(*allowed_roles):
     def decorator(view_func):
         @wraps(view_func)
@@ -58,22 +79,7 @@ def auth_required(*allowed_roles):
 
                         request.user = user
                         response = view_func(request, *args, **kwargs)
-
-                        response.set_cookie(
-                            key='access_token',
-                            value=new_access_token,
-                            httponly=True,
-                            secure=True,
-                            samesite='None',
-                        )
-                        response.set_cookie(
-                            key='refresh_token',
-                            value=new_refresh_token,
-                            httponly=True,
-                            secure=True,
-                            samesite='None',
-                            max_age=2592000,
-                        )
+                        set_auth_cookies(response, new_access_token, new_refresh_token)
                         return response
                     except AuthApiError as e:
                         return Response({'error': 'Invalid refresh token'},
@@ -88,3 +94,170 @@ def auth_required(*allowed_roles):
         return wrapped_view
 
     return decorator
+
+
+def async_auth_required(*allowed_roles):
+    """
+    ``auth_required`` for async views: Supabase is awaited through the async client, so the worker serves other
+    requests meanwhile. DRF's ``api_view`` is sync only, so the views are plain Django views answering JsonResponse.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapped_view(request, *args, **kwargs):
+            token = request.COOKIES.get('access_token')
+            refresh_token = request.COOKIES.get('refresh_token')
+
+            if not token and not refresh_token:
+                return JsonResponse({'error': 'Authentication required. Please log in again'},
+                                    status=status.HTTP_401_UNAUTHORIZED)
+
+            async with async_supabase_client() as supabase_client:
+                try:
+                    if token:
+                        try:
+                            user_data = await supabase_client.auth.get_user(jwt=token)
+
+                            if user_data and user_data.user:
+                                user = await aget_object_or_404(User, supabase_user_id=user_data.user.id)
+
+                                if allowed_roles and user.role not in allowed_roles:
+                                    return JsonResponse({"error": "You are not allowed to access this resource"},
+                                                        status=status.HTTP_403_FORBIDDEN)
+
+                                request.user = user
+                                return await view_func(request, *args, **kwargs)
+                        except AuthApiError:
+                            if not refresh_token:
+                                raise
+
+                    if refresh_token:
+                        try:
+                            new_session = await supabase_client.auth.refresh_session(refresh_token=refresh_token)
+
+                            if not new_session or not new_session.session:
+                                return JsonResponse({'error': 'Session refresh failed'},
+                                                    status=status.HTTP_401_UNAUTHORIZED)
+
+                            new_access_token = new_session.session.access_token
+                            user_data = await supabase_client.auth.get_user(jwt=new_access_token)
+                            user = await aget_object_or_404(User, supabase_user_id=user_data.user.id)
+
+                            if allowed_roles and user.role not in allowed_roles:
+                                return JsonResponse({"error": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
+
+                            request.user = user
+                            response = await view_func(request, *args, **kwargs)
+                            set_auth_cookies(response, new_access_token, new_session.session.refresh_token)
+                            return response
+                        except AuthApiError:
+                            return JsonResponse({'error': 'Invalid refresh token'},
+                                                status=status.HTTP_401_UNAUTHORIZED)
+
+                    return JsonResponse({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+
+                except Exception as e:
+                    return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return wrapped_view
+
+    return decorator
+
+
+def conditional_get(etag_func):
+    """
+    Answer GET requests with 304 Not Modified, without running the view, while the client's
+    If-None-Match still matches ``etag_func``. Apply it below ``auth_required`` so ``request.user`` is set.
+    """
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func)(view_func)
+
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return wrapped_view
+
+    return decorator
+
+
+def rate_limit(limiter, record=True, error=None, status_code=None):
+    """
+    Reject the request with the limiter's error while it does not allow ``request.user`` through, and count a
+    successful response against the limit when ``record`` is set and the limiter keeps its own count (a
+    ``Cooldown``; an ``AttemptLimit`` counts the rows the view creates). Apply it below ``auth_required``.
+    """
+    record_use = getattr(limiter, 'record', None) if record else None
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            if not limiter.allows(request.user, **kwargs):
+                return Response({'error': error or limiter.error}, status=status_code or limiter.status_code)
+
+            response = view_func(request, *args, **kwargs)
+
+            if record_use and status.is_success(response.status_code):
+                record_use(request.user, **kwargs)
+
+            return response
+
+        return wrapped_view
+
+    return decorator
+
+
+def asgi_required(view_func):
+    """
+    Answer 501 Not Implemented unless the request came through the ASGI application. A WSGI worker would hold a
+    thread for the whole response and may buffer it, so streaming views go below ``api_view`` with this.
+    """
+
+    @wraps(view_func)
+    def wrapped_view(request, *args, **kwargs):
+        # Only ASGIRequest carries the ASGI scope
+        if getattr(request, 'scope', None) is None:
+            return Response({'error': 'Event streams are only served by the ASGI application. Poll instead.'},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        return view_func(request, *args, **kwargs)
+
+    return wrapped_view
+
+
+def rollup_mode_required(modes, default='latest'):
+    """
+    Pass the ``mode`` query parameter (``default`` when absent) to the view, answering 400 when it is not one
+    of ``modes``. Apply it below ``auth_required``.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            mode = request.query_params.get('mode', default)
+
+            if mode not in modes:
+                return Response({'error': f"Mode must be one of: {', '.join(modes)}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            return view_func(request, *args, mode=mode, **kwargs)
+
+        return wrapped_view
+
+    return decorator
+
+
+def performance_sample_rate(sample_rate):
+    """
+    Profile this view on ``sample_rate`` of its requests instead of ``PERFORMANCE_SAMPLE_RATE`` (0 never profiles
+    it). The middleware reads the rate from the outermost view, so apply it above ``api_view``.
+    """
+
+    def decorator(view_func):
+        view_func.performance_sample_rate = sample_rate
+        return view_func
+
+    return decorator
@@ -0,0 +1,36 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from api.models import ExamBlueprint
+from api.utils.exam_assembler import assemble_for_class, get_item_bank, item_information
+
+
+class Command(BaseCommand):
+    help = 'Assembles parallel exam forms from a blueprint and reports their size and information at the target ability'
+
+    def add_arguments(self, parser):
+        parser.add_argument('blueprint_id', type=int)
+        parser.add_argument('--forms', type=int, default=2)
+        parser.add_argument('--class-id', type=int, help='Skip questions this class has already seen')
+        parser.add_argument('--show-ids', action='store_true')
+
+    def handle(self, *args, **options):
+        blueprint = ExamBlueprint.objects.filter(id=options['blueprint_id']).first()
+
+        if not blueprint:
+            raise CommandError('Blueprint not found')
+
+        start = time.perf_counter()
+        forms = assemble_for_class(blueprint, options['class_id'], options['forms'])
+        elapsed = time.perf_counter() - start
+
+        bank = get_item_bank()
+        information = dict(zip(bank['ids'], item_information(bank, blueprint.target_ability)))
+
+        self.stdout.write(f'Assembled {len(forms)} forms from {len(bank["ids"])} items in {elapsed * 1000:.1f} ms')
+
+        for number, question_ids in enumerate(forms, start=1):
+            total_information = sum(information[question_id] for question_id in question_ids)
+            self.stdout.write(f'Form {number}: {len(question_ids)} items, information {total_information:.2f}')
+
+            if options['show_ids']:
+                self.stdout.write(', '.join(question_ids))
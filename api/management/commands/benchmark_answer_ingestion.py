@@ -0,0 +1,98 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from api.models import Answer, Assessment, AssessmentResult, Question, User
+from api.utils.answer_ingestion import ingest_answers
+
+
+def legacy_ingest(result, answers):
+    """The per-question load, split and bulk_update/bulk_create path the submit views used before."""
+    question_ids = [answer_data.get('question_id') for answer_data in answers]
+    questions = Question.objects.in_bulk(question_ids)
+    existing_answers = {
+        answer.question_id: answer
+        for answer in Answer.objects.filter(assessment_result=result, question_id__in=question_ids)
+    }
+
+    score = 0
+    new_answers = []
+    updated_answers = []
+
+    for answer_data in answers:
+        question = questions.get(answer_data.get('question_id'))
+        if not question:
+            continue
+
+        chosen_answer = answer_data.get('answer') or ''
+        is_correct = chosen_answer == question.choices.get(question.correct_answer)
+        score += is_correct
+
+        answer = existing_answers.get(question.id)
+        if answer:
+            answer.chosen_answer = chosen_answer
+            answer.time_spent = answer_data.get('time_spent', 0)
+            answer.is_correct = is_correct
+            updated_answers.append(answer)
+        else:
+            new_answers.append(Answer(
+                assessment_result=result,
+                question=question,
+                chosen_answer=chosen_answer,
+                time_spent=answer_data.get('time_spent', 0),
+                is_correct=is_correct,
+            ))
+
+    if updated_answers:
+        Answer.objects.bulk_update(updated_answers, ['chosen_answer', 'time_spent', 'is_correct'])
+    if new_answers:
+        Answer.objects.bulk_create(new_answers)
+
+    return score
+
+
+class Command(BaseCommand):
+    help = 'Times answer ingestion against the legacy submit path on a throwaway result (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--assessment-id', type=int, help='Assessment to benchmark (defaults to the first initial exam)')
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if options['assessment_id']:
+            assessment = Assessment.objects.filter(id=options['assessment_id']).first()
+        else:
+            assessment = Assessment.objects.filter(is_initial=True).order_by('id').first()
+
+        if not assessment:
+            raise CommandError('No assessment to benchmark')
+
+        user = User.objects.filter(role=User.STUDENT).first()
+        if not user:
+            raise CommandError('No student to attribute the benchmark result to')
+
+        question_ids = list(assessment.get_questions().values_list('id', flat=True))
+        answers = [
+            {'question_id': question_id, 'answer': 'benchmark', 'time_spent': 1}
+            for question_id in question_ids
+        ]
+
+        self.stdout.write(f'Assessment {assessment.id}: {len(answers)} answers x {options["iterations"]} iterations')
+
+        for name, ingest in (('legacy', legacy_ingest), ('upsert', ingest_answers)):
+            with transaction.atomic():
+                result = AssessmentResult.objects.create(assessment=assessment, user=user)
+
+                elapsed = 0
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(options['iterations']):
+                        start = time.perf_counter()
+                        ingest(result, answers)
+                        elapsed += time.perf_counter() - start
+
+                transaction.set_rollback(True)
+
+            self.stdout.write(
+                f'{name}: {elapsed * 1000 / options["iterations"]:.2f} ms/iteration, '
+                f'{len(queries) / options["iterations"]:.1f} queries/iteration'
+            )
@@ -0,0 +1,455 @@
+import json
+import math
+import os
+import re
+import statistics
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from api.models import Assessment, AssessmentResult, Chapter, Lesson, User
+from api.urls import general_urls, student_urls, teacher_urls
+from api.utils.answer_ingestion import ingest_answers
+from api.utils.answer_key import get_answer_key
+from api.utils.assessment_factory import create_assessment_with_questions
+from api.utils.exam_sessions import get_expires_at
+from api.utils.question_sampler import get_question_pools
+from api.utils.util import generate_question_seed
+from api.management.commands.generate_load_data import LOAD_TEST_DOMAIN
+
+# Every request is rolled back, which would also roll back writes to the database cache and keep it cold. The
+# benchmark runs in one process, so a locmem cache stands in for the shared one.
+BENCHMARK_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'}}
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), 'endpoint_budgets.json')
+URL_MODULES = (('', general_urls), ('student/', student_urls), ('teacher/', teacher_urls))
+
+# Endpoints that talk to Supabase Auth directly rather than through auth_required
+SKIPPED_ROUTES = {
+    'register/': 'calls Supabase Auth directly',
+    'register-teacher/': 'calls Supabase Auth directly',
+    'login/': 'calls Supabase Auth directly',
+    'update-password/<str:access_token>/': 'calls Supabase Auth directly',
+    'reset-password/': 'calls Supabase Auth directly',
+}
+
+
+class QueryStats:
+    """``connection.execute_wrapper`` hook counting statements and the rows they return."""
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        self.queries += 1
+
+        cursor = context['cursor']
+        if cursor.description is not None and cursor.rowcount > 0:
+            self.rows += cursor.rowcount
+
+        return result
+
+
+class BenchmarkAuth:
+    """Stands in for the Supabase client so ``auth_required`` resolves the token to the benchmark user."""
+
+    def __init__(self):
+        self.user = None
+
+    def get_user(self, jwt=None):
+        return SimpleNamespace(user=SimpleNamespace(id=self.user.supabase_user_id))
+
+
+class AsyncBenchmarkAuth:
+    """``BenchmarkAuth`` for the async client awaited by ``async_auth_required``."""
+
+    def __init__(self, auth):
+        self.auth = auth
+
+    async def get_user(self, jwt=None):
+        return self.auth.get_user(jwt)
+
+
+def _answers(question_ids, answer_key):
+    return [
+        {'question_id': question_id, 'answer': answer_key[question_id]['answer'], 'time_spent': 5}
+        for question_id in question_ids
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Requests every student, teacher and general endpoint against generated load test data with a stubbed '
+            'auth_required, recording wall time, query counts and rows fetched against the committed budgets')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='generate_load_data seed to benchmark against')
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--only', help='Only endpoints whose route contains this text')
+        parser.add_argument('--budgets', default=BUDGETS_PATH)
+        parser.add_argument('--output', help='Write the measurements as JSON to this file')
+        parser.add_argument('--write-budgets', action='store_true',
+                            help='Record the current query and row counts (and 3x the time) as the new budgets')
+        parser.add_argument('--strict', action='store_true', help='Exit with an error if an endpoint is over budget')
+
+    def handle(self, *args, **options):
+        if not User.objects.filter(email__endswith=f"-{options['seed']}@{LOAD_TEST_DOMAIN}").exists():
+            call_command('generate_load_data', seed=options['seed'], final=True, quizzes=1, stdout=self.stdout)
+
+        with open(options['budgets']) as file:
+            budgets = json.load(file)
+
+        auth = BenchmarkAuth()
+        report = {'seed': options['seed'], 'iterations': options['iterations'], 'endpoints': {}, 'skipped': {}}
+
+        @asynccontextmanager
+        async def async_client():
+            yield SimpleNamespace(auth=AsyncBenchmarkAuth(auth))
+
+        with mock.patch('api.decorators.get_supabase_client', lambda: SimpleNamespace(auth=auth)), \
+                mock.patch('api.decorators.async_supabase_client', async_client), \
+                override_settings(CACHES=BENCHMARK_CACHES):
+            # Any worker that has served an exam holds the question pools, so load them before measuring
+            get_question_pools()
+
+            with transaction.atomic():
+                fixtures = self.build_fixtures(options['seed'])
+                scenarios = self.scenarios(fixtures)
+
+                for route in self.routes():
+                    if options['only'] and options['only'] not in route:
+                        continue
+
+                    if route in SKIPPED_ROUTES or route not in scenarios:
+                        report['skipped'][route] = SKIPPED_ROUTES.get(route, 'no fixture data for this endpoint')
+                        continue
+
+                    user, method, kwargs, data = scenarios[route]
+                    auth.user = user
+                    measurement = self.measure(route, method, kwargs, data, options['iterations'])
+                    report['endpoints'][route] = self.check(measurement, budgets.get(route))
+                    self.write_line(route, report['endpoints'][route])
+
+                # Nothing the requests or the fixtures wrote is kept
+                transaction.set_rollback(True)
+
+        over_budget = [route for route, measurement in report['endpoints'].items() if measurement['over_budget']]
+        self.stdout.write(f"{len(report['endpoints'])} endpoints measured, {len(report['skipped'])} skipped, "
+                          f"{len(over_budget)} over budget")
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2, default=str)
+
+        if options['write_budgets']:
+            self.write_budgets(options['budgets'], budgets, report['endpoints'])
+
+        if over_budget and options['strict']:
+            raise CommandError(f'Over budget: {", ".join(over_budget)}')
+
+    def routes(self):
+        for prefix, module in URL_MODULES:
+            for pattern in module.urlpatterns:
+                yield prefix + str(pattern.pattern)
+
+    def build_fixtures(self, seed):
+        """Users, exams and sessions every scenario needs, created inside the benchmark's rolled-back transaction."""
+        student = User.objects.filter(
+            email__endswith=f'-{seed}@{LOAD_TEST_DOMAIN}', role=User.STUDENT
+        ).exclude(enrolled_class=None).order_by('id').first()
+        if student is None:
+            raise CommandError(f'No load test students for seed {seed}')
+
+        class_obj = student.enrolled_class
+        teacher = class_obj.teacher
+        now = timezone.now()
+
+        # Reopen the class's exams so the take/submit endpoints run their normal path
+        Assessment.objects.filter(class_owner=class_obj).update(deadline=now + timedelta(days=1))
+        initial_exam = Assessment.objects.get(class_owner=class_obj, is_initial=True)
+        final_exam = Assessment.objects.filter(class_owner=class_obj, is_final=True).first()
+        exam_key = get_answer_key(initial_exam.id)
+        exam_question_ids = sorted(exam_key)
+
+        newcomer = User.objects.create(
+            supabase_user_id=f'benchmark-newcomer-{seed}',
+            email=f'benchmark-newcomer-{seed}@{LOAD_TEST_DOMAIN}',
+            first_name='Newcomer',
+            last_name='Benchmark',
+            role=User.STUDENT,
+            enrolled_class=class_obj,
+        )
+        outsider = User.objects.create(
+            supabase_user_id=f'benchmark-outsider-{seed}',
+            email=f'benchmark-outsider-{seed}@{LOAD_TEST_DOMAIN}',
+            first_name='Outsider',
+            last_name='Benchmark',
+            role=User.STUDENT,
+        )
+        AssessmentResult.objects.create(
+            assessment=initial_exam,
+            user=newcomer,
+            start_time=now,
+            expires_at=get_expires_at(initial_exam, now),
+            question_seed=generate_question_seed(),
+        )
+
+        teacher_quiz, _ = create_assessment_with_questions(
+            exam_question_ids[:10],
+            name='Benchmark Quiz',
+            class_owner=class_obj,
+            created_by=teacher,
+            type='quiz',
+            source='teacher_generated',
+            deadline=now + timedelta(days=1),
+        )
+        quiz_key = get_answer_key(teacher_quiz.id)
+        quiz_result = AssessmentResult.objects.create(
+            assessment=teacher_quiz,
+            user=student,
+            status=AssessmentResult.SUBMITTED,
+            is_submitted=True,
+        )
+        quiz_result.score = ingest_answers(quiz_result, _answers(sorted(quiz_key), quiz_key), quiz_key)
+        quiz_result.save(update_fields=['score'])
+
+        practice_quiz, _ = create_assessment_with_questions(
+            exam_question_ids[10:20],
+            name='Benchmark Practice Quiz',
+            created_by=newcomer,
+            type='quiz',
+            source='student_initiated',
+            time_limit=600,
+            start_for=newcomer,
+        )
+
+        lesson = Lesson.objects.filter(chapters__sections__isnull=False).order_by('id').first()
+        chapter = Chapter.objects.filter(lesson=lesson, sections__isnull=False).order_by('number').first()
+
+        return SimpleNamespace(
+            student=student,
+            newcomer=newcomer,
+            outsider=outsider,
+            teacher=teacher,
+            class_obj=class_obj,
+            initial_exam=initial_exam,
+            final_exam=final_exam,
+            exam_answers=_answers(exam_question_ids[:10], exam_key),
+            teacher_quiz=teacher_quiz,
+            quiz_answers=_answers(sorted(quiz_key), quiz_key),
+            practice_quiz=practice_quiz,
+            practice_answers=_answers(exam_question_ids[10:20], get_answer_key(practice_quiz.id)),
+            practice_result=AssessmentResult.objects.filter(user=student, assessment__type='quiz',
+                                                            assessment__source='student_initiated').first(),
+            lesson=lesson,
+            chapter=chapter,
+            section=chapter.sections.first() if chapter else None,
+        )
+
+    def scenarios(self, f):
+        """``{route: (user, method, url kwargs, request data)}`` for every endpoint the fixtures can exercise."""
+        # The outsider has no quiz history, so the practice quiz cooldown does not short-circuit its requests
+        student, newcomer, outsider, teacher = f.student, f.newcomer, f.outsider, f.teacher
+        class_id, initial_id, quiz_id = f.class_obj.id, f.initial_exam.id, f.teacher_quiz.id
+        deadline = (timezone.now() + timedelta(days=2)).isoformat()
+        category_ids = list(f.initial_exam.selected_categories.values_list('id', flat=True))
+
+        scenarios = {
+            'logout/': (student, 'get', {}, None),
+            'auth-user/': (student, 'get', {}, None),
+            'profile/': (student, 'get', {}, None),
+
+            'student/joined-class': (student, 'get', {}, None),
+            'student/class': (student, 'get', {}, None),
+            'student/class/join': (outsider, 'post', {}, {'class_code': f.class_obj.class_code}),
+            'student/initial-exam': (student, 'get', {}, None),
+            'student/take-initial-exam': (newcomer, 'get', {}, None),
+            'student/initial-exam-taken': (student, 'get', {}, None),
+            'student/assessment/<int:assessment_id>/save-progress':
+                (newcomer, 'post', {'assessment_id': initial_id}, {'answers': f.exam_answers}),
+            'student/assessment/<int:assessment_id>/time-limit': (newcomer, 'get', {'assessment_id': initial_id}, None),
+            'student/assessment/<int:assessment_id>/heartbeat': (newcomer, 'get', {'assessment_id': initial_id}, None),
+            'student/assessment/<int:assessment_id>/timer-stream':
+                (newcomer, 'get', {'assessment_id': initial_id}, None),
+            'student/assessment/<int:assessment_id>/limit': (student, 'get', {'assessment_id': quiz_id}, None),
+            'student/assessment/<int:assessment_id>/take': (newcomer, 'get', {'assessment_id': quiz_id}, None),
+            'student/assessment/<int:assessment_id>/class-results': (student, 'get', {'assessment_id': quiz_id}, None),
+            'student/assessment/<int:assessment_id>/class-submit':
+                (newcomer, 'post', {'assessment_id': quiz_id}, {'answers': f.quiz_answers}),
+            'student/exam/take': (student, 'get', {}, None),
+            'student/exam/<int:assessment_id>/submit':
+                (newcomer, 'post', {'assessment_id': initial_id}, {'answers': f.exam_answers}),
+            'student/exam/<int:assessment_id>': (student, 'get', {'assessment_id': initial_id}, None),
+            'student/ability': (student, 'get', {}, None),
+            'student/history': (student, 'get', {}, None),
+            'student/quiz/take': (outsider, 'post', {}, {
+                'selected_categories': category_ids,
+                'no_of_questions': 10,
+                'question_source': 'previous_exam',
+            }),
+            'student/quiz/<int:assessment_id>/submit':
+                (newcomer, 'post', {'assessment_id': f.practice_quiz.id}, {'answers': f.practice_answers}),
+            'student/class/assessments': (student, 'get', {}, None),
+            'student/dashboard': (student, 'get', {}, None),
+            'student/final-exam': (student, 'get', {}, None),
+            'student/final-exam-taken': (student, 'get', {}, None),
+
+            'teacher/classes': (teacher, 'get', {}, None),
+            'teacher/class/create': (teacher, 'post', {}, {'class_name': 'Benchmark Class'}),
+            'teacher/class/student/<int:student_id>': (teacher, 'get', {'student_id': student.id}, None),
+            'teacher/class/<int:class_id>/create-assessment': (teacher, 'post', {'class_id': class_id}, {
+                'question_source': 'previous_exam',
+                'questions': [answer['question_id'] for answer in f.exam_answers],
+                'name': 'Benchmark Created Quiz',
+                'deadline': deadline,
+            }),
+            'teacher/class/<int:class_id>/view-initial-exam': (teacher, 'get', {'class_id': class_id}, None),
+            'teacher/class/<int:class_id>/open-initial-exam':
+                (teacher, 'post', {'class_id': class_id}, {'deadline': deadline}),
+            'teacher/class/<int:class_id>/assessments': (teacher, 'get', {'class_id': class_id}, None),
+            'teacher/class/<int:class_id>/quiz-results': (teacher, 'get', {'class_id': class_id}, None),
+            'teacher/class/<int:class_id>/create-initial-exam': (teacher, 'get', {'class_id': class_id}, None),
+            'teacher/class/<int:class_id>/estimate-students-ability': (teacher, 'get', {'class_id': class_id}, None),
+            'teacher/class/<int:class_id>': (teacher, 'get', {'class_id': class_id}, None),
+            'teacher/get_questions': (teacher, 'get', {}, None),
+            'teacher/assessment/<int:assessment_id>/results-students':
+                (teacher, 'get', {'assessment_id': initial_id}, None),
+            'teacher/assessment/<int:assessment_id>/results-questions':
+                (teacher, 'get', {'assessment_id': initial_id}, None),
+            'teacher/assessment/<int:assessment_id>/progress-stream':
+                (teacher, 'get', {'assessment_id': initial_id}, None),
+            'teacher/assessment/<int:assessment_id>/update':
+                (teacher, 'post', {'assessment_id': quiz_id}, {'deadline': deadline}),
+            'teacher/assessment/<int:assessment_id>/delete': (teacher, 'post', {'assessment_id': quiz_id}, None),
+            'teacher/assessment/<int:assessment_id>': (teacher, 'get', {'assessment_id': initial_id}, None),
+            'teacher/lessons/': (teacher, 'get', {}, None),
+            'teacher/class/<int:class_id>/create-final-exam': (teacher, 'get', {'class_id': class_id}, None),
+        }
+
+        if f.final_exam:
+            scenarios['student/take-final-exam'] = (newcomer, 'get', {}, None)
+
+        if f.practice_result:
+            scenarios['student/quiz/<int:assessment_id>'] = (
+                student, 'get', {'assessment_id': f.practice_result.assessment_id}, None
+            )
+
+        if f.lesson:
+            lesson_id, chapter_id = f.lesson.id, f.chapter.id
+            scenarios.update({
+                'student/lesson/<int:lesson_id>/chapter/<int:chapter_id>':
+                    (student, 'get', {'lesson_id': lesson_id, 'chapter_id': chapter_id}, None),
+                'student/lesson/<int:lesson_id>/update-progress': (student, 'post', {'lesson_id': lesson_id}, {
+                    'chapter_id': f.chapter.number,
+                    'section_id': f.section.id,
+                }),
+                'student/lesson/<int:lesson_id>': (student, 'get', {'lesson_id': lesson_id}, None),
+                'student/take-lesson-assessment/<int:lesson_id>': (outsider, 'get', {'lesson_id': lesson_id}, None),
+                'student/take-chapter-assessment/<int:chapter_id>':
+                    (newcomer, 'get', {'chapter_id': chapter_id}, None),
+                'teacher/class/<int:class_id>/lesson/<int:lesson_id>/results':
+                    (teacher, 'get', {'class_id': class_id, 'lesson_id': lesson_id}, None),
+                'teacher/class/<int:class_id>/chapter/<int:chapter_id>/results':
+                    (teacher, 'get', {'class_id': class_id, 'chapter_id': chapter_id}, None),
+                'teacher/lesson/<int:lesson_id>/chapter/<int:chapter_id>':
+                    (teacher, 'get', {'lesson_id': lesson_id, 'chapter_id': chapter_id}, None),
+                'teacher/lesson/<int:lesson_id>': (teacher, 'get', {'lesson_id': lesson_id}, None),
+            })
+
+        return scenarios
+
+    def measure(self, route, method, kwargs, data, iterations):
+        """Request an endpoint ``iterations`` times, each in a savepoint that is rolled back afterwards."""
+        path = '/api/' + re.sub(r'<(?:\w+:)?(\w+)>', lambda match: str(kwargs[match.group(1)]), route)
+        match = resolve(path)
+        view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+        factory = APIRequestFactory()
+
+        runs = []
+        for _ in range(iterations):
+            request = getattr(factory, method)(path, data, format='json')
+            request.COOKIES['access_token'] = 'benchmark'
+            # Serve the event streams as the ASGI application would instead of rejecting them under WSGI
+            request.scope = {'type': 'http'}
+            stats = QueryStats()
+
+            savepoint = transaction.savepoint()
+            try:
+                with connection.execute_wrapper(stats):
+                    start = time.perf_counter()
+                    response = view(request, *match.args, **match.kwargs)
+                    if hasattr(response, 'render'):
+                        response.render()
+                    elapsed = (time.perf_counter() - start) * 1000
+                status_code = response.status_code
+            except Exception as error:
+                elapsed = (time.perf_counter() - start) * 1000
+                status_code = f'{type(error).__name__}: {error}'
+            finally:
+                transaction.savepoint_rollback(savepoint)
+
+            runs.append((status_code, stats.queries, stats.rows, elapsed))
+
+        times = [run[3] for run in runs]
+        return {
+            'method': method.upper(),
+            'path': path,
+            'status': runs[0][0],
+            # Later iterations can take a cheaper path (cached payloads, rate limits), so the worst run counts
+            'queries': max(run[1] for run in runs),
+            'rows': max(run[2] for run in runs),
+            'ms_median': round(statistics.median(times), 2),
+            'ms_max': round(max(times), 2),
+        }
+
+    def check(self, measurement, budget):
+        measurement['budget'] = budget
+        measurement['over_budget'] = [
+            metric for metric, value in (
+                ('queries', measurement['queries']),
+                ('rows', measurement['rows']),
+                ('ms', measurement['ms_median']),
+            )
+            if budget and metric in budget and value > budget[metric]
+        ]
+        return measurement
+
+    def write_line(self, route, measurement):
+        line = (f"{measurement['method']:4} {route}: {measurement['status']}, {measurement['queries']} queries, "
+                f"{measurement['rows']} rows, {measurement['ms_median']} ms")
+
+        if measurement['over_budget']:
+            self.stdout.write(self.style.ERROR(f"{line} (over budget: {', '.join(measurement['over_budget'])})"))
+        elif measurement['budget'] is None:
+            self.stdout.write(self.style.WARNING(f'{line} (no budget)'))
+        else:
+            self.stdout.write(line)
+
+    def write_budgets(self, path, budgets, endpoints):
+        written = 0
+        for route, measurement in endpoints.items():
+            if not isinstance(measurement['status'], int) or measurement['status'] >= 500:
+                self.stdout.write(self.style.WARNING(f"Not budgeting {route}, it failed with {measurement['status']}"))
+                continue
+
+            written += 1
+            budgets[route] = {
+                'queries': measurement['queries'],
+                'rows': measurement['rows'],
+                'ms': max(50, int(math.ceil(measurement['ms_median'] * 3 / 10)) * 10),
+            }
+
+        with open(path, 'w') as file:
+            json.dump(dict(sorted(budgets.items())), file, indent=2)
+            file.write('\n')
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} budgets to {path}'))
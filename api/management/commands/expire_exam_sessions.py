@@ -0,0 +1,48 @@
+import time
+from django.core.management.base import BaseCommand
+from api.utils.exam_sessions import get_expired_sessions, expire_sessions
+
+
+class Command(BaseCommand):
+    """
+    Timed-out sessions stay in progress until this command finalizes them, and initial_exam_taken,
+    final_exam_taken and the results pages read the stored status. Keep it running with ``--interval 60``
+    next to the web workers, or schedule it every minute, e.g. from cron:
+
+        * * * * * python manage.py expire_exam_sessions
+    """
+    help = 'Finalizes exam sessions whose time limit or deadline and auto-submission grace period have passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--skip-abilities', action='store_true', help='Do not update student abilities')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Sweep again every this many seconds instead of exiting after one sweep')
+
+    def handle(self, *args, **options):
+        while True:
+            total = self.sweep(options['batch_size'], not options['skip_abilities'])
+            self.stdout.write(self.style.SUCCESS(f'Expired {total} exam sessions'))
+
+            if not options['interval']:
+                break
+
+            time.sleep(options['interval'])
+
+    def sweep(self, batch_size, update_abilities):
+        total = 0
+
+        while True:
+            batch = list(get_expired_sessions().order_by('expires_at')[:batch_size])
+
+            if not batch:
+                break
+
+            expired = expire_sessions(batch, update_abilities=update_abilities)
+            total += len(expired)
+
+            if not expired:
+                # Everything left is locked by another worker
+                break
+
+        return total
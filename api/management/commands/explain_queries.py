@@ -0,0 +1,89 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from api.models import Answer, Assessment, AssessmentResult, Question, User
+from api.utils.exam_sessions import get_expired_sessions
+
+
+def _first_id(queryset, field='id'):
+    return queryset.values_list(field, flat=True).first() or 0
+
+
+def _walk(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _walk(child)
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN over the main view queries on the local PostgreSQL database and flags sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help='Run EXPLAIN ANALYZE (executes the queries)')
+        parser.add_argument('--allow-seqscan', action='store_true',
+                            help='Keep the planner defaults; by default sequential scans are discouraged so '
+                                 'small seeded tables still show which index a query can use')
+        parser.add_argument('--strict', action='store_true', help='Exit with an error if any query scans a table')
+
+    def view_queries(self):
+        """The filters behind the hot views, with ids taken from whatever the database is seeded with."""
+        student = User.objects.filter(role=User.STUDENT).exclude(enrolled_class=None).first()
+        student_id = student.id if student else 0
+        class_id = student.enrolled_class_id if student else _first_id(User.objects.all(), 'enrolled_class_id')
+        assessment_id = _first_id(Assessment.objects.filter(class_owner_id=class_id))
+        result_id = _first_id(AssessmentResult.objects.filter(assessment_id=assessment_id))
+        question_id = _first_id(Answer.objects.filter(assessment_result_id=result_id), 'question_id')
+        category_id = _first_id(Question.objects.filter(id=question_id), 'category_id')
+
+        return [
+            ('initial exam of a class',
+             Assessment.objects.filter(class_owner_id=class_id, is_initial=True, is_active=True)),
+            ('class assessments',
+             Assessment.objects.filter(class_owner_id=class_id, is_active=True).order_by('-created_at')),
+            ('practice history of a student',
+             Assessment.objects.filter(created_by_id=student_id).order_by('-created_at')),
+            ('student attempts on an assessment',
+             AssessmentResult.objects.filter(user_id=student_id, assessment_id=assessment_id).order_by('-id')),
+            ('submitted results of an assessment',
+             AssessmentResult.objects.filter(assessment_id=assessment_id, is_submitted=True)),
+            ('expired exam sessions', get_expired_sessions()),
+            ('answers of a result', Answer.objects.filter(assessment_result_id=result_id)),
+            ('answer stats of a question',
+             Answer.objects.filter(question_id=question_id, assessment_result__assessment_id=assessment_id)),
+            ('class roster', User.objects.filter(enrolled_class_id=class_id, role=User.STUDENT)),
+            ('questions of a category', Question.objects.filter(category_id=category_id)),
+        ]
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('explain_queries needs a PostgreSQL database')
+
+        queries = self.view_queries()
+        flagged = []
+
+        with transaction.atomic():
+            if not options['allow_seqscan']:
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for label, queryset in queries:
+                plan = json.loads(queryset.explain(format='json', analyze=options['analyze']))[0]['Plan']
+                nodes = list(_walk(plan))
+
+                seq_scans = sorted({node['Relation Name'] for node in nodes if node['Node Type'] == 'Seq Scan'})
+                indexes = sorted({node['Index Name'] for node in nodes if 'Index Name' in node})
+
+                line = f'{label}: cost {plan["Total Cost"]:.2f}'
+                if options['analyze']:
+                    line += f', {plan["Actual Total Time"]:.3f} ms'
+
+                if seq_scans:
+                    flagged.append(label)
+                    self.stdout.write(self.style.WARNING(f'{line}, seq scan on {", ".join(seq_scans)}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{line}, using {", ".join(indexes) or "no index"}'))
+
+        if flagged and options['strict']:
+            raise CommandError(f'{len(flagged)} queries scan whole tables: {", ".join(flagged)}')
+
+        self.stdout.write(f'{len(flagged)} of {len(queries)} queries flagged')
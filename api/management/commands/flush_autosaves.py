@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import timedelta
+from api.models import AssessmentResult
+from api.utils.autosave import flush_answers, AUTOSAVE_FLUSH_INTERVAL
+
+
+class Command(BaseCommand):
+    help = 'Flushes buffered autosave answers that have been waiting longer than the flush interval'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Flush every buffered result regardless of age')
+
+    def handle(self, *args, **options):
+        results = AssessmentResult.objects.filter(answer_drafts__isnull=False)
+
+        if not options['all']:
+            cutoff = timezone.now() - timedelta(seconds=AUTOSAVE_FLUSH_INTERVAL)
+            results = results.filter(answer_drafts__created_at__lte=cutoff)
+
+        flushed = 0
+        for result in results.distinct():
+            flushed += flush_answers(result)
+
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} buffered answers'))
@@ -0,0 +1,271 @@
+import numpy as np
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from api.models import Answer, Assessment, AssessmentResult, Category, Class, Question, User, UserAbility
+from api.utils.assessment_factory import create_assessment_with_questions
+from api.utils.question_sampler import invalidate_question_pools, sample_question_ids
+
+LOAD_TEST_DOMAIN = 'loadtest.invalid'
+LOAD_TEST_PREFIX = 'Load Test'
+CHOICE_KEYS = ('a', 'b', 'c', 'd')
+
+
+def probability_correct(theta, a, b, c):
+    """3PL probability of a correct answer for every (student, item) pair: ``theta`` is (n,), the items are (k,)."""
+    return c + (1 - c) / (1 + np.exp(-a * (theta[:, None] - b)))
+
+
+class Command(BaseCommand):
+    help = ('Generates classes, students and exam/quiz histories with 3PL-sampled answers for load testing. '
+            'The same --seed on the same question bank always produces the same data')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=5)
+        parser.add_argument('--students', type=int, default=30, help='Students per class')
+        parser.add_argument('--exam-items', type=int, default=60, help='Questions on the initial and final exam')
+        parser.add_argument('--quizzes', type=int, default=0, help='Practice quizzes per student')
+        parser.add_argument('--quiz-items', type=int, default=15)
+        parser.add_argument('--final', action='store_true', help='Also give every class a taken final exam')
+        parser.add_argument('--bank-size', type=int, default=300,
+                            help='Top the question bank up to this many synthetic questions when it is smaller')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument('--flush', action='store_true', help='Delete previously generated load test data first')
+
+    def handle(self, *args, **options):
+        # Separate streams, so topping up the question bank does not shift the draws for the generated data
+        bank_seed, data_seed = np.random.SeedSequence(options['seed']).spawn(2)
+        self.bank_rng = np.random.default_rng(bank_seed)
+        self.rng = np.random.default_rng(data_seed)
+        self.chunk_size = options['chunk_size']
+        self.now = timezone.now()
+
+        if options['flush']:
+            self.flush()
+
+        if User.objects.filter(email__endswith=f"-{options['seed']}@{LOAD_TEST_DOMAIN}").exists():
+            raise CommandError(f"Load test data for seed {options['seed']} already exists, rerun with --flush")
+
+        self.ensure_question_bank(options['bank_size'])
+        self.bank = {
+            row[0]: row for row in Question.objects.values_list(
+                'id', 'category_id', 'irt_difficulty', 'discrimination', 'guessing', 'choices', 'correct_answer'
+            )
+        }
+        self.category_ids = sorted({row[1] for row in self.bank.values()})
+
+        initial_template = self.create_template('Initial', options['exam_items'])
+        final_template = self.create_template('Final', options['exam_items']) if options['final'] else None
+
+        totals = {'classes': 0, 'students': 0, 'results': 0, 'answers': 0}
+
+        for class_number in range(options['classes']):
+            with transaction.atomic():
+                class_obj, students, thetas = self.create_class(class_number, options['students'], options['seed'])
+                self.create_abilities(students, thetas)
+
+                exams = [(initial_template, thetas, {'is_initial': True, 'name': 'Initial Assessment'})]
+                if final_template:
+                    # Students improve a little between the initial and the final exam
+                    growth = self.rng.normal(0.3, 0.2, size=len(thetas))
+                    exams.append((final_template, thetas + growth, {'is_final': True, 'name': 'Final Assessment'}))
+
+                for template, exam_thetas, fields in exams:
+                    exam, _ = create_assessment_with_questions(
+                        [],
+                        category_ids=template.category_ids,
+                        template_id=template.id,
+                        class_owner=class_obj,
+                        type='exam',
+                        source='admin_generated',
+                        time_limit=template.time_limit,
+                        deadline=self.now,
+                        **fields
+                    )
+                    counts = self.take(exam, template.question_ids, students, exam_thetas)
+                    totals['results'] += counts[0]
+                    totals['answers'] += counts[1]
+
+                for _ in range(options['quizzes']):
+                    counts = self.create_quizzes(students, thetas, options['quiz_items'])
+                    totals['results'] += counts[0]
+                    totals['answers'] += counts[1]
+
+            totals['classes'] += 1
+            totals['students'] += len(students)
+            self.stdout.write(f'Class {class_number + 1}/{options["classes"]}: {len(students)} students')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {totals['classes']} classes, {totals['students']} students, "
+            f"{totals['results']} results and {totals['answers']} answers"
+        ))
+
+    def flush(self):
+        with transaction.atomic():
+            # Classes, their exams and every result cascade from the generated users
+            deleted, _ = User.objects.filter(email__endswith=f'@{LOAD_TEST_DOMAIN}').delete()
+            Assessment.objects.filter(name__startswith=LOAD_TEST_PREFIX, class_owner=None, is_template=False).delete()
+            Assessment.objects.filter(name__startswith=LOAD_TEST_PREFIX, is_template=True).delete()
+
+        self.stdout.write(f'Deleted {deleted} rows of previous load test data')
+
+    def ensure_question_bank(self, bank_size):
+        missing = bank_size - Question.objects.count()
+        if missing <= 0:
+            return
+
+        category_ids = list(Category.objects.order_by('id').values_list('id', flat=True))
+        if not category_ids:
+            categories = Category.objects.bulk_create([
+                Category(name=f'{LOAD_TEST_PREFIX} Category {number + 1}') for number in range(5)
+            ])
+            category_ids = [category.id for category in categories]
+
+        start = Question.objects.filter(id__startswith='LT').count()
+        questions = []
+        for number in range(start, start + missing):
+            questions.append(Question(
+                id=f'LT{number:06d}',
+                question_text=f'{LOAD_TEST_PREFIX} question {number}',
+                category_id=category_ids[number % len(category_ids)],
+                irt_difficulty=float(self.bank_rng.normal(0, 1)),
+                discrimination=float(self.bank_rng.lognormal(0, 0.3)),
+                guessing=0.25,
+                choices={key: f'Choice {key.upper()} of question {number}' for key in CHOICE_KEYS},
+                correct_answer=CHOICE_KEYS[int(self.bank_rng.integers(len(CHOICE_KEYS)))],
+            ))
+
+        Question.objects.bulk_create(questions, batch_size=self.chunk_size, ignore_conflicts=True)
+        invalidate_question_pools()
+        self.stdout.write(f'Added {len(questions)} synthetic questions to the question bank')
+
+    def create_template(self, kind, items):
+        question_ids = sample_question_ids(items, rng=self.rng)
+        template, _ = create_assessment_with_questions(
+            question_ids,
+            name=f'{LOAD_TEST_PREFIX} {kind} Template',
+            type='exam',
+            source='admin_generated',
+            time_limit=90 * len(question_ids),
+            is_template=True,
+        )
+        template.question_ids = question_ids
+        template.category_ids = sorted({self.bank[question_id][1] for question_id in question_ids})
+        return template
+
+    def create_class(self, class_number, student_count, seed):
+        email = f'{class_number}-{seed}@{LOAD_TEST_DOMAIN}'
+        teacher = User.objects.create(
+            supabase_user_id=f'loadtest-teacher-{email}',
+            email=f'teacher-{email}',
+            first_name='Teacher',
+            last_name=str(class_number),
+            role=User.TEACHER,
+            email_confirmed=True,
+        )
+        class_obj = Class.objects.create(name=f'{LOAD_TEST_PREFIX} Class {class_number}', teacher=teacher)
+
+        students = User.objects.bulk_create([
+            User(
+                supabase_user_id=f'loadtest-student-{number}-{email}',
+                email=f'student-{number}-{email}',
+                first_name='Student',
+                last_name=f'{class_number}-{number}',
+                role=User.STUDENT,
+                enrolled_class=class_obj,
+                email_confirmed=True,
+            )
+            for number in range(student_count)
+        ], batch_size=self.chunk_size)
+
+        return class_obj, students, self.rng.normal(0, 1, size=len(students))
+
+    def create_abilities(self, students, thetas):
+        abilities = []
+        for student, theta in zip(students, thetas):
+            # Each student is a little stronger or weaker in some categories than overall
+            offsets = self.rng.normal(0, 0.5, size=len(self.category_ids))
+            for category_id, offset in zip(self.category_ids, offsets):
+                abilities.append(UserAbility(
+                    user=student,
+                    category_id=category_id,
+                    irt_ability=float(theta + offset),
+                    elo_ability=int(1500 + 200 * (theta + offset)),
+                    elo_time_ability=int(1500 + 200 * (theta + offset)),
+                ))
+
+        UserAbility.objects.bulk_create(abilities, batch_size=self.chunk_size)
+
+    def take(self, assessment, question_ids, students, thetas):
+        """Submit ``assessment`` for every student with answers drawn from the 3PL model. Returns (results, answers)."""
+        items = [self.bank[question_id] for question_id in question_ids]
+        b = np.array([item[2] for item in items], dtype=float)
+        a = np.array([item[3] for item in items], dtype=float)
+        c = np.array([item[4] for item in items], dtype=float)
+
+        correct = self.rng.random((len(students), len(items))) < probability_correct(thetas, a, b, c)
+        time_spent = np.maximum(self.rng.lognormal(np.log(45), 0.5, size=correct.shape).astype(int), 1)
+        wrong_picks = self.rng.integers(1, len(CHOICE_KEYS), size=correct.shape)
+
+        results = AssessmentResult.objects.bulk_create([
+            AssessmentResult(
+                assessment=assessment,
+                user=student,
+                score=int(correct[row].sum()),
+                time_taken=int(time_spent[row].sum()),
+                is_submitted=True,
+                status=AssessmentResult.SUBMITTED,
+                question_seed=int(self.rng.integers(2 ** 63 - 1)),
+                expires_at=self.now + timedelta(seconds=assessment.time_limit),
+            )
+            for row, student in enumerate(students)
+        ], batch_size=self.chunk_size)
+
+        answers = []
+        for row, result in enumerate(results):
+            for column, (question_id, _, _, _, _, choices, correct_answer) in enumerate(items):
+                if correct[row, column]:
+                    chosen_key = correct_answer
+                else:
+                    # Any of the other choices, never the correct one
+                    offset = CHOICE_KEYS.index(correct_answer) + int(wrong_picks[row, column])
+                    chosen_key = CHOICE_KEYS[offset % len(CHOICE_KEYS)]
+
+                answers.append(Answer(
+                    assessment_result=result,
+                    question_id=question_id,
+                    chosen_answer=choices.get(chosen_key, ''),
+                    time_spent=int(time_spent[row, column]),
+                    is_correct=bool(correct[row, column]),
+                ))
+
+            if len(answers) >= self.chunk_size:
+                Answer.objects.bulk_create(answers, batch_size=self.chunk_size)
+                answers = []
+
+        Answer.objects.bulk_create(answers, batch_size=self.chunk_size)
+
+        return len(results), correct.size
+
+    def create_quizzes(self, students, thetas, items):
+        """One practice quiz per student, each with its own sampled questions. Returns (results, answers)."""
+        totals = [0, 0]
+
+        for student, theta in zip(students, thetas):
+            question_ids = sample_question_ids(items, rng=self.rng)
+            quiz, _ = create_assessment_with_questions(
+                question_ids,
+                category_ids={self.bank[question_id][1] for question_id in question_ids},
+                name=f'{LOAD_TEST_PREFIX} Quiz',
+                created_by=student,
+                type='quiz',
+                source='student_initiated',
+                time_limit=60 * len(question_ids),
+            )
+            results, answers = self.take(quiz, question_ids, [student], np.array([theta]))
+            totals[0] += results
+            totals[1] += answers
+
+        return totals
@@ -47,7 +47,7 @@ class Command(BaseCommand):
                     continue
 
                 # Get questions in this category for this assessment
-                questions = assessment.questions.filter(category=category)
+                questions = assessment.get_questions().filter(category=category)
                 total_questions = questions.count()
                 if total_questions == 0:
                     continue
@@ -173,7 +173,7 @@ class Command(BaseCommand):
         self.stdout.write('=' * 80)
         self.stdout.write(f'Student ID: {user.id})')
         self.stdout.write(f'Date: {result.start_time.date()}')
-        self.stdout.write(f'Overall Score: {result.score}/{assessment.questions.count()}')
+        self.stdout.write(f'Overall Score: {result.score}/{assessment.get_questions().count()}')
         self.stdout.write('=' * 80)
 
         self.stdout.write('\nCategory Breakdown:')
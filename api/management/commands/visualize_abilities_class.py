@@ -67,7 +67,7 @@ class Command(BaseCommand):
                         continue
 
                     # Get questions in this category for this assessment
-                    questions = assessment.questions.filter(category=category)
+                    questions = assessment.get_questions().filter(category=category)
                     total_questions = questions.count()
                     if total_questions == 0:
                         continue
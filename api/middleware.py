@@ -0,0 +1,74 @@
+import random
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connection
+from api.utils.performance import PERFORMANCE_SAMPLE_RATE, RequestProfile, record
+
+
+class PerformanceMiddleware:
+    """
+    Profile a sample of requests: wall time, SQL statement count, time spent in SQL and the slowest statement.
+    Sampled responses carry a ``Server-Timing`` header and feed the /metrics endpoint. The share of requests
+    profiled is ``PERFORMANCE_SAMPLE_RATE``, overridden per view with the ``performance_sample_rate`` decorator.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Under ASGI a sync-only middleware would push every request, async views included, through a thread
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        request.performance_profile = None
+
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop_profile(request)
+
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        request.performance_profile = None
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop_profile(request)
+
+        if request.performance_profile is None:
+            return response
+
+        # Recording may flush to the cache, which is a blocking call
+        return await sync_to_async(self.finish)(request, response)
+
+    def stop_profile(self, request):
+        profile = request.performance_profile
+        if profile is not None:
+            profile.wrapper.__exit__(None, None, None)
+
+    def finish(self, request, response):
+        profile = request.performance_profile
+
+        if profile is not None:
+            duration = time.perf_counter() - profile.start
+            record(request.resolver_match.route, request.method, response.status_code, profile, duration)
+            response['Server-Timing'] = profile.server_timing(duration)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        sample_rate = getattr(view_func, 'performance_sample_rate', PERFORMANCE_SAMPLE_RATE)
+
+        if sample_rate and random.random() < sample_rate:
+            profile = RequestProfile()
+            profile.wrapper = connection.execute_wrapper(profile)
+            profile.wrapper.__enter__()
+            request.performance_profile = profile
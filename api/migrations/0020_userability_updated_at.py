@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0019_rlagentstate_memory_alter_userability_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userability",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
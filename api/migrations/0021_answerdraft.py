@@ -0,0 +1,40 @@
+# Generated by Django 5.1.4 on 2026-10-18 22:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0020_userability_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnswerDraft",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("question_id", models.CharField(max_length=10)),
+                ("chosen_answer", models.TextField()),
+                ("time_spent", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "assessment_result",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answer_drafts",
+                        to="api.assessmentresult",
+                    ),
+                ),
+            ],
+        ),
+    ]
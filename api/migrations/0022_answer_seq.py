@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0021_answerdraft"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="answer",
+            name="seq",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
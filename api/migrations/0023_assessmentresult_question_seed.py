@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0022_answer_seq"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assessmentresult",
+            name="question_seed",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.4 on 2026-10-18 23:20
+
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def backfill_sessions(apps, schema_editor):
+    AssessmentResult = apps.get_model("api", "AssessmentResult")
+
+    AssessmentResult.objects.filter(is_submitted=True).update(status="submitted")
+
+    running = list(AssessmentResult.objects.filter(is_submitted=False).select_related("assessment"))
+    for result in running:
+        end_times = []
+        if result.assessment.time_limit:
+            end_times.append(result.start_time + timedelta(seconds=result.assessment.time_limit))
+        if result.assessment.deadline:
+            end_times.append(result.assessment.deadline)
+        result.expires_at = min(end_times) if end_times else None
+
+    AssessmentResult.objects.bulk_update(running, ["expires_at"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0023_assessmentresult_question_seed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assessmentresult",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("not_started", "Not Started"),
+                    ("in_progress", "In Progress"),
+                    ("submitted", "Submitted"),
+                    ("expired", "Expired"),
+                ],
+                default="in_progress",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="assessmentresult",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0024_assessmentresult_status_expires_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExamBlueprint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50)),
+                ("category_quotas", models.JSONField(default=dict)),
+                ("difficulty_mix", models.JSONField(blank=True, default=dict)),
+                ("target_ability", models.FloatField(default=0)),
+                ("exclude_seen", models.BooleanField(default=True)),
+                ("time_limit", models.IntegerField(default=8100)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 23:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0025_examblueprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assessment",
+            name="is_template",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="assessment",
+            name="template",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="instances",
+                to="api.assessment",
+            ),
+        ),
+    ]
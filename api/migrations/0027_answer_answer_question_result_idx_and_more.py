@@ -0,0 +1,70 @@
+# Generated by Django 5.1.4 on 2026-10-19 00:15
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and keeps the tables writable while it builds
+    atomic = False
+
+    dependencies = [
+        ("api", "0026_assessment_template"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="answer",
+            index=models.Index(
+                fields=["question", "assessment_result"],
+                name="answer_question_result_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="assessment",
+            index=models.Index(
+                fields=["class_owner", "is_active"], name="assessment_class_active_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="assessment",
+            index=models.Index(
+                condition=models.Q(("is_initial", True)),
+                fields=["class_owner"],
+                name="assessment_class_initial_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="assessment",
+            index=models.Index(
+                fields=["created_by", "created_at"], name="assessment_creator_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="assessmentresult",
+            index=models.Index(
+                fields=["user", "assessment"], name="result_user_assessment_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="assessmentresult",
+            index=models.Index(
+                fields=["assessment", "is_submitted"],
+                name="result_assessment_submit_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="assessmentresult",
+            index=models.Index(
+                condition=models.Q(("status", "in_progress")),
+                fields=["expires_at"],
+                name="result_running_expiry_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="user",
+            index=models.Index(
+                fields=["enrolled_class", "role"], name="user_class_role_idx"
+            ),
+        ),
+    ]
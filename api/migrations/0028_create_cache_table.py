@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-19 09:40
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # Creates the DatabaseCache table named in CACHES; does nothing for other cache backends
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0027_answer_answer_question_result_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
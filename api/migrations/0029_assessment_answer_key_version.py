@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0028_create_cache_table"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assessment",
+            name="answer_key_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0029_assessment_answer_key_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="class",
+            name="exam_blueprint",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="api.examblueprint",
+            ),
+        ),
+        migrations.AddField(
+            model_name="class",
+            name="final_exam_form",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
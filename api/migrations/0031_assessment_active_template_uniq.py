@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0030_class_exam_blueprint_final_exam_form"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="assessment",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True), ("is_template", True)),
+                fields=("name",),
+                name="assessment_active_template_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0031_assessment_active_template_uniq"),
+    ]
+
+    operations = [
+        # result_running_expiry_idx covers the expiry sweep, so the full index on expires_at only slowed writes
+        migrations.AlterField(
+            model_name="assessmentresult",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from .utils.util import generate_class_code
+from .utils.util import generate_class_code, seeded_question_order
 from django.db.models import JSONField
 
 
@@ -22,6 +22,11 @@ class User(models.Model):
     email_confirmed = models.BooleanField(default=False)
     verification_sent_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['enrolled_class', 'role'], name='user_class_role_idx'),
+        ]
+
     @property
     def full_name(self):
         # Concatenate first_name and last_name with a space in between
@@ -52,6 +57,7 @@ class UserAbility(models.Model):
     irt_ability = models.FloatField(default=0)
     elo_ability = models.IntegerField(default=1500)
     elo_time_ability = models.IntegerField(default=1500)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = (('user', 'category'),)
@@ -108,6 +114,11 @@ class Assessment(models.Model):
     chapter = models.ForeignKey('Chapter', on_delete=models.CASCADE, null=True, blank=True)
     created_by = models.ForeignKey('User', on_delete=models.SET_NULL, null=True, blank=True)
     questions = models.ManyToManyField("Question", related_name="assessments")
+    # Initial and final exams share the question links of a template instead of holding their own copies
+    template = models.ForeignKey('self', on_delete=models.PROTECT, null=True, blank=True, related_name='instances')
+    is_template = models.BooleanField(default=False)
+    # Bumped whenever a question of this assessment changes; answer keys and exam payloads are cached per version
+    answer_key_version = models.PositiveIntegerField(default=0)
     selected_categories = models.ManyToManyField(Category, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     time_limit = models.IntegerField(default=0)
@@ -118,11 +129,42 @@ class Assessment(models.Model):
     question_source = models.CharField(max_length=50, choices=QUESTION_SOURCE_CHOICES, default='previous_exam')
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['class_owner', 'is_active'], name='assessment_class_active_idx'),
+            models.Index(fields=['class_owner'], condition=models.Q(is_initial=True),
+                         name='assessment_class_initial_idx'),
+            models.Index(fields=['created_by', 'created_at'], name='assessment_creator_idx'),
+        ]
+        constraints = [
+            # One active template per name, so workers racing to create it cannot both succeed
+            models.UniqueConstraint(fields=['name'], condition=models.Q(is_template=True, is_active=True),
+                                    name='assessment_active_template_uniq'),
+        ]
+
     def __str__(self):
         return self.name
 
+    @property
+    def question_set_id(self):
+        return self.template_id or self.id
+
+    def get_questions(self):
+        return Question.objects.filter(assessments__id=self.question_set_id)
+
 
 class AssessmentResult(models.Model):
+    NOT_STARTED = 'not_started'
+    IN_PROGRESS = 'in_progress'
+    SUBMITTED = 'submitted'
+    EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (NOT_STARTED, 'Not Started'),
+        (IN_PROGRESS, 'In Progress'),
+        (SUBMITTED, 'Submitted'),
+        (EXPIRED, 'Expired'),
+    ]
+
     assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
     score = models.IntegerField(default=0)
@@ -131,6 +173,18 @@ class AssessmentResult(models.Model):
     last_activity = models.DateTimeField(auto_now=True)
     is_submitted = models.BooleanField(default=False)
     question_order = JSONField(blank=True, null=True)
+    question_seed = models.BigIntegerField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=IN_PROGRESS)
+    expires_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'assessment'], name='result_user_assessment_idx'),
+            models.Index(fields=['assessment', 'is_submitted'], name='result_assessment_submit_idx'),
+            # Only running sessions are ever scanned for expiry
+            models.Index(fields=['expires_at'], condition=models.Q(status='in_progress'),
+                         name='result_running_expiry_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user} scored {self.score} on {self.assessment}'
@@ -138,6 +192,12 @@ class AssessmentResult(models.Model):
     def get_time_taken(self):
         return (self.last_activity - self.start_time).seconds
 
+    def get_question_order(self, question_ids):
+        # Older sessions stored their shuffled order; newer ones rebuild it from the seed
+        if self.question_order:
+            return self.question_order
+        return seeded_question_order(question_ids, self.question_seed)
+
 
 class Answer(models.Model):
     assessment_result = models.ForeignKey(AssessmentResult, on_delete=models.CASCADE, related_name='answers')
@@ -145,18 +205,53 @@ class Answer(models.Model):
     chosen_answer = models.TextField()
     time_spent = models.IntegerField(default=0)
     is_correct = models.BooleanField(default=False)
+    seq = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('assessment_result', 'question')
+        indexes = [
+            models.Index(fields=['question', 'assessment_result'], name='answer_question_result_idx'),
+        ]
 
     def __str__(self):
         return f'Answer for {self.question.question_text} by {self.assessment_result.user}'
 
 
+class ExamBlueprint(models.Model):
+    """What an assembled exam form must contain: questions per category, a difficulty mix and the ability to target."""
+    name = models.CharField(max_length=50)
+    # {"<category id>": number of questions}
+    category_quotas = JSONField(default=dict)
+    # {"<difficulty level>": share of each category's quota}, empty for no constraint
+    difficulty_mix = JSONField(default=dict, blank=True)
+    target_ability = models.FloatField(default=0)
+    exclude_seen = models.BooleanField(default=True)
+    time_limit = models.IntegerField(default=8100)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class AnswerDraft(models.Model):
+    """Append-only autosave buffer, coalesced into Answer rows when the result is flushed."""
+    assessment_result = models.ForeignKey(AssessmentResult, on_delete=models.CASCADE, related_name='answer_drafts')
+    question_id = models.CharField(max_length=10)
+    chosen_answer = models.TextField()
+    time_spent = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'Draft answer for {self.question_id} on result {self.assessment_result_id}'
+
+
 class Class(models.Model):
     name = models.CharField(max_length=255)
     teacher = models.ForeignKey('User', on_delete=models.CASCADE, limit_choices_to={'role': 'teacher'})
     class_code = models.CharField(max_length=8, unique=True, blank=True, editable=False)
+    # The blueprint of the initial exam and the parallel form assembled with it, kept for the final exam
+    exam_blueprint = models.ForeignKey(ExamBlueprint, on_delete=models.SET_NULL, null=True, blank=True)
+    final_exam_form = JSONField(default=list, blank=True)
 
     def save(self, *args, **kwargs):
         if not self.class_code:
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from api.models import Lesson, Chapter, Section
+from api.utils.content_cache import invalidate_content
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+@receiver([post_save, post_delete], sender=Chapter)
+@receiver([post_save, post_delete], sender=Section)
+def invalidate_lesson_content(sender, **kwargs):
+    # Covers lock/unlock changes made through the admin or shell as well as the sheet upload
+    invalidate_content()
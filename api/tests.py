@@ -1,3 +1,474 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from datetime import timedelta
+from unittest import mock, skipUnless
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from api.models import Answer, AnswerDraft, Assessment, AssessmentResult, Category, Chapter, Class, ExamBlueprint, \
+    Lesson, Question, User, UserAbility
+from api.utils.answer_key import get_answer_key, invalidate_question_answer_keys
+from api.utils.autosave import apply_answer_delta
+from api.utils.exam_sessions import AUTO_SUBMISSION_GRACE_PERIOD, expire_sessions, get_expired_sessions
+from api.utils.exam_templates import INITIAL_EXAM_TEMPLATE, get_exam_template
+from api.utils.live_progress import get_live_progress, mark_started, mark_submitted, record_answers
+from api.utils.question_sampler import invalidate_question_pools
+from api.utils.rate_limit import CHAPTER_ASSESSMENT_ATTEMPTS, PRACTICE_QUIZ_COOLDOWN, TEACHER_ASSESSMENT_ATTEMPTS
+from api.views import general_views, student_views, teacher_views
 
-# Create your tests here.
+CHOICES = {'a': 'Right', 'b': 'Wrong', 'c': 'Also wrong', 'd': 'Still wrong'}
+
+
+def create_student(name, enrolled_class=None):
+    return User.objects.create(supabase_user_id=name, email=f'{name}@cit.edu', enrolled_class=enrolled_class)
+
+
+def create_questions(count, category):
+    return [
+        Question.objects.create(id=f'T{number}', question_text=f'Question {number}', category=category,
+                                choices=CHOICES, correct_answer='a')
+        for number in range(count)
+    ]
+
+
+def request_as(user, view, method='get', data=None, **kwargs):
+    """Call an ``auth_required`` view signed in as ``user``."""
+    auth = SimpleNamespace(get_user=lambda jwt=None: SimpleNamespace(user=SimpleNamespace(id=user.supabase_user_id)))
+    request = getattr(APIRequestFactory(), method)('/', data, format='json')
+    request.COOKIES['access_token'] = 'token'
+
+    with mock.patch('api.decorators.get_supabase_client', lambda: SimpleNamespace(auth=auth)):
+        return view(request, **kwargs)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'apply_answer_delta writes through a PostgreSQL CTE')
+class ApplyAnswerDeltaTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Basic Theory')
+        self.questions = create_questions(3, category)
+        self.assessment = Assessment.objects.create(name='Quiz', type='quiz', source='student_initiated')
+        self.assessment.questions.set(self.questions)
+        self.result = AssessmentResult.objects.create(assessment=self.assessment, user=create_student('student'))
+
+    def answer(self, index, choice):
+        return {'question_id': self.questions[index].id, 'answer': CHOICES[choice], 'time_spent': 5}
+
+    def stored(self, index):
+        return Answer.objects.get(assessment_result=self.result, question=self.questions[index])
+
+    def score(self):
+        self.result.refresh_from_db()
+        return self.result.score
+
+    def test_applies_new_answers_and_scores_them(self):
+        self.assertEqual(apply_answer_delta(self.result, [self.answer(0, 'a'), self.answer(1, 'b')], seq=1), (2, 0))
+
+        self.assertEqual(self.score(), 1)
+        self.assertTrue(self.stored(0).is_correct)
+        self.assertFalse(self.stored(1).is_correct)
+        self.assertEqual(self.stored(1).seq, 1)
+
+    def test_out_of_order_delta_is_dropped(self):
+        apply_answer_delta(self.result, [self.answer(0, 'a')], seq=2)
+
+        self.assertEqual(apply_answer_delta(self.result, [self.answer(0, 'b')], seq=1), (0, 1))
+        self.assertEqual(self.stored(0).chosen_answer, CHOICES['a'])
+        self.assertEqual(self.stored(0).seq, 2)
+        self.assertEqual(self.score(), 1)
+
+    def test_duplicate_seq_is_dropped(self):
+        apply_answer_delta(self.result, [self.answer(0, 'a')], seq=1)
+
+        self.assertEqual(apply_answer_delta(self.result, [self.answer(0, 'b')], seq=1), (0, 1))
+        self.assertEqual(self.stored(0).chosen_answer, CHOICES['a'])
+        self.assertEqual(self.score(), 1)
+
+    def test_stale_answers_are_dropped_alongside_new_ones(self):
+        apply_answer_delta(self.result, [self.answer(0, 'a')], seq=3)
+
+        self.assertEqual(apply_answer_delta(self.result, [self.answer(0, 'b'), self.answer(1, 'a')], seq=2), (1, 1))
+        self.assertEqual(self.stored(0).chosen_answer, CHOICES['a'])
+        self.assertEqual(self.score(), 2)
+
+    def test_flipping_an_answer_adjusts_the_score(self):
+        apply_answer_delta(self.result, [self.answer(0, 'a'), self.answer(1, 'a')], seq=1)
+        self.assertEqual(self.score(), 2)
+
+        apply_answer_delta(self.result, [self.answer(0, 'b')], seq=2)
+        self.assertEqual(self.score(), 1)
+
+        apply_answer_delta(self.result, [self.answer(0, 'a'), self.answer(1, 'c')], seq=3)
+        self.assertEqual(self.score(), 1)
+
+        # Re-sending an unchanged correct answer must not count it twice
+        apply_answer_delta(self.result, [self.answer(0, 'a')], seq=4)
+        self.assertEqual(self.score(), 1)
+
+    def test_last_answer_to_a_question_in_one_delta_wins(self):
+        apply_answer_delta(self.result, [self.answer(0, 'b'), self.answer(0, 'a')], seq=1)
+
+        self.assertEqual(self.stored(0).chosen_answer, CHOICES['a'])
+        self.assertEqual(self.score(), 1)
+
+    def test_questions_outside_the_assessment_are_ignored(self):
+        applied = apply_answer_delta(self.result, [{'question_id': 'missing', 'answer': 'Right'}], seq=1)
+
+        self.assertEqual(applied, (0, 1))
+        self.assertFalse(Answer.objects.filter(assessment_result=self.result).exists())
+        self.assertEqual(self.score(), 0)
+
+
+class AnswerKeyTests(TestCase):
+    def setUp(self):
+        self.question = create_questions(1, Category.objects.create(name='Basic Theory'))[0]
+        self.assessment = Assessment.objects.create(name='Quiz', type='quiz', source='student_initiated')
+        self.assessment.questions.set([self.question])
+
+    def test_edited_answer_invalidates_keys_cached_in_any_process(self):
+        self.assertEqual(get_answer_key(self.assessment.id)[self.question.id]['answer'], CHOICES['a'])
+
+        Question.objects.filter(id=self.question.id).update(correct_answer='b')
+        invalidate_question_answer_keys([self.question.id])
+
+        # The compiled key is still in this process and the cache; the version on the assessment moved past it
+        self.assertEqual(get_answer_key(self.assessment.id)[self.question.id]['answer'], CHOICES['b'])
+
+
+class BufferedAutosaveTests(TestCase):
+    def setUp(self):
+        self.questions = create_questions(2, Category.objects.create(name='Basic Theory'))
+        self.assessment = Assessment.objects.create(name='Exam', type='exam', time_limit=600)
+        self.assessment.questions.set(self.questions)
+        self.student = create_student('student')
+
+    def start_session(self, expires_at):
+        return AssessmentResult.objects.create(assessment=self.assessment, user=self.student, expires_at=expires_at)
+
+    def save(self, choice):
+        response = request_as(self.student, student_views.save_progress, 'post', {
+            'mode': 'buffered',
+            'answers': [{'question_id': self.questions[0].id, 'answer': CHOICES[choice], 'time_spent': 5}],
+        }, assessment_id=self.assessment.id)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['buffered'], 1)
+
+    def assert_last_draft_kept(self, result):
+        answer = Answer.objects.get(assessment_result=result, question=self.questions[0])
+        self.assertEqual(answer.chosen_answer, CHOICES['a'])
+        self.assertTrue(answer.is_correct)
+        self.assertEqual(Answer.objects.filter(assessment_result=result, question=self.questions[0]).count(), 1)
+        self.assertFalse(AnswerDraft.objects.filter(assessment_result=result).exists())
+
+    @mock.patch('api.utils.exam_sessions.DQNAgent')
+    def test_submit_flushes_the_last_buffered_answer(self, agent):
+        result = self.start_session(timezone.now() + timedelta(minutes=5))
+        self.save('b')
+        self.save('a')
+        self.assertFalse(Answer.objects.filter(assessment_result=result).exists())
+
+        # The submission only carries the other question; the first comes from the buffer
+        response = request_as(self.student, student_views.submit_assessment, 'post', {
+            'answers': [{'question_id': self.questions[1].id, 'answer': CHOICES['b']}],
+        }, assessment_id=self.assessment.id)
+        self.assertEqual(response.status_code, 201)
+
+        self.assert_last_draft_kept(result)
+        result.refresh_from_db()
+        self.assertEqual(result.score, 1)
+
+    def test_expiry_flushes_the_last_buffered_answer(self):
+        result = self.start_session(timezone.now() + timedelta(minutes=5))
+        self.save('b')
+        self.save('a')
+        AssessmentResult.objects.filter(pk=result.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=AUTO_SUBMISSION_GRACE_PERIOD + 10)
+        )
+
+        expire_sessions(list(get_expired_sessions()), update_abilities=False)
+
+        self.assert_last_draft_kept(result)
+        result.refresh_from_db()
+        self.assertEqual(result.status, AssessmentResult.EXPIRED)
+        self.assertEqual(result.score, 1)
+
+class AttemptLimitTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create(supabase_user_id='teacher', email='teacher@cit.edu', role=User.TEACHER)
+        self.class_obj = Class.objects.create(name='Class', teacher=teacher)
+        self.student = create_student('student', self.class_obj)
+        lesson = Lesson.objects.create(id=1, name='Basic Theory')
+        self.chapter = Chapter.objects.create(lesson=lesson, name='Chapter', number=1)
+        self.assessment = Assessment.objects.create(name='Chapter Quiz', type='quiz', source='teacher_generated',
+                                                    class_owner=self.class_obj, chapter=self.chapter)
+
+    def attempt(self):
+        AssessmentResult.objects.create(assessment=self.assessment, user=self.student)
+
+    def test_limit_is_counted_from_the_database(self):
+        for _ in range(TEACHER_ASSESSMENT_ATTEMPTS.max_attempts):
+            self.assertTrue(TEACHER_ASSESSMENT_ATTEMPTS.allows(self.student, assessment_id=self.assessment.id))
+            self.attempt()
+
+        self.assertFalse(TEACHER_ASSESSMENT_ATTEMPTS.allows(self.student, assessment_id=self.assessment.id))
+        self.assertEqual(TEACHER_ASSESSMENT_ATTEMPTS.remaining(self.student, self.assessment.id), 0)
+
+    def test_attempts_created_by_another_worker_count(self):
+        # Results created outside the limiter still count towards it
+        self.assertEqual(CHAPTER_ASSESSMENT_ATTEMPTS.remaining(self.student, self.chapter.id), 3)
+        for _ in range(3):
+            self.attempt()
+
+        self.assertFalse(CHAPTER_ASSESSMENT_ATTEMPTS.allows(self.student, chapter_id=self.chapter.id))
+
+    def test_chapter_attempts_only_count_the_students_class(self):
+        other_class = Class.objects.create(name='Other', teacher=self.class_obj.teacher)
+        other_quiz = Assessment.objects.create(name='Chapter Quiz', type='quiz', source='teacher_generated',
+                                               class_owner=other_class, chapter=self.chapter)
+        for _ in range(3):
+            AssessmentResult.objects.create(assessment=other_quiz, user=self.student)
+
+        self.assertTrue(CHAPTER_ASSESSMENT_ATTEMPTS.allows(self.student, chapter_id=self.chapter.id))
+
+
+class PracticeCooldownTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = create_student('student')
+
+    def request_as_student(self, view, method='get', data=None):
+        return request_as(self.student, getattr(student_views, view), method, data)
+
+    def test_recorded_use_blocks_until_the_cooldown_ends(self):
+        self.assertTrue(PRACTICE_QUIZ_COOLDOWN.allows(self.student))
+
+        PRACTICE_QUIZ_COOLDOWN.record(self.student)
+
+        self.assertFalse(PRACTICE_QUIZ_COOLDOWN.allows(self.student))
+
+    def test_cooldown_is_rebuilt_from_the_latest_practice_assessment(self):
+        Assessment.objects.create(name='Practice Quiz', type='quiz', source='student_initiated',
+                                  created_by=self.student)
+        cache.clear()
+
+        self.assertFalse(PRACTICE_QUIZ_COOLDOWN.allows(self.student))
+        self.assertGreater(PRACTICE_QUIZ_COOLDOWN.remaining(self.student), 14 * 60)
+
+    def test_practice_exam_starts_the_cooldown_even_when_none_is_cached(self):
+        create_questions(5, Category.objects.create(name='Basic Theory'))
+        invalidate_question_pools()
+
+        # Caches the "no cooldown" answer before the exam is taken
+        self.assertTrue(PRACTICE_QUIZ_COOLDOWN.allows(self.student))
+
+        self.assertEqual(self.request_as_student('take_exam').status_code, 200)
+
+        response = self.request_as_student('take_quiz', 'post', {'no_of_questions': 1})
+        self.assertEqual(response.status_code, 429)
+
+
+class ExpireSessionsTests(TestCase):
+    def setUp(self):
+        self.assessment = Assessment.objects.create(name='Exam', type='exam', time_limit=600)
+        self.student = create_student('student')
+
+    def start_session(self, seconds_since_expiry):
+        expires_at = timezone.now() - timedelta(seconds=seconds_since_expiry)
+        return AssessmentResult.objects.create(assessment=self.assessment, user=self.student,
+                                               status=AssessmentResult.IN_PROGRESS, expires_at=expires_at)
+
+    def test_sessions_are_left_to_the_client_during_the_grace_period(self):
+        in_grace = self.start_session(AUTO_SUBMISSION_GRACE_PERIOD - 10)
+        past_grace = self.start_session(AUTO_SUBMISSION_GRACE_PERIOD + 10)
+
+        self.assertEqual(list(get_expired_sessions()), [past_grace])
+        self.assertNotIn(in_grace, get_expired_sessions())
+
+    def test_expiry_moves_last_activity(self):
+        result = self.start_session(AUTO_SUBMISSION_GRACE_PERIOD + 10)
+        AssessmentResult.objects.filter(pk=result.pk).update(last_activity=result.expires_at)
+
+        expire_sessions([result], update_abilities=False)
+
+        result.refresh_from_db()
+        self.assertEqual(result.status, AssessmentResult.EXPIRED)
+        self.assertGreater(result.last_activity, result.expires_at)
+
+    @mock.patch('api.utils.exam_sessions.DQNAgent')
+    def test_expired_and_submitted_sessions_update_abilities_alike(self, agent):
+        category = Category.objects.create(name='Basic Theory')
+        question = create_questions(1, category)[0]
+        self.assessment.questions.set([question])
+        submitter = create_student('submitter')
+        for student in (self.student, submitter):
+            UserAbility.objects.create(user=student, category=category)
+
+        expired = self.start_session(AUTO_SUBMISSION_GRACE_PERIOD + 10)
+        Answer.objects.create(assessment_result=expired, question=question, chosen_answer=CHOICES['a'],
+                              is_correct=True)
+        expire_sessions([expired])
+
+        AssessmentResult.objects.create(assessment=self.assessment, user=submitter,
+                                        expires_at=timezone.now() + timedelta(minutes=5))
+        response = request_as(submitter, student_views.submit_assessment, 'post',
+                              {'answers': [{'question_id': question.id, 'answer': CHOICES['a']}]},
+                              assessment_id=self.assessment.id)
+        self.assertEqual(response.status_code, 201)
+
+        abilities = dict(UserAbility.objects.values_list('user_id', 'elo_ability'))
+        self.assertGreater(abilities[self.student.id], 1500)
+        self.assertEqual(abilities[self.student.id], abilities[submitter.id])
+        self.assertEqual(agent.return_value.save_state_to_db.call_count, 2)
+
+
+class EventStreamTests(TestCase):
+    def test_streams_are_rejected_outside_asgi(self):
+        request = APIRequestFactory().get('/')
+
+        self.assertEqual(student_views.stream_exam_timer(request, assessment_id=1).status_code, 501)
+
+
+class MetricsTests(TestCase):
+    def get(self, **headers):
+        return general_views.metrics(RequestFactory().get('/api/metrics/', headers=headers))
+
+    @override_settings(PERFORMANCE_METRICS_TOKEN=None)
+    def test_metrics_are_hidden_without_a_token(self):
+        self.assertEqual(self.get().status_code, 404)
+
+    @override_settings(PERFORMANCE_METRICS_TOKEN='secret')
+    def test_metrics_require_the_token(self):
+        self.assertEqual(self.get().status_code, 401)
+        self.assertEqual(self.get(Authorization='Bearer wrong').status_code, 401)
+
+        response = self.get(Authorization='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'reviewsystem_performance_workers 1', response.content)
+
+
+class ParallelExamFormTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Basic Theory')
+        create_questions(4, category)
+        invalidate_question_pools()
+        self.blueprint = ExamBlueprint.objects.create(name='Exam', category_quotas={str(category.id): 2},
+                                                      time_limit=600)
+        self.teacher = User.objects.create(supabase_user_id='teacher', email='teacher@cit.edu', role=User.TEACHER)
+
+    def exam_questions(self, class_obj, **fields):
+        exam = Assessment.objects.get(class_owner=class_obj, **fields)
+        return set(exam.questions.values_list('id', flat=True))
+
+    def test_final_exam_uses_the_form_assembled_with_the_initial_exam(self):
+        response = request_as(self.teacher, teacher_views.create_class, 'post',
+                              {'class_name': 'Class', 'blueprint_id': self.blueprint.id})
+        class_obj = Class.objects.get(id=response.data['class_id'])
+
+        response = request_as(self.teacher, teacher_views.create_final_assessment, class_id=class_obj.id)
+        self.assertEqual(response.status_code, 201)
+
+        initial = self.exam_questions(class_obj, is_initial=True)
+        final = self.exam_questions(class_obj, is_final=True)
+        self.assertEqual(len(initial), 2)
+        self.assertEqual(final, set(class_obj.final_exam_form))
+        self.assertFalse(initial & final)
+        self.assertEqual(Assessment.objects.get(class_owner=class_obj, is_final=True).time_limit, 600)
+
+
+class ExamTemplateTests(TestCase):
+    def test_worker_losing_the_race_uses_the_template_created_first(self):
+        existing = Assessment.objects.create(name=INITIAL_EXAM_TEMPLATE, type='exam', is_template=True)
+
+        # Both workers found no template; this one tries to create it after the other did
+        with mock.patch('api.utils.exam_templates._get_active_template', side_effect=[None, existing]):
+            self.assertEqual(get_exam_template(INITIAL_EXAM_TEMPLATE), (existing.id, []))
+
+        self.assertEqual(Assessment.objects.filter(name=INITIAL_EXAM_TEMPLATE).count(), 1)
+
+
+class LegacyExamResultTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create(supabase_user_id='teacher', email='teacher@cit.edu', role=User.TEACHER)
+        self.class_obj = Class.objects.create(name='Class', teacher=teacher)
+        self.student = create_student('student', self.class_obj)
+
+    def open_exam(self, view, **fields):
+        exam = Assessment.objects.create(name='Exam', type='exam', class_owner=self.class_obj, time_limit=600,
+                                         deadline=timezone.now() + timedelta(days=1), **fields)
+        # Submitted before sessions had an expiry; migration 0024 left expires_at empty
+        AssessmentResult.objects.create(assessment=exam, user=self.student, is_submitted=True,
+                                        status=AssessmentResult.SUBMITTED, expires_at=None)
+
+        return request_as(self.student, view)
+
+    def test_initial_exam_submitted_without_an_expiry_is_already_taken(self):
+        response = self.open_exam(student_views.take_initial_exam, is_initial=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Student has already taken the exam.')
+
+    def test_final_exam_submitted_without_an_expiry_is_already_taken(self):
+        response = self.open_exam(student_views.take_final_exam, is_final=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'Student has already taken the exam.')
+
+
+class QuizRollupTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create(supabase_user_id='teacher', email='teacher@cit.edu', role=User.TEACHER)
+        class_obj = Class.objects.create(name='Class', teacher=self.teacher)
+        self.student = create_student('student', class_obj)
+        self.lesson = Lesson.objects.create(id=1, name='Basic Theory')
+        quiz = Assessment.objects.create(name='Lesson Quiz', type='quiz', source='teacher_generated',
+                                         class_owner=class_obj, lesson=self.lesson)
+        quiz.questions.set(create_questions(2, Category.objects.create(name='Basic Theory')))
+
+        # Two of two first, then one of two
+        for hours_ago, score in ((2, 2), (1, 1)):
+            result = AssessmentResult.objects.create(assessment=quiz, user=self.student, score=score)
+            AssessmentResult.objects.filter(pk=result.pk).update(start_time=timezone.now() - timedelta(hours=hours_ago))
+
+    def percentage(self, mode):
+        rollup = teacher_views._quiz_rollup(AssessmentResult.objects.all(), 'assessment__lesson_id', mode)
+        row = rollup[(self.lesson.id, self.student.id)]
+        self.assertEqual(row['attempts'], 2)
+        return row['percentage']
+
+    def test_each_mode_rolls_up_the_attempts(self):
+        self.assertEqual(self.percentage('latest'), 50)
+        self.assertEqual(self.percentage('best'), 100)
+        self.assertEqual(self.percentage('average'), 75)
+
+    def test_unknown_mode_is_rejected(self):
+        response = request_as(self.teacher, teacher_views.get_class_quiz_results, 'get', {'mode': 'worst'}, class_id=1)
+
+        self.assertEqual(response.status_code, 400)
+
+
+class LiveProgressTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.questions = create_questions(3, Category.objects.create(name='Basic Theory'))
+        self.assessment = Assessment.objects.create(name='Quiz', type='quiz')
+        self.assessment.questions.set(self.questions)
+
+    def answers(self, *indexes):
+        return [{'question_id': self.questions[index].id, 'answer': CHOICES['a']} for index in indexes]
+
+    def test_autosaves_and_submit_do_not_overwrite_each_other(self):
+        # Two workers' autosaves, the submit and a late autosave, none of which reads what the others wrote
+        record_answers(self.assessment.id, 1, self.answers(0))
+        record_answers(self.assessment.id, 1, self.answers(1))
+        mark_submitted(self.assessment.id, 1)
+        record_answers(self.assessment.id, 1, self.answers(1, 2))
+        mark_started(self.assessment.id, 2)
+
+        self.assertEqual(get_live_progress(self.assessment.id, [1, 2, 3]), {
+            'started': 2,
+            'submitted': 1,
+            'students': [
+                {'student_id': 1, 'answered': 3, 'submitted': True},
+                {'student_id': 2, 'answered': 0, 'submitted': False},
+            ],
+        })
@@ -10,4 +10,5 @@ urlpatterns = [
     path('profile/', general_views.get_user_details, name='get_user_details'),
     path('update-password/<str:access_token>/', general_views.update_password, name='password_update'),
     path('reset-password/', general_views.reset_password, name='reset_password'),
+    path('metrics/', general_views.metrics, name='metrics'),
 ]
\ No newline at end of file
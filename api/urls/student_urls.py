@@ -10,6 +10,8 @@ urlpatterns = [
     path('initial-exam-taken', student_views.initial_exam_taken, name='initial_exam_taken'),
     path('assessment/<int:assessment_id>/save-progress', student_views.save_progress, name='save_progress'),
     path('assessment/<int:assessment_id>/time-limit', student_views.check_time_limit, name='check_time_limit'),
+    path('assessment/<int:assessment_id>/heartbeat', student_views.heartbeat, name='heartbeat'),
+    path('assessment/<int:assessment_id>/timer-stream', student_views.stream_exam_timer, name='stream_exam_timer'),
     path('assessment/<int:assessment_id>/limit', student_views.teacher_assessment_limit, name='teacher_assessment_limit'),
     path('assessment/<int:assessment_id>/take', student_views.take_teacher_assessment, name='take_teacher_assessment'),
     path('assessment/<int:assessment_id>/class-results', student_views.get_class_assessment_result, name='get_class_assessment_result'),
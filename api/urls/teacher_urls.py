@@ -14,6 +14,7 @@ urlpatterns = [
          name='get_lesson_quiz'),
     path('class/<int:class_id>/chapter/<int:chapter_id>/results', teacher_views.get_chapter_quiz,
          name='get_chapter_quiz'),
+    path('class/<int:class_id>/quiz-results', teacher_views.get_class_quiz_results, name='get_class_quiz_results'),
     path('class/<int:class_id>/create-initial-exam', teacher_views.create_initial_assessment,
          name='create_initial_assessment'),
     path('class/<int:class_id>/estimate-students-ability', teacher_views.estimate_ability_students,
@@ -22,6 +23,7 @@ urlpatterns = [
     path('get_questions', teacher_views.get_all_questions, name='get_all_questions'),
     path('assessment/<int:assessment_id>/results-students', teacher_views.get_assessment_results_students, name='get_assessment_results_students'),
     path('assessment/<int:assessment_id>/results-questions', teacher_views.get_assessment_results_questions, name='get_assessment_results_questions'),
+    path('assessment/<int:assessment_id>/progress-stream', teacher_views.stream_assessment_progress, name='stream_assessment_progress'),
     path('assessment/<int:assessment_id>/update', teacher_views.update_assessment, name='update_assessment'),
     path('assessment/<int:assessment_id>/delete', teacher_views.delete_assessment, name='delete_assessment'),
     path('assessment/<int:assessment_id>', teacher_views.get_assessment_data, name='get_assessment_data'),
@@ -0,0 +1,38 @@
+from api.models import Answer
+from api.utils.answer_key import get_answer_key
+
+
+def ingest_answers(result, answers, answer_key=None):
+    """
+    Score a client answer payload against the assessment's answer key and upsert it onto ``result``
+    with a single statement. Answers to questions outside the assessment are ignored and the last
+    answer wins when a question appears twice. Returns the number of correct answers in the payload.
+    """
+    if answer_key is None:
+        answer_key = get_answer_key(result.assessment_id)
+
+    rows = {}
+    for answer_data in answers:
+        question_id = answer_data.get('question_id')
+
+        if question_id not in answer_key:
+            continue
+
+        chosen_answer = answer_data.get('answer') or ''
+        rows[question_id] = Answer(
+            assessment_result=result,
+            question_id=question_id,
+            chosen_answer=chosen_answer,
+            time_spent=int(answer_data.get('time_spent') or 0),
+            is_correct=chosen_answer == answer_key[question_id]['answer'],
+        )
+
+    if rows:
+        Answer.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['assessment_result', 'question'],
+            update_fields=['chosen_answer', 'time_spent', 'is_correct'],
+        )
+
+    return sum(answer.is_correct for answer in rows.values())
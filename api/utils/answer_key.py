@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.db.models import F
+from api.models import Assessment, Question
+
+ANSWER_KEY_TIMEOUT = 60 * 60 * 24
+LOCAL_ANSWER_KEY_LIMIT = 256
+
+# Compiled keys kept in this process, checked against the assessment's answer_key_version on every read
+_local_answer_keys = {}
+# Assessment id -> id of the assessment holding its question links; a template never changes once set
+_question_sets = {}
+
+
+def get_question_set_id(assessment_id):
+    """
+    Id of the assessment whose question links ``assessment_id`` uses: the shared template for exams created from
+    one, otherwise the assessment itself. Answer keys and exam payloads are cached under this id.
+    """
+    question_set_id = _question_sets.get(assessment_id)
+    if question_set_id is not None:
+        return question_set_id
+
+    question_set_id = cache.get(f"question-set:{assessment_id}")
+    if question_set_id is None:
+        template_id = Assessment.objects.filter(id=assessment_id).values_list('template_id', flat=True).first()
+        question_set_id = template_id or assessment_id
+        cache.set(f"question-set:{assessment_id}", question_set_id, ANSWER_KEY_TIMEOUT)
+
+    if len(_question_sets) >= LOCAL_ANSWER_KEY_LIMIT:
+        _question_sets.clear()
+    _question_sets[assessment_id] = question_set_id
+
+    return question_set_id
+
+
+def get_answer_key_version(assessment_id):
+    """
+    Version of the answer key of a question set. It is read from the Assessment row rather than the cache, so a
+    bump is seen by every worker before it scores the next submission.
+    """
+    return Assessment.objects.filter(id=assessment_id).values_list('answer_key_version', flat=True).first() or 0
+
+
+def invalidate_answer_key(*assessment_ids):
+    Assessment.objects.filter(id__in=assessment_ids).update(answer_key_version=F('answer_key_version') + 1)
+
+
+def invalidate_question_answer_keys(question_ids):
+    """Invalidate the answer key of every assessment that uses one of the given questions."""
+    assessment_ids = Assessment.questions.through.objects.filter(
+        question_id__in=question_ids
+    ).values_list('assessment_id', flat=True).distinct()
+    invalidate_answer_key(*assessment_ids)
+
+
+def invalidate_answer_keys():
+    """Invalidate every answer key, after the question bank is re-imported."""
+    Assessment.objects.update(answer_key_version=F('answer_key_version') + 1)
+
+
+def compile_answer_key(assessment_id):
+    """Build ``{question_id: {'answer', 'category_id'}}`` from the database, where ``answer`` is the correct choice text."""
+    rows = Question.objects.filter(assessments__id=assessment_id).values_list(
+        'id', 'choices', 'correct_answer', 'category_id'
+    )
+    return {
+        question_id: {'answer': choices.get(correct_answer), 'category_id': category_id}
+        for question_id, choices, correct_answer, category_id in rows
+    }
+
+
+def get_answer_key(assessment_id):
+    """
+    Return the compiled answer key of an assessment, reading it from this process first, then from the
+    shared cache, and only compiling it from the question table when neither has the current version.
+    Exams created from a template share the template's key.
+    """
+    assessment_id = get_question_set_id(assessment_id)
+    version = get_answer_key_version(assessment_id)
+
+    local = _local_answer_keys.get(assessment_id)
+    if local and local[0] == version:
+        return local[1]
+
+    key = f"answer-key:{assessment_id}:{version}"
+    answer_key = cache.get(key)
+
+    if answer_key is None:
+        answer_key = compile_answer_key(assessment_id)
+        cache.set(key, answer_key, ANSWER_KEY_TIMEOUT)
+
+    if len(_local_answer_keys) >= LOCAL_ANSWER_KEY_LIMIT:
+        _local_answer_keys.clear()
+    _local_answer_keys[assessment_id] = (version, answer_key)
+
+    return answer_key
@@ -0,0 +1,128 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from api.models import Answer, AnswerDraft, AssessmentResult
+from api.utils.answer_ingestion import ingest_answers
+from api.utils.answer_key import get_answer_key
+
+AUTOSAVE_FLUSH_INTERVAL = 60
+
+
+def buffer_answers(result, answers):
+    """Append answer deltas to the draft buffer with a single INSERT and no reads."""
+    drafts = [
+        AnswerDraft(
+            assessment_result=result,
+            question_id=answer_data.get('question_id'),
+            chosen_answer=answer_data.get('answer') or '',
+            time_spent=int(answer_data.get('time_spent', 0)),
+        )
+        for answer_data in answers
+        if answer_data.get('question_id')
+    ]
+
+    AnswerDraft.objects.bulk_create(drafts)
+
+    return len(drafts)
+
+
+def flush_due(result, current_time=None):
+    current_time = current_time or timezone.now()
+    return (current_time - result.last_activity).total_seconds() >= AUTOSAVE_FLUSH_INTERVAL
+
+
+def flush_answers(result):
+    """
+    Coalesce the buffered drafts of a result into its Answer rows (latest draft per question wins),
+    rescore the result and clear the buffer. Returns the number of questions coalesced.
+    """
+    with transaction.atomic():
+        # Serialises concurrent flushes of the same result
+        AssessmentResult.objects.select_for_update().filter(pk=result.pk).values_list('pk').first()
+
+        drafts = list(AnswerDraft.objects.filter(assessment_result=result).order_by('id'))
+
+        if not drafts:
+            return 0
+
+        latest_drafts = {draft.question_id: draft for draft in drafts}
+        ingest_answers(result, [
+            {'question_id': draft.question_id, 'answer': draft.chosen_answer, 'time_spent': draft.time_spent}
+            for draft in latest_drafts.values()
+        ])
+        AnswerDraft.objects.filter(assessment_result=result, id__lte=drafts[-1].id).delete()
+
+        result.score = Answer.objects.filter(assessment_result=result, is_correct=True).count()
+        result.save(update_fields=['score', 'last_activity'])
+
+    return len(latest_drafts)
+
+
+def apply_answer_delta(result, answers, seq):
+    """
+    Upsert only the changed answers of a result, tagged with the client's sequence number.
+
+    Stored answers with a ``seq`` that is not older are left untouched, so stale or out-of-order requests
+    can't overwrite newer answers, and the score is adjusted by the change in correct answers instead of
+    being recomputed. Returns the number of answers applied and the number dropped.
+    """
+    latest_answers = {}
+    for answer_data in answers:
+        if answer_data.get('question_id'):
+            latest_answers[answer_data['question_id']] = answer_data
+
+    answer_key = get_answer_key(result.assessment_id)
+
+    rows = []
+    for question_id, answer_data in latest_answers.items():
+        if question_id not in answer_key:
+            continue
+
+        chosen_answer = answer_data.get('answer') or ''
+        is_correct = chosen_answer == answer_key[question_id]['answer']
+        rows.append((question_id, chosen_answer, int(answer_data.get('time_spent') or 0), is_correct))
+
+    if not rows:
+        return 0, len(latest_answers)
+
+    table = Answer._meta.db_table
+    values = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+    sql = f"""
+        WITH incoming (question_id, chosen_answer, time_spent, is_correct) AS (VALUES {values}),
+        previous AS (
+            SELECT question_id, is_correct FROM {table}
+            WHERE assessment_result_id = %s AND question_id IN (SELECT question_id FROM incoming)
+        ),
+        written AS (
+            INSERT INTO {table} (assessment_result_id, question_id, chosen_answer, time_spent, is_correct, seq)
+            SELECT %s, question_id, chosen_answer, time_spent, is_correct, %s FROM incoming
+            ON CONFLICT (assessment_result_id, question_id) DO UPDATE SET
+                chosen_answer = EXCLUDED.chosen_answer,
+                time_spent = EXCLUDED.time_spent,
+                is_correct = EXCLUDED.is_correct,
+                seq = EXCLUDED.seq
+            WHERE {table}.seq < EXCLUDED.seq
+            RETURNING question_id, is_correct
+        )
+        SELECT
+            COUNT(*),
+            COALESCE(SUM(CASE WHEN written.is_correct THEN 1 ELSE 0 END), 0)
+                - COALESCE(SUM(CASE WHEN previous.is_correct THEN 1 ELSE 0 END), 0)
+        FROM written LEFT JOIN previous ON previous.question_id = written.question_id
+    """
+    params = [value for row in rows for value in row] + [result.pk, result.pk, seq]
+
+    with transaction.atomic():
+        # Serialises deltas of the same result so the previous answers read above stay accurate
+        AssessmentResult.objects.select_for_update().filter(pk=result.pk).values_list('pk').first()
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            applied, score_delta = cursor.fetchone()
+
+        AssessmentResult.objects.filter(pk=result.pk).update(
+            score=F('score') + score_delta,
+            last_activity=timezone.now()
+        )
+
+    return applied, len(latest_answers) - applied
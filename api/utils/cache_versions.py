@@ -0,0 +1,35 @@
+import time
+from django.core.cache import cache
+
+
+def get_version(name):
+    """Return the current version stamp for a cached namespace, creating it if needed."""
+    key = f"version:{name}"
+    version = cache.get(key)
+
+    if version is None:
+        # Seed from the clock so an evicted version key never rolls back to a stamp that is still cached
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_version(name):
+    """Invalidate every entry cached under a namespace by moving its version stamp forward."""
+    key = f"version:{name}"
+
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def get_class_assessments_version(class_id):
+    return get_version(f"class-assessments:{class_id}")
+
+
+def invalidate_class_assessments(class_id):
+    return bump_version(f"class-assessments:{class_id}")
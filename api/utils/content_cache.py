@@ -0,0 +1,111 @@
+from django.core.cache import cache
+from django.db.models import Prefetch
+from api.models import Lesson, Chapter, Section
+from api.utils.cache_versions import get_version, bump_version
+
+CONTENT_TIMEOUT = 60 * 60 * 24
+
+
+def get_content_version():
+    return get_version("content")
+
+
+def invalidate_content():
+    return bump_version("content")
+
+
+def _content_key(*parts):
+    return ":".join(["content", str(get_content_version()), *map(str, parts)])
+
+
+def get_lessons():
+    """List every lesson as ``{'id', 'name', 'is_locked'}`` ordered by id."""
+    key = _content_key("lessons")
+    lessons = cache.get(key)
+
+    if lessons is None:
+        lessons = list(Lesson.objects.order_by("id").values("id", "name", "is_locked"))
+        cache.set(key, lessons, CONTENT_TIMEOUT)
+
+    return lessons
+
+
+def get_lesson_tree(lesson_id):
+    """
+    Return a lesson with its chapters and section headings (without section content),
+    or None if the lesson does not exist.
+    """
+    key = _content_key("lesson", lesson_id)
+    tree = cache.get(key)
+
+    if tree is None:
+        lesson = Lesson.objects.prefetch_related(
+            Prefetch(
+                "chapters",
+                queryset=Chapter.objects.order_by("number").prefetch_related(
+                    Prefetch("sections", queryset=Section.objects.defer("content"))
+                )
+            )
+        ).filter(id=lesson_id).first()
+
+        if lesson is None:
+            return None
+
+        tree = {
+            "id": lesson.id,
+            "name": lesson.name,
+            "is_locked": lesson.is_locked,
+            "chapters": [
+                {
+                    "id": chapter.id,
+                    "number": chapter.number,
+                    "name": chapter.name,
+                    "is_main_chapter": chapter.is_main_chapter,
+                    "is_locked": chapter.is_locked,
+                    "sections": [
+                        {
+                            "id": section.id,
+                            "number": section.number,
+                            "name": section.name,
+                        }
+                        for section in chapter.sections.all()
+                    ]
+                }
+                for chapter in lesson.chapters.all()
+            ]
+        }
+        cache.set(key, tree, CONTENT_TIMEOUT)
+
+    return tree
+
+
+def get_chapter_content(chapter_id):
+    """Return a chapter with the full content of its sections, or None if the chapter does not exist."""
+    key = _content_key("chapter", chapter_id)
+    chapter_data = cache.get(key)
+
+    if chapter_data is None:
+        chapter = Chapter.objects.prefetch_related("sections").filter(id=chapter_id).first()
+
+        if chapter is None:
+            return None
+
+        chapter_data = {
+            "id": chapter.id,
+            "lesson_id": chapter.lesson_id,
+            "number": chapter.number,
+            "name": chapter.name,
+            "is_locked": chapter.is_locked,
+            "sections": [
+                {
+                    "id": section.id,
+                    "number": section.number,
+                    "name": section.name,
+                    "content": section.content,
+                }
+                for section in chapter.sections.all()
+            ]
+        }
+        cache.set(key, chapter_data, CONTENT_TIMEOUT)
+
+    return chapter_data
@@ -0,0 +1,63 @@
+import hashlib
+from django.db.models import Max, Count
+from django.utils import timezone
+from api.models import AssessmentResult, Assessment, UserAbility, LessonProgress
+from api.utils.cache_versions import get_class_assessments_version
+from api.utils.content_cache import get_content_version
+
+
+def make_etag(*stamps):
+    return hashlib.md5(":".join(str(stamp) for stamp in stamps).encode()).hexdigest()
+
+
+def _results_stamp(user):
+    """Changes whenever the user starts, saves or submits any assessment."""
+    stamp = AssessmentResult.objects.filter(user=user).aggregate(
+        latest_id=Max("id"),
+        last_activity=Max("last_activity")
+    )
+    return stamp["latest_id"], stamp["last_activity"]
+
+
+def class_etag(request):
+    user = request.user
+    return make_etag("class", user.id, user.full_name, user.enrolled_class_id, get_content_version())
+
+
+def dashboard_etag(request):
+    user = request.user
+    return make_etag("dashboard", user.id, user.full_name, get_content_version(), *_results_stamp(user))
+
+
+def lesson_etag(request, lesson_id):
+    user = request.user
+    progress = LessonProgress.objects.filter(user=user, lesson_id=lesson_id).values_list(
+        "current_chapter_id", "current_section_id"
+    ).first()
+    return make_etag("lesson", user.id, user.enrolled_class_id, lesson_id, get_content_version(), progress,
+                     *_results_stamp(user))
+
+
+def chapter_etag(request, lesson_id, chapter_id):
+    return make_etag("chapter", chapter_id, get_content_version())
+
+
+def ability_etag(request):
+    user = request.user
+    abilities = UserAbility.objects.filter(user=user).aggregate(updated_at=Max("updated_at"), total=Count("id"))
+    return make_etag("ability", user.id, abilities["updated_at"], abilities["total"], *_results_stamp(user))
+
+
+def class_assessments_etag(request):
+    user = request.user
+
+    # Deadlines passing flip ``is_open`` without any write, so they are part of the stamp
+    closed = Assessment.objects.filter(
+        source="teacher_generated",
+        class_owner_id=user.enrolled_class_id,
+        is_active=True,
+        deadline__lt=timezone.now()
+    ).count()
+
+    return make_etag("class-assessments", user.id, user.enrolled_class_id,
+                     get_class_assessments_version(user.enrolled_class_id), closed, *_results_stamp(user))
@@ -0,0 +1,22 @@
+import json
+from django.http import StreamingHttpResponse
+
+STREAM_TICK_INTERVAL = 5
+STREAM_MAX_DURATION = 60 * 15
+STREAM_RETRY_MS = 3000
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def event_stream_response(events):
+    """
+    Wrap an async generator of formatted events in a Server-Sent Events response. Streams end after
+    STREAM_MAX_DURATION and the browser's EventSource reconnects after STREAM_RETRY_MS.
+    """
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,104 @@
+import numpy as np
+from django.db.models import Q
+from api.models import Assessment, Question
+from api.utils.cache_versions import get_version
+from api.utils.question_sampler import allocate_quotas
+
+# Item parameters of the whole question bank as parallel arrays, rebuilt when the question bank version moves
+_item_bank = {'version': None}
+
+
+def get_item_bank():
+    version = get_version('question-bank')
+
+    if _item_bank.get('version') != version:
+        rows = list(Question.objects.order_by('id').values_list(
+            'id', 'category_id', 'difficulty', 'irt_difficulty', 'discrimination', 'guessing'
+        ))
+        ids, categories, levels, b, a, c = zip(*rows) if rows else ((),) * 6
+
+        _item_bank.update({
+            'version': version,
+            'ids': np.array(ids, dtype=object),
+            'categories': np.array(categories, dtype=np.int64),
+            'levels': np.array([level if level is not None else -1 for level in levels], dtype=np.int64),
+            'b': np.array(b, dtype=float),
+            'a': np.array(a, dtype=float),
+            'c': np.array(c, dtype=float),
+        })
+
+    return _item_bank
+
+
+def item_information(bank, theta):
+    """Fisher information of every item at ability ``theta`` under the 3PL model."""
+    a, b, c = bank['a'], bank['b'], bank['c']
+    p = c + (1 - c) / (1 + np.exp(-a * (theta - b)))
+    return a ** 2 * ((p - c) ** 2 / (1 - c) ** 2) * ((1 - p) / p)
+
+
+def get_seen_question_ids(class_id):
+    """Questions that already appeared on any assessment of a class."""
+    return set(
+        Assessment.questions.through.objects.filter(
+            Q(assessment__class_owner_id=class_id) | Q(assessment__instances__class_owner_id=class_id)
+        ).values_list('question_id', flat=True).distinct()
+    )
+
+
+def _deal(candidates, count, forms):
+    """
+    Deal the ``count * forms`` most informative candidates (already sorted by information) across forms in
+    snake order (0, 1, .., n-1, n-1, .., 0) so every form gets the same number of items and matched information.
+    """
+    dealt = [[] for _ in range(forms)]
+    for rank, index in enumerate(candidates[:count * forms]):
+        round_number, position = divmod(rank, forms)
+        dealt[position if round_number % 2 == 0 else forms - 1 - position].append(index)
+    return dealt
+
+
+def assemble_forms(blueprint, forms=1, exclude=()):
+    """
+    Assemble ``forms`` disjoint exam forms that satisfy ``blueprint``. Each category quota is split across
+    difficulty levels by the blueprint's mix, every cell takes the items most informative at the target ability,
+    and a cell short of items is topped up from the rest of its category. Returns a list of question id lists.
+    """
+    bank = get_item_bank()
+    information = item_information(bank, blueprint.target_ability)
+    available = ~np.isin(bank['ids'], list(exclude)) if exclude else np.ones(len(bank['ids']), dtype=bool)
+
+    difficulty_mix = {int(level): share for level, share in (blueprint.difficulty_mix or {}).items() if share}
+    form_items = [[] for _ in range(forms)]
+
+    for category_id, quota in blueprint.category_quotas.items():
+        quota = int(quota)
+        in_category = available & (bank['categories'] == int(category_id))
+        cells = allocate_quotas(difficulty_mix, quota) if difficulty_mix else {None: quota}
+        counts = [0] * forms
+
+        for level, cell_quota in cells.items():
+            in_cell = in_category if level is None else in_category & (bank['levels'] == level)
+            candidates = np.flatnonzero(in_cell)
+            candidates = candidates[np.argsort(-information[candidates], kind='stable')]
+
+            for form, dealt in enumerate(_deal(candidates, cell_quota, forms)):
+                form_items[form].extend(dealt)
+                counts[form] += len(dealt)
+            available[candidates[:cell_quota * forms]] = False
+
+        # Top up every form that came up short in this category from whatever is left of it
+        for form in range(forms):
+            shortfall = quota - counts[form]
+            if shortfall > 0:
+                candidates = np.flatnonzero(available & (bank['categories'] == int(category_id)))
+                candidates = candidates[np.argsort(-information[candidates], kind='stable')][:shortfall]
+                form_items[form].extend(candidates.tolist())
+                available[candidates] = False
+
+    return [bank['ids'][items].tolist() for items in form_items]
+
+
+def assemble_for_class(blueprint, class_id, forms=1):
+    exclude = get_seen_question_ids(class_id) if blueprint.exclude_seen and class_id else ()
+    return assemble_forms(blueprint, forms, exclude)
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from api.models import Question
+from api.utils.answer_key import get_answer_key_version, get_question_set_id
+
+EXAM_PAYLOAD_TIMEOUT = 60 * 60 * 24
+LOCAL_EXAM_PAYLOAD_LIMIT = 64
+
+# Shares the answer key's version stamp, so editing a question invalidates both
+_local_exam_payloads = {}
+
+
+def _serialize_question(question):
+    return {
+        'question_id': question["id"],
+        'image_url': question["image_url"],
+        'question_text': question["question_text"],
+        'choices': question["choices"] if isinstance(question["choices"], list)
+        else list(question["choices"].values()),
+    }
+
+
+def build_exam_payload(assessment_id):
+    """Serialize every question of an assessment and store the bundle in the shared cache."""
+    assessment_id = get_question_set_id(assessment_id)
+    version = get_answer_key_version(assessment_id)
+    questions = Question.objects.filter(assessments__id=assessment_id).order_by('id').values(
+        "id", "image_url", "question_text", "choices"
+    )
+    payload = {question["id"]: _serialize_question(question) for question in questions}
+
+    cache.set(f"exam-payload:{assessment_id}:{version}", payload, EXAM_PAYLOAD_TIMEOUT)
+    _remember(assessment_id, version, payload)
+
+    return payload
+
+
+def get_exam_payload(assessment_id):
+    """
+    Return ``{question_id: serialized question}`` for an assessment, building it only when neither this
+    process nor the shared cache has the current version. The returned dicts are shared, so copy before changing them.
+    """
+    assessment_id = get_question_set_id(assessment_id)
+    version = get_answer_key_version(assessment_id)
+
+    local = _local_exam_payloads.get(assessment_id)
+    if local and local[0] == version:
+        return local[1]
+
+    payload = cache.get(f"exam-payload:{assessment_id}:{version}")
+
+    if payload is None:
+        return build_exam_payload(assessment_id)
+
+    _remember(assessment_id, version, payload)
+    return payload
+
+
+def _remember(assessment_id, version, payload):
+    if len(_local_exam_payloads) >= LOCAL_EXAM_PAYLOAD_LIMIT:
+        _local_exam_payloads.clear()
+    _local_exam_payloads[assessment_id] = (version, payload)
+
+
+def render_exam_questions(payload, question_order, answers):
+    """
+    Lay out the cached questions in a student's order and merge their saved answers,
+    given as ``{question_id: (chosen_answer, time_spent)}``.
+    """
+    questions_data = []
+
+    for question_id in question_order:
+        question = payload.get(question_id)
+        if question is None:
+            continue
+
+        if question_id in answers:
+            chosen_answer, time_spent = answers[question_id]
+            question = {**question, 'chosen_answer': chosen_answer, 'time_spent': time_spent}
+
+        questions_data.append(question)
+
+    return questions_data
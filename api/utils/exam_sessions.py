@@ -0,0 +1,175 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DateTimeField, ExpressionWrapper, F, OuterRef, Subquery, IntegerField, Value
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+from api.ai.rl_agent import DQNAgent, update_rl_model
+from api.models import Answer, AssessmentResult
+from api.utils.autosave import flush_answers
+from api.utils.cache_versions import get_version, bump_version
+from api.utils.live_progress import mark_submitted
+
+SESSION_CLOCK_TIMEOUT = 60 * 60 * 4
+# Seconds after a session runs out during which the client's own submission is still accepted
+AUTO_SUBMISSION_GRACE_PERIOD = 30
+
+
+def get_expires_at(assessment, start_time):
+    """When a session started at ``start_time`` runs out, or None if the assessment has no time limit or deadline."""
+    end_times = []
+
+    if assessment.time_limit:
+        end_times.append(start_time + timedelta(seconds=assessment.time_limit))
+    if assessment.deadline:
+        end_times.append(assessment.deadline)
+
+    return min(end_times) if end_times else None
+
+
+def get_time_left(result, current_time=None):
+    """Whole seconds left on a session, or None when it never expires."""
+    if result.expires_at is None:
+        return None
+
+    current_time = current_time or timezone.now()
+    return int((result.expires_at - current_time).total_seconds())
+
+
+def has_expired(result, current_time=None, grace_period=0):
+    time_left = get_time_left(result, current_time)
+    return time_left is not None and time_left <= -grace_period
+
+
+def _session_clock_key(user_id, assessment_id):
+    version = get_version(f"exam-sessions:{assessment_id}")
+    return f"exam-session:{assessment_id}:{version}:user:{user_id}"
+
+
+def get_session_clock(user_id, assessment_id):
+    """
+    Return ``(result_id, status, expires_at)`` for a student's latest session on an assessment, or None if
+    there is none yet. Served from the cache so heartbeats do not reach the database while a session runs.
+    """
+    key = _session_clock_key(user_id, assessment_id)
+    clock = cache.get(key)
+
+    if clock is None:
+        clock = AssessmentResult.objects.filter(
+            user_id=user_id,
+            assessment_id=assessment_id
+        ).order_by('-id').values_list('id', 'status', 'expires_at').first()
+
+        if clock is None:
+            return None
+
+        cache.set(key, clock, SESSION_CLOCK_TIMEOUT)
+
+    return clock
+
+
+def forget_session_clock(user_id, assessment_id):
+    cache.delete(_session_clock_key(user_id, assessment_id))
+
+
+def get_session_status(result, current_time=None):
+    """The status of a session as of now, treating a timed-out session the sweeper has not reached yet as expired."""
+    if result is None:
+        return AssessmentResult.NOT_STARTED
+
+    if result.status == AssessmentResult.IN_PROGRESS and has_expired(result, current_time):
+        return AssessmentResult.EXPIRED
+
+    return result.status
+
+
+def reschedule_sessions(assessment):
+    """Recompute ``expires_at`` for the running sessions of an assessment after its time limit or deadline changed."""
+    if assessment.time_limit:
+        expires_at = ExpressionWrapper(
+            F('start_time') + timedelta(seconds=assessment.time_limit), output_field=DateTimeField()
+        )
+        if assessment.deadline:
+            expires_at = Least(expires_at, Value(assessment.deadline, output_field=DateTimeField()))
+    else:
+        expires_at = Value(assessment.deadline, output_field=DateTimeField())
+
+    rescheduled = AssessmentResult.objects.filter(
+        assessment=assessment,
+        status=AssessmentResult.IN_PROGRESS
+    ).update(expires_at=expires_at)
+    bump_version(f"exam-sessions:{assessment.id}")
+
+    return rescheduled
+
+
+def get_expired_sessions(current_time=None):
+    """Running sessions whose auto-submission window has closed, so the client can no longer submit them."""
+    current_time = current_time or timezone.now()
+    return AssessmentResult.objects.filter(
+        status=AssessmentResult.IN_PROGRESS,
+        expires_at__lte=current_time - timedelta(seconds=AUTO_SUBMISSION_GRACE_PERIOD)
+    )
+
+
+def update_session_abilities(results):
+    """
+    The ability update every finished session gets, whether it was submitted or expired: each student's
+    per-category Elo abilities move with their answers and the shared RL agent, trained on them, is saved once.
+    """
+    rl_agent = DQNAgent()
+
+    for result in results:
+        if result.user:
+            update_rl_model(rl_agent, assessment_id=result.assessment_id, user=result.user)
+
+    rl_agent.save_state_to_db()
+
+
+def expire_sessions(results, update_abilities=True):
+    """
+    Finalize timed-out sessions in bulk: flush their buffered answers, rescore them from their Answer rows,
+    mark them expired and feed them to the ability model. Sessions another worker is finalizing are skipped.
+    Returns the expired results.
+    """
+    result_ids = [result.pk for result in results]
+
+    for result in AssessmentResult.objects.filter(pk__in=result_ids, answer_drafts__isnull=False).distinct():
+        flush_answers(result)
+
+    correct_answers = Answer.objects.filter(
+        assessment_result=OuterRef('pk'),
+        is_correct=True
+    ).values('assessment_result').annotate(total=Count('id')).values('total')
+    current_time = timezone.now()
+
+    with transaction.atomic():
+        expired = list(
+            AssessmentResult.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+                pk__in=result_ids,
+                status=AssessmentResult.IN_PROGRESS
+            ).annotate(
+                correct_answers=Coalesce(Subquery(correct_answers, output_field=IntegerField()), 0)
+            ).select_related('user')
+        )
+
+        for result in expired:
+            result.score = result.correct_answers
+            result.status = AssessmentResult.EXPIRED
+            result.is_submitted = True
+            result.time_taken = max(int((result.expires_at - result.start_time).total_seconds()), 0)
+            # bulk_update skips auto_now, and the results ETags change with the latest last_activity
+            result.last_activity = current_time
+
+        AssessmentResult.objects.bulk_update(
+            expired, ['score', 'status', 'is_submitted', 'time_taken', 'last_activity']
+        )
+
+    for result in expired:
+        forget_session_clock(result.user_id, result.assessment_id)
+        mark_submitted(result.assessment_id, result.user_id)
+
+    if update_abilities and expired:
+        update_session_abilities(expired)
+
+    return expired
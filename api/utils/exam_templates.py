@@ -0,0 +1,56 @@
+from django.db import IntegrityError
+from api.models import Assessment
+from api.utils.assessment_factory import create_assessment_with_questions
+from api.utils.util import get_default_question_ids
+
+INITIAL_EXAM_TEMPLATE = 'Initial Assessment Template'
+FINAL_EXAM_TEMPLATE = 'Final Assessment Template'
+DEFAULT_EXAM_TIME_LIMIT = 8100
+
+
+def _get_active_template(template_name):
+    return Assessment.objects.filter(name=template_name, is_template=True, is_active=True).first()
+
+
+def get_exam_template(template_name):
+    """
+    Return ``(template_id, category_ids)`` of the shared question-bank template for the default initial or final
+    exam, creating it from question_ids.txt the first time. To roll out a new question list, set the old
+    template's ``is_active`` to False; classes created afterwards get a new template. A unique constraint keeps
+    one active template per name, so a worker that loses the race to create it uses the winner's.
+    """
+    template = _get_active_template(template_name)
+
+    if template is None:
+        try:
+            template, _ = create_assessment_with_questions(
+                get_default_question_ids(),
+                name=template_name,
+                type='exam',
+                question_source='previous_exam',
+                source='admin_generated',
+                time_limit=DEFAULT_EXAM_TIME_LIMIT,
+                is_template=True,
+            )
+        except IntegrityError:
+            template = _get_active_template(template_name)
+
+    return template.id, list(template.selected_categories.values_list('id', flat=True))
+
+
+def create_exam_from_template(template_name, **fields):
+    """
+    Create a class exam that uses a template's questions: one assessment row and its few category links,
+    however many questions the template has.
+    """
+    template_id, category_ids = get_exam_template(template_name)
+
+    exam, _ = create_assessment_with_questions(
+        [],
+        category_ids=category_ids,
+        template_id=template_id,
+        time_limit=DEFAULT_EXAM_TIME_LIMIT,
+        **fields
+    )
+
+    return exam
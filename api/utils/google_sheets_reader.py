@@ -2,7 +2,13 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from api.models import Question, Category, Lesson, Chapter, Section
+from api.utils.content_cache import invalidate_content
+from api.utils.answer_key import invalidate_answer_keys
+from api.utils.question_sampler import invalidate_question_pools
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 CATEGORY_MAPPING = {
     "Basic Theory": 1,
@@ -34,7 +40,7 @@ def get_sheet_data(spreadsheet_id, range_name):
         result = sheet.values().get(spreadsheetId=spreadsheet_id, range=range_name).execute()
         return result.get('values', [])
     except HttpError as err:
-        print(f"Error fetching sheet data: {err}")
+        logger.error("Error fetching sheet data: %s", err)
         return None
 
 
@@ -75,7 +81,7 @@ def upload_questions_from_sheet(spreadsheet_id, range_name):
 
             category_id = CATEGORY_MAPPING.get(category_name, None)
             if category_id is None:
-                print(f"Category '{category_name}' not found.")
+                logger.warning("Category '%s' not found.", category_name)
                 continue
 
             category = Category.objects.get(id=category_id)
@@ -96,7 +102,7 @@ def upload_questions_from_sheet(spreadsheet_id, range_name):
                     irt_difficulty=irt_difficulty
                 )
 
-                print('Updated Question', question_id)
+                logger.info('Updated question %s', question_id)
 
             else:
                 # Create the question if it does not exist
@@ -114,6 +120,9 @@ def upload_questions_from_sheet(spreadsheet_id, range_name):
                     irt_difficulty = irt_difficulty
                 )
 
+        invalidate_answer_keys()
+        invalidate_question_pools()
+
 
 def upload_ai_questions_from_sheet(spreadsheet_id, range_name):
     sheet_data = get_sheet_data(spreadsheet_id, range_name)
@@ -167,6 +176,9 @@ def upload_ai_questions_from_sheet(spreadsheet_id, range_name):
                     is_ai_generated=True
                 )
 
+        invalidate_answer_keys()
+        invalidate_question_pools()
+
 
 def upload_pretest_from_sheet(spreadsheet_id, range_name):
     sheet_data = get_sheet_data(spreadsheet_id, range_name)
@@ -194,7 +206,7 @@ def upload_pretest_from_sheet(spreadsheet_id, range_name):
 
             category_id = CATEGORY_MAPPING.get(category_name, None)
             if category_id is None:
-                print(f"Category '{category_name}' not found.")
+                logger.warning("Category '%s' not found.", category_name)
                 continue
 
             category = Category.objects.get(id=category_id)
@@ -212,7 +224,7 @@ def upload_pretest_from_sheet(spreadsheet_id, range_name):
                     choices=choices,
                     correct_answer=correct_answer
                 )
-                print('Updated Question', question_id)
+                logger.info('Updated question %s', question_id)
 
             else:
                 Question.objects.create(
@@ -226,7 +238,10 @@ def upload_pretest_from_sheet(spreadsheet_id, range_name):
                     choices=choices,
                     correct_answer=correct_answer
                 )
-                print('Created Question', question_id)
+                logger.info('Created question %s', question_id)
+
+        invalidate_answer_keys()
+        invalidate_question_pools()
 
 
 def upload_lessons_from_sheet(lesson_spreadsheet_id, lesson_range, chapter_spreadsheet_id, chapter_range,
@@ -251,7 +266,7 @@ def upload_lessons_from_sheet(lesson_spreadsheet_id, lesson_range, chapter_sprea
         Category.objects.get_or_create(name=category)
 
     if not lesson_data or not chapter_data or not section_data:
-        print("Missing data from one or more sheets.")
+        logger.error("Missing data from one or more sheets.")
         return
 
     lessons = {}
@@ -302,5 +317,7 @@ def upload_lessons_from_sheet(lesson_spreadsheet_id, lesson_range, chapter_sprea
                     content=content
                 )
 
-            print(
-                f"Uploaded: {chapter.lesson.name} -> {chapter.number}. {chapter.name} -> Section {section_number}: {section_name}")
\ No newline at end of file
+            logger.info("Uploaded: %s -> %s. %s -> Section %s: %s",
+                        chapter.lesson.name, chapter.number, chapter.name, section_number, section_name)
+
+    invalidate_content()
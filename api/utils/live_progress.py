@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from api.utils.answer_key import get_answer_key
+
+LIVE_PROGRESS_TIMEOUT = 60 * 60 * 6
+
+
+# Every fact is its own key that is only ever set, never read and written back, so concurrent autosaves and a
+# racing submit cannot overwrite each other's progress
+def _progress_key(assessment_id, user_id, fact):
+    return f"live-progress:{assessment_id}:user:{user_id}:{fact}"
+
+
+def _answered_key(assessment_id, user_id, question_id):
+    return _progress_key(assessment_id, user_id, f"answered:{question_id}")
+
+
+def mark_started(assessment_id, user_id):
+    cache.set(_progress_key(assessment_id, user_id, 'started'), True, LIVE_PROGRESS_TIMEOUT)
+
+
+def record_answers(assessment_id, user_id, answers):
+    """Note which questions a student has answered so far, as reported by the autosave path."""
+    answer_key = get_answer_key(assessment_id)
+    question_ids = {
+        answer_data.get('question_id') for answer_data in answers
+        if answer_data.get('question_id') in answer_key and answer_data.get('answer')
+    }
+
+    if not question_ids:
+        return
+
+    progress = {_answered_key(assessment_id, user_id, question_id): True for question_id in question_ids}
+    progress[_progress_key(assessment_id, user_id, 'started')] = True
+    cache.set_many(progress, LIVE_PROGRESS_TIMEOUT)
+
+
+def mark_submitted(assessment_id, user_id):
+    cache.set_many({
+        _progress_key(assessment_id, user_id, 'started'): True,
+        _progress_key(assessment_id, user_id, 'submitted'): True,
+    }, LIVE_PROGRESS_TIMEOUT)
+
+
+def get_live_progress(assessment_id, user_ids):
+    """Summarise the cached progress of the given students on an assessment with a single cache read."""
+    question_ids = list(get_answer_key(assessment_id))
+    keys = {}
+    for user_id in user_ids:
+        keys[_progress_key(assessment_id, user_id, 'started')] = (user_id, 'started')
+        keys[_progress_key(assessment_id, user_id, 'submitted')] = (user_id, 'submitted')
+        for question_id in question_ids:
+            keys[_answered_key(assessment_id, user_id, question_id)] = (user_id, 'answered')
+
+    progress = {}
+    for key in cache.get_many(keys.keys()):
+        user_id, fact = keys[key]
+        student = progress.setdefault(user_id, {'student_id': user_id, 'answered': 0, 'submitted': False})
+
+        if fact == 'answered':
+            student['answered'] += 1
+        elif fact == 'submitted':
+            student['submitted'] = True
+
+    students = sorted(progress.values(), key=lambda student: student['student_id'])
+
+    return {
+        'started': len(students),
+        'submitted': sum(student['submitted'] for student in students),
+        'students': students,
+    }
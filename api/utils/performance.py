@@ -0,0 +1,171 @@
+import os
+import socket
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+PERFORMANCE_SAMPLE_RATE = getattr(settings, 'PERFORMANCE_SAMPLE_RATE', 0.1)
+PERFORMANCE_FLUSH_INTERVAL = getattr(settings, 'PERFORMANCE_FLUSH_INTERVAL', 15)
+PERFORMANCE_SNAPSHOT_TIMEOUT = 60 * 60
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRIC_PREFIX = 'reviewsystem'
+
+WORKERS_KEY = 'performance:workers'
+WORKER_KEY = f'performance:{socket.gethostname()}:{os.getpid()}'
+
+# {route: aggregated stats} for this process, published to the shared cache every PERFORMANCE_FLUSH_INTERVAL
+_metrics = {}
+_lock = threading.Lock()
+_last_flush = [0.0]
+
+
+class RequestProfile:
+    """``connection.execute_wrapper`` hook timing every statement of one request and keeping the slowest."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += elapsed
+            if elapsed > self.slowest_time:
+                self.slowest_time = elapsed
+                self.slowest_sql = sql
+
+    def server_timing(self, duration):
+        """``Server-Timing`` header value; durations are in milliseconds as the header expects."""
+        return (f'app;dur={duration * 1000:.1f}, '
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+                f'db-slowest;dur={self.slowest_time * 1000:.1f}')
+
+
+def record(route, method, status_code, profile, duration):
+    with _lock:
+        stats = _metrics.setdefault((route, method), {
+            'requests': 0,
+            'errors': 0,
+            'duration': 0.0,
+            'buckets': [0] * len(DURATION_BUCKETS),
+            'queries': 0,
+            'db_time': 0.0,
+            'slowest_time': 0.0,
+            'slowest_sql': None,
+        })
+
+        stats['requests'] += 1
+        stats['errors'] += status_code >= 500
+        stats['duration'] += duration
+        stats['queries'] += profile.queries
+        stats['db_time'] += profile.db_time
+
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if duration <= bound:
+                stats['buckets'][index] += 1
+
+        if profile.slowest_time > stats['slowest_time']:
+            stats['slowest_time'] = profile.slowest_time
+            stats['slowest_sql'] = profile.slowest_sql
+
+    if time.monotonic() - _last_flush[0] >= PERFORMANCE_FLUSH_INTERVAL:
+        flush()
+
+
+def flush():
+    """Publish this process's totals to the shared cache, where /metrics merges every worker's snapshot."""
+    _last_flush[0] = time.monotonic()
+
+    with _lock:
+        snapshot = [[route, method, dict(stats, buckets=list(stats['buckets']))]
+                    for (route, method), stats in _metrics.items()]
+
+    cache.set(WORKER_KEY, snapshot, PERFORMANCE_SNAPSHOT_TIMEOUT)
+
+    # Re-registering on every flush heals a registration lost to a concurrent update
+    workers = cache.get(WORKERS_KEY) or []
+    if WORKER_KEY not in workers:
+        cache.set(WORKERS_KEY, workers + [WORKER_KEY], None)
+
+
+def collect():
+    """
+    Sum the snapshots of every worker that flushed to this cache within the snapshot timeout. Returns the merged
+    metrics and the number of workers they cover.
+    """
+    flush()
+
+    workers = cache.get(WORKERS_KEY) or []
+    snapshots = cache.get_many(workers)
+
+    if len(snapshots) < len(workers):
+        # Drop workers whose snapshot expired (restarted or scaled-down processes)
+        cache.set(WORKERS_KEY, [worker for worker in workers if worker in snapshots], None)
+
+    merged = {}
+    for snapshot in snapshots.values():
+        for route, method, stats in snapshot:
+            total = merged.get((route, method))
+            if total is None:
+                merged[(route, method)] = dict(stats, buckets=list(stats['buckets']))
+                continue
+
+            for field in ('requests', 'errors', 'duration', 'queries', 'db_time'):
+                total[field] += stats[field]
+            total['buckets'] = [a + b for a, b in zip(total['buckets'], stats['buckets'])]
+            if stats['slowest_time'] > total['slowest_time']:
+                total['slowest_time'] = stats['slowest_time']
+                total['slowest_sql'] = stats['slowest_sql']
+
+    return merged, len(snapshots)
+
+
+def _labels(route, method, **extra):
+    labels = {'route': route, 'method': method, **extra}
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def render_prometheus(metrics, workers):
+    """Prometheus text exposition (format 0.0.4) of the merged metrics. Counts cover sampled requests only."""
+    lines = [
+        f'# HELP {METRIC_PREFIX}_performance_sample_rate Share of requests that are profiled.',
+        f'# TYPE {METRIC_PREFIX}_performance_sample_rate gauge',
+        f'{METRIC_PREFIX}_performance_sample_rate {PERFORMANCE_SAMPLE_RATE}',
+        f'# HELP {METRIC_PREFIX}_performance_workers Worker processes whose metrics are summed here.',
+        f'# TYPE {METRIC_PREFIX}_performance_workers gauge',
+        f'{METRIC_PREFIX}_performance_workers {workers}',
+    ]
+
+    families = (
+        ('http_requests_sampled_total', 'counter', 'Sampled requests.', 'requests'),
+        ('http_request_errors_sampled_total', 'counter', 'Sampled requests that returned a 5xx.', 'errors'),
+        ('db_queries_sampled_total', 'counter', 'SQL statements run by sampled requests.', 'queries'),
+        ('db_duration_seconds_sampled_total', 'counter', 'Time sampled requests spent in SQL.', 'db_time'),
+        ('db_slowest_query_seconds', 'gauge', 'Slowest SQL statement seen on the route.', 'slowest_time'),
+    )
+    for name, kind, description, field in families:
+        lines += [f'# HELP {METRIC_PREFIX}_{name} {description}', f'# TYPE {METRIC_PREFIX}_{name} {kind}']
+        lines += [
+            f'{METRIC_PREFIX}_{name}{_labels(route, method)} {stats[field]}'
+            for (route, method), stats in sorted(metrics.items())
+        ]
+
+    name = f'{METRIC_PREFIX}_http_request_duration_seconds'
+    lines += [f'# HELP {name} Latency of sampled requests.', f'# TYPE {name} histogram']
+    for (route, method), stats in sorted(metrics.items()):
+        for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+            lines.append(f'{name}_bucket{_labels(route, method, le=bound)} {count}')
+        lines.append(f'{name}_bucket{_labels(route, method, le="+Inf")} {stats["requests"]}')
+        lines.append(f'{name}_sum{_labels(route, method)} {stats["duration"]}')
+        lines.append(f'{name}_count{_labels(route, method)} {stats["requests"]}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,87 @@
+import numpy as np
+from django.db.models import Count
+from api.models import Assessment, Question
+from api.utils.cache_versions import get_version, bump_version
+from api.utils.answer_key import get_question_set_id
+
+# {category_id: array of question ids}, rebuilt when the question bank version moves
+_question_pools = {'version': None, 'pools': {}}
+
+
+def invalidate_question_pools():
+    return bump_version('question-bank')
+
+
+def get_question_pools():
+    """Question ids grouped by category, loaded with one query and kept in this process."""
+    version = get_version('question-bank')
+
+    if _question_pools['version'] != version:
+        grouped = {}
+        for category_id, question_id in Question.objects.values_list('category_id', 'id').order_by('id'):
+            grouped.setdefault(category_id, []).append(question_id)
+
+        _question_pools['pools'] = {category_id: np.array(ids) for category_id, ids in grouped.items()}
+        _question_pools['version'] = version
+
+    return _question_pools['pools']
+
+
+def get_exam_blueprint(assessment_id):
+    """Number of questions per category on an assessment, e.g. the class's initial exam."""
+    return dict(
+        Assessment.questions.through.objects.filter(assessment_id=get_question_set_id(assessment_id))
+        .values('question__category_id')
+        .annotate(total=Count('question_id'))
+        .values_list('question__category_id', 'total')
+    )
+
+
+def allocate_quotas(weights, k):
+    """Split ``k`` items across categories in proportion to ``weights`` (largest remainder method)."""
+    category_ids = list(weights)
+    shares = np.array([weights[category_id] for category_id in category_ids], dtype=float)
+    shares = shares / shares.sum() * k
+
+    quotas = np.floor(shares).astype(int)
+    leftover = k - quotas.sum()
+    quotas[np.argsort(quotas - shares)[:leftover]] += 1
+
+    return dict(zip(category_ids, quotas.tolist()))
+
+
+def sample_question_ids(k, blueprint=None, rng=None):
+    """
+    Draw ``k`` distinct question ids stratified by category, in proportion to ``blueprint`` ({category_id: weight})
+    or to the size of each category when there is none. Categories short of their quota are topped up from the rest.
+    """
+    rng = rng or np.random.default_rng()
+    pools = get_question_pools()
+
+    if not pools:
+        return []
+
+    weights = {
+        category_id: weight for category_id, weight in (blueprint or {}).items()
+        if weight and category_id in pools
+    } or {category_id: len(pool) for category_id, pool in pools.items()}
+
+    chosen = []
+    for category_id, quota in allocate_quotas(weights, k).items():
+        pool = pools[category_id]
+        picks = rng.choice(len(pool), size=min(quota, len(pool)), replace=False)
+        chosen.extend(pool[picks].tolist())
+
+    shortfall = k - len(chosen)
+    if shortfall > 0:
+        remaining = np.setdiff1d(np.concatenate(list(pools.values())), chosen)
+        chosen.extend(rng.choice(remaining, size=min(shortfall, len(remaining)), replace=False).tolist())
+
+    return rng.permutation(chosen).tolist()
+
+
+def sample_questions(k, blueprint=None, rng=None):
+    """Like ``sample_question_ids`` but fetches only the chosen Question rows, in sampled order."""
+    question_ids = sample_question_ids(k, blueprint, rng)
+    questions = Question.objects.in_bulk(question_ids)
+    return [questions[question_id] for question_id in question_ids if question_id in questions]
@@ -0,0 +1,105 @@
+import time
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework import status
+from api.models import Assessment, AssessmentResult
+
+
+class Cooldown:
+    """
+    Lets a user through once per ``seconds``. The end of the running cooldown lives in the cache; on a miss it is
+    rebuilt once from ``last_used(user, since)`` and cached, including the "no cooldown" answer.
+    """
+
+    def __init__(self, scope, seconds, last_used, error, status_code=status.HTTP_429_TOO_MANY_REQUESTS):
+        self.scope = scope
+        self.seconds = seconds
+        self.last_used = last_used
+        self.error = error
+        self.status_code = status_code
+
+    def _key(self, user):
+        return f"cooldown:{self.scope}:user:{user.id}"
+
+    def remaining(self, user):
+        key = self._key(user)
+        ends_at = cache.get(key)
+
+        if ends_at is None:
+            last_used = self.last_used(user, timezone.now() - timedelta(seconds=self.seconds))
+            ends_at = last_used.timestamp() + self.seconds if last_used else 0
+            cache.set(key, ends_at, self.seconds)
+
+        return max(ends_at - time.time(), 0)
+
+    def allows(self, user, **view_kwargs):
+        return self.remaining(user) <= 0
+
+    def record(self, user, **view_kwargs):
+        cache.set(self._key(user), time.time() + self.seconds, self.seconds)
+
+
+class AttemptLimit:
+    """
+    Caps how many attempts a user gets at one target (a chapter, an assessment). Nothing is cached: attempts are
+    the AssessmentResult rows the views create, counted on every check with ``count_attempts(user, target_id)``,
+    an indexed COUNT, so every worker enforces the same limit and there is nothing to record.
+    """
+
+    def __init__(self, max_attempts, target, count_attempts, error, status_code=status.HTTP_403_FORBIDDEN):
+        self.max_attempts = max_attempts
+        self.target = target
+        self.count_attempts = count_attempts
+        self.error = error
+        self.status_code = status_code
+
+    def count(self, user, target_id):
+        return self.count_attempts(user, target_id)
+
+    def remaining(self, user, target_id):
+        return max(self.max_attempts - self.count(user, target_id), 0)
+
+    def allows(self, user, **view_kwargs):
+        return self.count(user, view_kwargs[self.target]) < self.max_attempts
+
+
+def _last_practice_quiz(user, since):
+    return Assessment.objects.filter(created_by=user, created_at__gte=since).aggregate(
+        last=Max('created_at')
+    )['last']
+
+
+def _count_chapter_attempts(user, chapter_id):
+    return AssessmentResult.objects.filter(
+        user=user,
+        assessment__chapter_id=chapter_id,
+        assessment__class_owner_id=user.enrolled_class_id
+    ).count()
+
+
+def _count_assessment_attempts(user, assessment_id):
+    return AssessmentResult.objects.filter(user=user, assessment_id=assessment_id).count()
+
+
+PRACTICE_QUIZ_COOLDOWN = Cooldown(
+    'practice-quiz',
+    seconds=15 * 60,
+    last_used=_last_practice_quiz,
+    error='Student has already taken a quiz within 15 minutes. Please try again later!',
+)
+
+CHAPTER_ASSESSMENT_ATTEMPTS = AttemptLimit(
+    max_attempts=3,
+    target='chapter_id',
+    count_attempts=_count_chapter_attempts,
+    error='Maximum of 3 quiz attempts reached.',
+)
+
+TEACHER_ASSESSMENT_ATTEMPTS = AttemptLimit(
+    max_attempts=3,
+    target='assessment_id',
+    count_attempts=_count_assessment_attempts,
+    error='Maximum of 3 quiz attempts reached.',
+)
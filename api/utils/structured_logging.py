@@ -0,0 +1,58 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+ABILITY_TRACE_LOGGER = 'api.ability_trace'
+
+# Attributes every LogRecord has; anything else on a record came from ``extra=`` and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, the ``extra=`` fields and the traceback if any."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingHandler(QueueHandler):
+    """
+    Format on the calling thread, write on a background thread. Request handlers only pay for putting the
+    formatted line on an in-memory queue; the stream I/O happens in a ``QueueListener`` started per process.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        target = logging.StreamHandler(stream or sys.stderr)
+        self.listener = QueueListener(self.queue, target)
+        self.listener.start()
+        # Drain what is still queued when the worker exits
+        atexit.register(self.listener.stop)
+
+
+class SampleFilter(logging.Filter):
+    """Let through roughly ``rate`` of the records; a rate of 0 drops everything."""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return self.rate >= 1 or random.random() < self.rate
+
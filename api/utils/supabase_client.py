@@ -1,6 +1,28 @@
-from supabase import create_client
+from contextlib import asynccontextmanager
+from supabase import create_client, acreate_client, AsyncClientOptions
 from django.conf import settings
 
 
 def get_supabase_client():
     return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+
+
+@asynccontextmanager
+async def async_supabase_client():
+    """
+    A Supabase client for one request, used as ``async with async_supabase_client() as client``. A client per
+    request keeps each user's session apart, and closing it on the way out releases its HTTP connection pool.
+    Without auto refresh and persistence a signed-in client does not leave a refresh task running on the event
+    loop after the response is sent.
+    """
+    client = await acreate_client(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_ANON_KEY,
+        AsyncClientOptions(auto_refresh_token=False, persist_session=False),
+    )
+
+    try:
+        yield client
+    finally:
+        # Only the auth client is used; the others open their connection pools lazily
+        await client.auth.close()
@@ -1,5 +1,30 @@
+import os
 import random
 import string
+from functools import lru_cache
+
+QUESTION_IDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "question_ids.txt")
+
+
 def generate_class_code():
     """Generate a random 8-character alphanumeric code for the class."""
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
\ No newline at end of file
+    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+
+
+def generate_question_seed():
+    """Generate a random seed for a student's question order that fits a signed 64-bit column."""
+    return random.SystemRandom().getrandbits(63)
+
+
+def seeded_question_order(question_ids, seed):
+    """Shuffle the sorted question ids with a PRNG seeded by ``seed``; the same seed always gives the same order."""
+    question_order = sorted(question_ids)
+    random.Random(seed).shuffle(question_order)
+    return question_order
+
+
+@lru_cache(maxsize=None)
+def get_default_question_ids():
+    """Question ids of the default initial and final exam, read from question_ids.txt once per process."""
+    with open(QUESTION_IDS_PATH, "r") as file:
+        return tuple(line.strip() for line in file if line.strip())
@@ -1,17 +1,26 @@
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from api.utils.supabase_client import get_supabase_client
+from api.utils.supabase_client import get_supabase_client, async_supabase_client
 from api.models import User, Category, UserAbility
-from api.decorators import auth_required
+from api.decorators import async_auth_required, performance_sample_rate, set_auth_cookies
+from asgiref.sync import sync_to_async
 from django.db import transaction
 from django.utils.timezone import now
 from datetime import timedelta
 from django.conf import settings
-import time
 from django.shortcuts import render, redirect
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib import messages
 from api.forms import PasswordUpdateForm
+from api.utils.performance import collect, render_prometheus, PERFORMANCE_SAMPLE_RATE
+import hmac
+import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def load_accepted_emails():
@@ -21,7 +30,7 @@ def load_accepted_emails():
         with open(accepted_emails_path, "r") as f:
             return set(email.strip().lower() for email in f.readlines())
     except FileNotFoundError:
-        print("Did not find accepted emails file.")
+        logger.warning("Did not find accepted emails file.")
         return set()
 
 
@@ -98,125 +107,130 @@ def register_teacher(request):
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-@api_view(['POST'])
-def register_user(request):
-    data = request.data
-    email = data.get('email', '').lower().strip()
+def _request_data(request):
+    """The parsed JSON (or form) body. Async views are plain Django views, without DRF's ``request.data``."""
+    if request.content_type != 'application/json':
+        return request.POST
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+    return data if isinstance(data, dict) else None
+
+
+def _create_student(supabase_user_id, email, first_name, last_name):
+    with transaction.atomic():
+        new_user = User.objects.create(
+            supabase_user_id=supabase_user_id,
+            email=email,
+            first_name=first_name,
+            last_name=last_name,
+            role='student',
+            verification_sent_at=now(),
+        )
+        categories = Category.objects.all()
+        user_abilities = [
+            UserAbility(user=new_user, category=category)
+            for category in categories
+        ]
+        UserAbility.objects.bulk_create(user_abilities)
+
+    return new_user
+
 
-    if not is_accepted_email(email):  # Add this new function (shown below)
-        return Response({'error': 'Only @cit.edu emails or pre-approved emails are allowed'},
-                        status=status.HTTP_400_BAD_REQUEST)
+@csrf_exempt
+@require_POST
+async def register_user(request):
+    data = _request_data(request)
+    if data is None:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
 
-    if not is_accepted_email(email):  # Add this new function (shown below)
-        return Response({'error': 'Only @cit.edu emails or pre-approved emails are allowed'},
-                        status=status.HTTP_400_BAD_REQUEST)
+    email = (data.get('email') or '').lower().strip()
+
+    if not is_accepted_email(email):
+        return JsonResponse({'error': 'Only @cit.edu emails or pre-approved emails are allowed'},
+                            status=status.HTTP_400_BAD_REQUEST)
 
     password = data.get('password')
     first_name = data.get('first_name')
     last_name = data.get('last_name')
-    supabase_client = get_supabase_client()
 
-    if User.objects.filter(email=email).exists():
-        return Response({'error': 'Email is already registered'}, status=status.HTTP_400_BAD_REQUEST)
+    if await User.objects.filter(email=email).aexists():
+        return JsonResponse({'error': 'Email is already registered'}, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        auth_response = supabase_client.auth.sign_up({
-            'email': email,
-            'password': password,
-            'options': {
-                'email_redirect_to': 'https://nits-adaptive-nine.vercel.app/login',
-            }
-        })
+    async with async_supabase_client() as supabase_client:
+        try:
+            auth_response = await supabase_client.auth.sign_up({
+                'email': email,
+                'password': password,
+                'options': {
+                    'email_redirect_to': 'https://nits-adaptive-nine.vercel.app/login',
+                }
+            })
 
-        supabase_user = getattr(auth_response, 'user', None)
-        if not supabase_user or not supabase_user.id:
-            return Response({'error': 'User registration failed on Supabase'}, status=status.HTTP_400_BAD_REQUEST)
+            supabase_user = getattr(auth_response, 'user', None)
+            if not supabase_user or not supabase_user.id:
+                return JsonResponse({'error': 'User registration failed on Supabase'},
+                                    status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            new_user = User.objects.create(
-                supabase_user_id=supabase_user.id,
-                email=email,
-                first_name=first_name,
-                last_name=last_name,
-                role='student',
-                verification_sent_at=now(),
-            )
-            categories = Category.objects.all()
-            user_abilities = [
-                UserAbility(user=new_user, category=category)
-                for category in categories
-            ]
-            UserAbility.objects.bulk_create(user_abilities)
+            await sync_to_async(_create_student)(supabase_user.id, email, first_name, last_name)
 
-        return Response({'message': 'User registered successfully!'}, status=status.HTTP_201_CREATED)
+            return JsonResponse({'message': 'User registered successfully!'}, status=status.HTTP_201_CREATED)
 
-    except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-@api_view(['POST'])
-def login_user(request):
-    data = request.data
+@csrf_exempt
+@require_POST
+async def login_user(request):
+    data = _request_data(request)
+    if data is None:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+
     email = data.get('email')
     password = data.get('password')
-    supabase = get_supabase_client()
-    user = User.objects.filter(email=email).first()
+    user = await User.objects.filter(email=email).afirst()
 
     if not user:
-        return Response({'error': 'User not found'}, status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse({'error': 'User not found'}, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
+    async with async_supabase_client() as supabase:
+        try:
+            # Attempt login with Supabase
+            auth_response = await supabase.auth.sign_in_with_password({
+                'email': email,
+                'password': password
+            })
 
-        # Attempt login with Supabase
-        auth_response = supabase.auth.sign_in_with_password({
-            'email': email,
-            'password': password
-        })
+            # If user exists but email is not confirmed, update status
+            if not user.email_confirmed:
+                user.email_confirmed = True
+                await user.asave()
 
-        # If user exists but email is not confirmed, update status
-        if not user.email_confirmed:
-            user.email_confirmed = True
-            user.save()
-
-        # Create response with tokens
-        response = Response({
-            'message': 'Login successful',
-            'role': user.role,
-            'first_name': user.first_name,
-            'last_name': user.last_name
-        }, status=status.HTTP_200_OK)
-
-        response.set_cookie(
-            key='access_token',
-            value=auth_response.session.access_token,
-            httponly=True,
-            secure=True,
-            samesite='None',
-        )
+            response = JsonResponse({
+                'message': 'Login successful',
+                'role': user.role,
+                'first_name': user.first_name,
+                'last_name': user.last_name
+            }, status=status.HTTP_200_OK)
 
-        response.set_cookie(
-            key='refresh_token',
-            value=auth_response.session.refresh_token,
-            httponly=True,
-            secure=True,
-            samesite='None',
-            max_age=2592000,
-        )
-
-        return response
+            set_auth_cookies(response, auth_response.session.access_token, auth_response.session.refresh_token)
+            return response
 
-    except Exception as e:
-        error_message = str(e).lower()
+        except Exception as e:
+            error_message = str(e).lower()
 
-        print(str(e))
+            logger.info("Login failed: %s", e)
 
-        if "invalid login credentials" in error_message:
-            return Response({'error': 'Email or Password is incorrect'}, status=status.HTTP_400_BAD_REQUEST)
+            if "invalid login credentials" in error_message:
+                return JsonResponse({'error': 'Email or Password is incorrect'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if user and not user.email_confirmed:
-            try:
+            if not user.email_confirmed:
                 if not user.verification_sent_at or user.verification_sent_at < now() - timedelta(hours=24):
-                    supabase.auth.resend(
+                    await supabase.auth.resend(
                         {
                             "type": "signup",
                             "email": email,
@@ -225,18 +239,16 @@ def login_user(request):
                             },
                         }
                     )
-                    print("Sent a new email")
+                    logger.info("Resent verification email to user %s", user.id)
                     user.verification_sent_at = now()
-                    user.save()
+                    await user.asave()
 
-                return Response(
+                return JsonResponse(
                     {'error': 'Please verify your email. A new verification email has been sent.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
-            except User.DoesNotExist:
-                return Response({'error': 'User not found'}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({'error': f'Error: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+            return JsonResponse({'error': f'Error: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['GET'])
@@ -284,9 +296,9 @@ def update_password(request):
     return render(request, 'password_update_form.html', {'form': form})
 
 
-@api_view(['GET'])
-@auth_required()
-def get_user_details(request):
+@require_GET
+@async_auth_required()
+async def get_user_details(request):
     user: User = request.user
 
     user_data = {
@@ -296,25 +308,28 @@ def get_user_details(request):
         'role': user.role,
     }
 
-    return Response(user_data, status=status.HTTP_200_OK)
+    return JsonResponse(user_data, status=status.HTTP_200_OK)
 
 
-@api_view(['POST'])
-def reset_password(request):
-    data = request.data
-    email = data.get('email')
-    supabase = get_supabase_client()
-
-    verified = supabase.auth.verifyOtp({ token_hash: tokenHash, type: 'email'})
+@csrf_exempt
+@require_POST
+async def reset_password(request):
+    data = _request_data(request)
+    if data is None:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
 
-    supabase.auth.reset_password_for_email(
-        email,
-        {
-            "redirect_to": "https://nits-adaptive-nine.vercel.app/update-password",
-        }
-    )
+    async with async_supabase_client() as supabase:
+        try:
+            await supabase.auth.reset_password_for_email(
+                data.get('email'),
+                {
+                    "redirect_to": "https://nits-adaptive-nine.vercel.app/update-password",
+                }
+            )
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    return Response({'message': 'Reset email was sent successfully', 'verified': verified}, status=status.HTTP_200_OK)
+    return JsonResponse({'message': 'Reset email was sent successfully'}, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -328,10 +343,40 @@ def auth_user(request):
                 "last_name": request.user.last_name
             })
         except AttributeError as e:
-            print(f"User attribute error: {e}")
+            logger.exception("User attribute error")
             return Response({
                 "error": "User data incomplete",
                 "details": str(e)
             }, status=500)
 
     return Response({"error": "Unauthorized"}, status=401)
+
+
+@performance_sample_rate(0)
+@require_GET
+def metrics(request):
+    """
+    Per-route latency, SQL counts and SQL time of the sampled requests, summed over the workers that share the
+    cache (only the answering process with the locmem cache allowed under DEBUG), in Prometheus text format
+    (``?format=json`` adds the slowest statement of each route). Requires ``Authorization: Bearer <token>`` with
+    PERFORMANCE_METRICS_TOKEN, and is not served at all while the token is unset.
+    """
+    token = getattr(settings, 'PERFORMANCE_METRICS_TOKEN', None)
+    if not token:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+
+    merged, workers = collect()
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'sample_rate': PERFORMANCE_SAMPLE_RATE,
+            'workers': workers,
+            'routes': [
+                {'route': route, 'method': method, **stats} for (route, method), stats in sorted(merged.items())
+            ],
+        })
+
+    return HttpResponse(render_prometheus(merged, workers), content_type='text/plain; version=0.0.4; charset=utf-8')
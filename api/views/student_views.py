@@ -2,19 +2,50 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 import random
-from django.db.models import Prefetch
+import asyncio
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch, Q, Count, Subquery, OuterRef, IntegerField
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from api.models import User, Question, Assessment, Answer, AssessmentResult, UserAbility, Category, Lesson, \
     LessonProgress, Class, Chapter, Section
 from collections import defaultdict
 from api.ai.estimate_student_ability import estimate_ability_irt, estimate_ability_elo
 from django.shortcuts import get_object_or_404
-from api.decorators import auth_required
+from api.decorators import auth_required, conditional_get, rate_limit, performance_sample_rate, asgi_required
 from datetime import timedelta
 from django.utils.timezone import now
-from api.ai.rl_agent import DQNAgent, generate_quiz_with_rl, update_rl_model
-
-AUTO_SUBMISSION_GRACE_PERIOD = 30
+from api.ai.rl_agent import DQNAgent, generate_quiz_with_rl
+from api.utils import etags
+from api.utils.cache_versions import get_class_assessments_version
+from api.utils.answer_ingestion import ingest_answers
+from api.utils.autosave import buffer_answers, flush_answers, flush_due, apply_answer_delta
+from api.utils.content_cache import get_lessons, get_lesson_tree, get_chapter_content
+from api.utils.exam_payload import get_exam_payload, render_exam_questions
+from api.utils.util import generate_question_seed
+from api.utils.exam_sessions import get_expires_at, get_time_left, has_expired, get_session_status, expire_sessions, \
+    get_session_clock, forget_session_clock, update_session_abilities, AUTO_SUBMISSION_GRACE_PERIOD
+from api.utils.assessment_factory import create_assessment_with_questions
+from api.utils.question_sampler import sample_questions, get_exam_blueprint
+from api.utils.rate_limit import PRACTICE_QUIZ_COOLDOWN, CHAPTER_ASSESSMENT_ATTEMPTS, TEACHER_ASSESSMENT_ATTEMPTS
+from api.utils.live_progress import mark_started, record_answers, mark_submitted
+from api.utils.event_stream import event_stream_response, format_event, STREAM_TICK_INTERVAL, STREAM_MAX_DURATION, \
+    STREAM_RETRY_MS
+
+EXAM_SESSION_STATUS_LABELS = {
+    AssessmentResult.NOT_STARTED: 'not_taken',
+    AssessmentResult.IN_PROGRESS: 'ongoing',
+    AssessmentResult.SUBMITTED: 'taken',
+    AssessmentResult.EXPIRED: 'taken',
+}
+CLASS_ASSESSMENTS_CACHE_TIMEOUT = 60
+
+
+def _class_assessments_cache_key(user):
+    version = get_class_assessments_version(user.enrolled_class_id)
+    return f"class-assessments:{version}:user:{user.id}"
 
 
 @api_view(['GET'])
@@ -31,6 +62,7 @@ def joined_class(request):
 
 @api_view(["GET"])
 @auth_required("student")
+@conditional_get(etags.class_etag)
 def get_class(request):
     user: User = request.user
 
@@ -38,15 +70,14 @@ def get_class(request):
         return Response({"error": "Student is not enrolled in a class."}, status=status.HTTP_200_OK)
 
     class_obj = user.enrolled_class
-    lessons = Lesson.objects.only("id", "name", "is_locked")
 
     lesson_data = [
         {
-            "id": lesson.id,
-            "lesson_name": lesson.name,
-            "is_locked": lesson.is_locked,
+            "id": lesson["id"],
+            "lesson_name": lesson["name"],
+            "is_locked": lesson["is_locked"],
         }
-        for lesson in lessons
+        for lesson in get_lessons()
     ]
 
     class_data = {
@@ -87,17 +118,17 @@ def join_class(request):
 
 @api_view(['GET'])
 @auth_required("student")
+@conditional_get(etags.dashboard_etag)
 def get_dashboard_data(request):
     user: User = request.user
-    lessons = Lesson.objects.only("id", "name", "is_locked").order_by("id")
 
     lesson_data = [
         {
-            "id": lesson.id,
-            "lesson_name": lesson.name,
-            "is_locked": lesson.is_locked,
+            "id": lesson["id"],
+            "lesson_name": lesson["name"],
+            "is_locked": lesson["is_locked"],
         }
-        for lesson in lessons
+        for lesson in get_lessons()
     ]
 
     assessment_results = AssessmentResult.objects.filter(user=user).order_by('-start_time')
@@ -108,7 +139,7 @@ def get_dashboard_data(request):
         categories = []
 
         for category in selected_categories:
-            total_questions = result.assessment.questions.filter(category=category).count()
+            total_questions = result.assessment.get_questions().filter(category=category).count()
             answered_questions = Answer.objects.filter(assessment_result=result, question__category=category)
             correct_count = answered_questions.filter(is_correct=True).count()
 
@@ -123,7 +154,7 @@ def get_dashboard_data(request):
             'name': result.assessment.name,
             'type': result.assessment.type,
             'score': result.score or 0,
-            'total_items': result.assessment.questions.count() or 0,
+            'total_items': result.assessment.get_questions().count() or 0,
             'time_taken': result.time_taken or 0,
             'date_taken': result.assessment.created_at.isoformat() if result.assessment.created_at else None,
             'question_source': result.assessment.question_source,
@@ -173,29 +204,13 @@ def initial_exam_taken(request):
         return Response({"error": "Student is not enrolled to a class"}, status=status.HTTP_403_FORBIDDEN)
 
     result = AssessmentResult.objects.filter(
-        assessment__class_owner=user.enrolled_class,
+        assessment__class_owner_id=user.enrolled_class_id,
         assessment__is_initial=True,
         user=user
-    ).first()
-
-    if not result:
-        return Response({'status': 'not_taken'}, status=status.HTTP_200_OK)
-
-    if result.is_submitted:
-        return Response({'status': 'taken'}, status=status.HTTP_200_OK)
-
-    current_time = timezone.now()
-    time_limit_end = result.start_time + timedelta(seconds=result.assessment.time_limit)
-    deadline = result.assessment.deadline
-
-    if current_time >= time_limit_end or (deadline and current_time >= deadline):
+    ).only('status', 'expires_at').first()
 
-        print('Was here')
-        result.is_submitted = True
-        result.save()
-        return Response({'status': 'taken'}, status=status.HTTP_200_OK)
-    else:
-        return Response({'status': 'ongoing'}, status=status.HTTP_200_OK)
+    # Timed-out sessions are finalized by the expire_exam_sessions sweeper
+    return Response({'status': EXAM_SESSION_STATUS_LABELS[get_session_status(result)]}, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -210,8 +225,7 @@ def take_initial_exam(request):
         class_owner=user.enrolled_class,
         is_initial=True,
         is_active=True
-    ).select_related("class_owner").prefetch_related("questions").only("id", "time_limit", "deadline",
-                                                                       "class_owner").first()
+    ).only("id", "time_limit", "deadline").first()
 
     if not exam:
         return Response({"error": "Initial Exam doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
@@ -226,65 +240,49 @@ def take_initial_exam(request):
 
     result, created = AssessmentResult.objects.get_or_create(
         assessment=exam, user=user,
-        defaults={"start_time": current_time}
+        defaults={
+            "start_time": current_time,
+            "expires_at": get_expires_at(exam, current_time),
+            "question_seed": generate_question_seed(),
+        }
     )
 
-    expected_end_time = result.start_time + timedelta(seconds=exam.time_limit)
-    end_time = min(expected_end_time, exam.deadline)
-    remaining_time = (end_time - current_time).total_seconds()
+    if created:
+        mark_started(exam.id, user.id)
 
-    if remaining_time <= 0:
-        return Response({'error': 'Time limit has exceeded'}, status=status.HTTP_400_BAD_REQUEST)
-
-    if result.is_submitted:
+    # Finished sessions never depend on the clock; results submitted before expires_at existed have none
+    if result.is_submitted or result.status != AssessmentResult.IN_PROGRESS:
         return Response({'error': 'Student has already taken the exam.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    questions_qs = exam.questions.all().values("id", "image_url", "question_text", "choices")
-    questions_dict = {q["id"]: q for q in questions_qs}
+    remaining_time = get_time_left(result, current_time)
 
-    if not result.question_order:
-        question_list = list(questions_dict.values())
-        random.shuffle(question_list)
-        result.question_order = [q["id"] for q in question_list]
-        result.save()
-    else:
-        question_list = [questions_dict[qid] for qid in result.question_order if qid in questions_dict]
+    if remaining_time is not None and remaining_time <= 0:
+        return Response({'error': 'Time limit has exceeded'}, status=status.HTTP_400_BAD_REQUEST)
 
-    answers = Answer.objects.filter(assessment_result=result)
+    payload = get_exam_payload(exam.id)
 
-    answers_dict = {
-        answer.question_id: {
-            'chosen_answer': answer.chosen_answer,
-            'time_spent': answer.time_spent
-        }
-        for answer in answers
-    }
+    if not result.question_order and result.question_seed is None:
+        result.question_seed = generate_question_seed()
+        result.save(update_fields=['question_seed'])
 
-    questions_data = []
-    for question in question_list:
-        question_data = {
-            'question_id': question["id"],
-            'image_url': question["image_url"],
-            'question_text': question["question_text"],
-            'choices': question["choices"] if isinstance(question["choices"], list)
-            else list(question["choices"].values()),
+    answers = {}
+    if not created:
+        flush_answers(result)
+        answers = {
+            question_id: (chosen_answer, time_spent)
+            for question_id, chosen_answer, time_spent in Answer.objects.filter(
+                assessment_result=result
+            ).values_list('question_id', 'chosen_answer', 'time_spent')
         }
 
-        answer_info = answers_dict.get(question["id"], {})
-        if 'chosen_answer' in answer_info:
-            question_data.update({
-                'chosen_answer': answer_info['chosen_answer'],
-                'time_spent': answer_info.get('time_spent', 0),
-            })
-
-        questions_data.append(question_data)
+    questions_data = render_exam_questions(payload, result.get_question_order(payload), answers)
 
     exam_data = {
         'exam_id': exam.id,
-        'no_of_items': len(question_list),
-        'time_limit': int(remaining_time),
+        'no_of_items': len(questions_data),
+        'time_limit': remaining_time,
         'questions': questions_data,
-        'question_ids': [q["id"] for q in question_list],
+        'question_ids': [question['question_id'] for question in questions_data],
     }
 
     return Response(exam_data, status=status.HTTP_200_OK)
@@ -295,34 +293,107 @@ def take_initial_exam(request):
 def check_time_limit(request, assessment_id):
     user: User = request.user
 
-    assessment = get_object_or_404(Assessment, id=assessment_id, is_active=True)
+    result = AssessmentResult.objects.filter(
+        user=user,
+        assessment_id=assessment_id,
+        assessment__is_active=True
+    ).only('status', 'expires_at').order_by('-id').first()
+
+    if result is None:
+        return Response({'error': "No progress found for this assessment."}, status=status.HTTP_404_NOT_FOUND)
 
-    if assessment.time_limit is None:
+    remaining_time = get_time_left(result)
+
+    if remaining_time is None:
         return Response({'error': 'No time limit.'}, status=status.HTTP_404_NOT_FOUND)
 
-    result = AssessmentResult.objects.filter(user=user, assessment_id=assessment_id).first()
+    if remaining_time <= 0 or result.status == AssessmentResult.EXPIRED:
+        return Response({'error': 'Time limit exceeded.'}, status=status.HTTP_404_NOT_FOUND)
 
-    if result is None:
+    return Response({"time_left": remaining_time}, status=status.HTTP_200_OK)
+
+
+# Polled every few seconds by every open exam, so a much smaller sample is plenty
+@performance_sample_rate(0.01)
+@api_view(['GET', 'POST'])
+@auth_required("student")
+def heartbeat(request, assessment_id):
+    """
+    Time left on the student's running session, read from the cached session clock. A POST may carry an
+    answer delta (``answers`` and ``seq``, as in the delta save_progress mode) to save in the same round-trip.
+    """
+    user: User = request.user
+
+    clock = get_session_clock(user.id, assessment_id)
+
+    if clock is None:
         return Response({'error': "No progress found for this assessment."}, status=status.HTTP_404_NOT_FOUND)
 
+    result_id, session_status, expires_at = clock
+
+    if session_status != AssessmentResult.IN_PROGRESS:
+        return Response({'error': 'Result was already submitted'}, status=status.HTTP_400_BAD_REQUEST)
+
     current_time = timezone.now()
-    elapsed_time = (current_time - result.start_time).total_seconds()
-    time_limit = result.assessment.time_limit
-    deadline = result.assessment.deadline
+    result = AssessmentResult(pk=result_id, assessment_id=assessment_id, expires_at=expires_at)
 
-    if deadline:
-        remaining_time_until_deadline = (deadline - current_time).total_seconds()
-    else:
-        remaining_time_until_deadline = float('inf')
+    answers = request.data.get('answers') if request.method == 'POST' else None
+
+    if answers:
+        response = _save_progress_delta(result, answers, request.data.get('seq'), current_time)
+
+        if response.status_code == status.HTTP_201_CREATED:
+            record_answers(assessment_id, user.id, answers)
 
-    remaining_time_based_on_limit = time_limit - elapsed_time
+        return response
 
-    remaining_time = min(remaining_time_based_on_limit, remaining_time_until_deadline)
+    remaining_time = get_time_left(result, current_time)
 
-    if remaining_time <= 0:
+    if remaining_time is not None and remaining_time <= 0:
         return Response({'error': 'Time limit exceeded.'}, status=status.HTTP_404_NOT_FOUND)
 
-    return Response({"time_left": int(remaining_time)}, status=status.HTTP_200_OK)
+    return Response({'time_left': remaining_time}, status=status.HTTP_200_OK)
+
+
+async def _exam_timer_events(user_id, assessment_id):
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+
+    loop = asyncio.get_running_loop()
+    stream_end = loop.time() + STREAM_MAX_DURATION
+
+    while loop.time() < stream_end:
+        clock = await sync_to_async(get_session_clock)(user_id, assessment_id)
+
+        if clock is None:
+            yield format_event('error', {'error': "No progress found for this assessment."})
+            return
+
+        result_id, session_status, expires_at = clock
+
+        if session_status != AssessmentResult.IN_PROGRESS:
+            yield format_event('closed', {'status': session_status})
+            return
+
+        time_left = int((expires_at - timezone.now()).total_seconds()) if expires_at else None
+
+        if time_left is not None and time_left <= 0:
+            # The auto-submission grace period still accepts the client's submit
+            yield format_event('submit', {'time_left': 0})
+            return
+
+        yield format_event('tick', {'time_left': time_left})
+        await asyncio.sleep(STREAM_TICK_INTERVAL)
+
+
+@api_view(['GET'])
+@asgi_required
+@auth_required("student")
+def stream_exam_timer(request, assessment_id):
+    """
+    Server-Sent Events replacing check_time_limit polling: ``tick`` events carry the time left, ``submit`` tells
+    the client to submit now and ``closed`` reports a session that was submitted or expired elsewhere.
+    """
+    return event_stream_response(_exam_timer_events(request.user.id, assessment_id))
 
 
 @api_view(['POST'])
@@ -338,77 +409,37 @@ def save_progress(request, assessment_id):
 
     result = get_object_or_404(AssessmentResult, user=user, assessment__id=assessment_id)
 
-    if result.is_submitted:
+    if result.status != AssessmentResult.IN_PROGRESS:
         return Response({'error': 'Result was already submitted'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Fetch all the questions upfront to avoid N+1 queries
-    question_ids = [answer_data.get('question_id') for answer_data in answers]
-    questions = {question.id: question for question in Question.objects.filter(id__in=question_ids)}
-
-    # Prepare bulk update for existing answers and bulk create for new ones
-    answers_to_update = []
-    answers_to_create = []
+    if request.data.get('mode') == 'buffered':
+        response = _save_progress_buffered(result, answers, current_time)
+    elif request.data.get('mode') == 'delta':
+        response = _save_progress_delta(result, answers, request.data.get('seq'), current_time)
+    else:
+        response = _save_progress_full(result, answers, current_time)
 
-    # Get existing answers
-    existing_answers = Answer.objects.filter(assessment_result=result, question__id__in=question_ids)
-    existing_answers_dict = {(answer.question.id): answer for answer in existing_answers}
+    if response.status_code == status.HTTP_201_CREATED:
+        # Feeds the teacher's live progress stream
+        record_answers(assessment_id, user.id, answers)
 
-    score = 0
+    return response
 
-    for answer_data in answers:
-        question_id = answer_data.get('question_id')
-        chosen_answer = answer_data.get('answer')
-        time_spent = int(answer_data.get('time_spent', 0))
 
-        question = questions.get(question_id)
-        if question:
-            existing_answer = existing_answers_dict.get(question_id)
-            correct_answer = question.choices[question.correct_answer]
-            is_correct = chosen_answer == correct_answer
-            score += is_correct
+def _save_progress_full(result, answers, current_time):
+    """Original mode: the client sends every answer so far and the result is rescored from the payload."""
+    remaining_time = get_time_left(result, current_time)
 
-            if existing_answer:
-                existing_answer.chosen_answer = chosen_answer
-                existing_answer.time_spent = time_spent
-                existing_answer.is_correct = is_correct
-                answers_to_update.append(existing_answer)
+    if remaining_time is not None and remaining_time <= 0:
+        return Response({'error': 'Time limit exceeded.'}, status=status.HTTP_404_NOT_FOUND)
 
-            else:
-                # If the answer doesn't exist, create a new one
-                answers_to_create.append(
-                    Answer(
-                        assessment_result=result,
-                        question=question,
-                        chosen_answer=chosen_answer,
-                        time_spent=time_spent,
-                        is_correct=is_correct
-                    )
-                )
-
-    # Bulk update existing answers
-    if answers_to_update:
-        Answer.objects.bulk_update(answers_to_update, ['chosen_answer', 'time_spent'])
-
-    # Bulk create new answers
-    if answers_to_create:
-        Answer.objects.bulk_create(answers_to_create)
+    score = ingest_answers(result, answers)
 
     response_data = {
         'message': 'Progress was stored successfully',
     }
 
-    if result.assessment.time_limit or result.assessment.deadline:
-        elapsed_time = int((current_time - result.start_time).total_seconds())
-        time_limit = result.assessment.time_limit
-        deadline = result.assessment.deadline
-
-        remaining_time_until_deadline = int((deadline - current_time).total_seconds()) if deadline else float('inf')
-        remaining_time_based_on_limit = int(time_limit - elapsed_time)
-        remaining_time = int(min(remaining_time_based_on_limit, remaining_time_until_deadline))
-
-        if remaining_time <= 0:
-            return Response({'error': 'Time limit exceeded.'}, status=status.HTTP_404_NOT_FOUND)
-
+    if remaining_time is not None:
         response_data['time_left'] = remaining_time
 
     result.last_activity = current_time
@@ -418,26 +449,89 @@ def save_progress(request, assessment_id):
     return Response(response_data, status=status.HTTP_201_CREATED)
 
 
+def _save_progress_buffered(result, answers, current_time):
+    """Autosave mode: append the answer deltas to the draft buffer and only flush them periodically."""
+    remaining_time = get_time_left(result, current_time)
+
+    if remaining_time is not None and remaining_time <= 0:
+        flush_answers(result)
+        return Response({'error': 'Time limit exceeded.'}, status=status.HTTP_404_NOT_FOUND)
+
+    buffered = buffer_answers(result, answers)
+
+    if flush_due(result, current_time):
+        flush_answers(result)
+
+    response_data = {
+        'message': 'Progress was stored successfully',
+        'buffered': buffered,
+    }
+
+    if remaining_time is not None:
+        response_data['time_left'] = remaining_time
+
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+def _save_progress_delta(result, answers, seq, current_time):
+    """Delta mode: only changed answers are sent, each request carrying an increasing sequence number."""
+    try:
+        seq = int(seq)
+    except (TypeError, ValueError):
+        seq = 0
+
+    if seq <= 0:
+        return Response({'error': 'A positive sequence number is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    remaining_time = get_time_left(result, current_time)
+
+    if remaining_time is not None and remaining_time <= 0:
+        return Response({'error': 'Time limit exceeded.'}, status=status.HTTP_404_NOT_FOUND)
+
+    applied, dropped = apply_answer_delta(result, answers, seq)
+
+    response_data = {
+        'message': 'Progress was stored successfully',
+        'seq': seq,
+        'applied': applied,
+        'dropped': dropped,
+    }
+
+    if remaining_time is not None:
+        response_data['time_left'] = remaining_time
+
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
 @api_view(['GET'])
 @auth_required("student")
 def take_exam(request):
     no_of_items = 60
     user: User = request.user
-    selected_questions = list(Question.objects.order_by('?')[no_of_items:])
 
-    exam = Assessment.objects.create(
+    blueprint = None
+    if request.query_params.get('blueprint') == 'initial' and user.enrolled_class_id:
+        initial_exam_id = Assessment.objects.filter(
+            class_owner_id=user.enrolled_class_id,
+            is_initial=True
+        ).values_list('id', flat=True).first()
+
+        if initial_exam_id:
+            blueprint = get_exam_blueprint(initial_exam_id)
+
+    selected_questions = sample_questions(no_of_items, blueprint)
+
+    exam, _ = create_assessment_with_questions(
+        [question.id for question in selected_questions],
+        category_ids={question.category_id for question in selected_questions},
         name=f"Practice Exam ({now().strftime('%Y-%m-%d %H:%M')})",
         created_by=user,
         type='exam',
         source='student_initiated',
         time_limit=90 * no_of_items,
     )
-
-    category_ids = set(selected_questions[i].category_id for i in range(len(selected_questions)))
-    categories = Category.objects.filter(id__in=category_ids)
-
-    exam.selected_categories.set(categories)
-    exam.questions.set(selected_questions)
+    # A practice exam starts the same cooldown as a practice quiz, as the created_by lookup always has
+    PRACTICE_QUIZ_COOLDOWN.record(user)
 
     exam_data = {
         'exam_id': exam.id,
@@ -459,6 +553,7 @@ def take_exam(request):
 
 @api_view(['POST'])
 @auth_required("student")
+@rate_limit(PRACTICE_QUIZ_COOLDOWN)
 def take_quiz(request):
     user: User = request.user
 
@@ -467,13 +562,6 @@ def take_quiz(request):
     no_of_questions = int(request.data.get('no_of_questions', 5))
     question_source = request.data.get('question_source')
 
-    waiting_time = now() - timedelta(minutes=15)
-    recent_quiz = Assessment.objects.filter(created_by=user, created_at__gte=waiting_time).exists()
-
-    if recent_quiz:
-        return Response({'error': 'Student has already taken a quiz within 15 minutes. Please try again later!'},
-                        status=status.HTTP_429_TOO_MANY_REQUESTS)
-
     if question_source == 'previous_exam':
         rl_agent = DQNAgent()
 
@@ -489,9 +577,10 @@ def take_quiz(request):
         return Response({'message': 'AI-generated questions feature has not been implemented yet.'},
                         status=status.HTTP_501_NOT_IMPLEMENTED)
 
-    categories = Category.objects.filter(id__in=selected_categories)
-
-    quiz = Assessment.objects.create(
+    quiz, _ = create_assessment_with_questions(
+        [question.id for question in selected_questions],
+        category_ids={question.category_id for question in selected_questions},
+        start_for=user,
         name=f"Practice Quiz ({now().strftime('%Y-%m-%d %H:%M')})",
         created_by=user,
         type='quiz',
@@ -499,12 +588,6 @@ def take_quiz(request):
         source='student_initiated'
     )
 
-    quiz.questions.set(selected_questions)
-    quiz.selected_categories.set(categories)
-    quiz.save()
-
-    AssessmentResult.objects.create(assessment=quiz, user=user, start_time=now())
-
     quiz_data = {
         'quiz_id': quiz.id,
         'questions': [
@@ -544,16 +627,10 @@ def lesson_assessment_limit(request, lesson_id):
 
 @api_view(['GET'])
 @auth_required("student")
+@rate_limit(PRACTICE_QUIZ_COOLDOWN, record=False)
 def take_lesson_assessment(request, lesson_id):
     user: User = request.user
 
-    waiting_time = now() - timedelta(minutes=15)
-    recent_quiz = Assessment.objects.filter(created_by=user, created_at__gte=waiting_time).exists()
-
-    if recent_quiz:
-        return Response({'error': 'Student has already taken a quiz within 15 minutes. Please try again later!'},
-                        status=status.HTTP_429_TOO_MANY_REQUESTS)
-
     lesson = get_object_or_404(Lesson, id=lesson_id)
     lesson_category = Category.objects.filter(name=lesson.name)
 
@@ -575,18 +652,18 @@ def take_lesson_assessment(request, lesson_id):
 
     selected_questions = generate_quiz_with_rl(rl_agent, elo_abilities, categories, no_of_questions)
 
-    lesson_assessment = Assessment.objects.create(
+    lesson_assessment, _ = create_assessment_with_questions(
+        [question.id for question in selected_questions],
+        category_ids=[lesson_id],
+        start_for=user,
         name=f'Lesson Quiz: {lesson.name} Attempt {attempts_count + 1}',
         lesson=lesson,
-        class_owner=user.enrolled_class,
+        class_owner_id=user.enrolled_class_id,
         type='quiz',
         question_source='previous_exam',
         source='lesson_generated',
     )
 
-    lesson_assessment.selected_categories.set([lesson_id])
-    lesson_assessment.questions.set(selected_questions)
-
     quiz_data = {
         'quiz_id': lesson_assessment.id,
         'questions': [
@@ -601,8 +678,6 @@ def take_lesson_assessment(request, lesson_id):
         ]
     }
 
-    AssessmentResult.objects.create(assessment=lesson_assessment, user=user, start_time=now())
-
     return Response(quiz_data, status=status.HTTP_201_CREATED)
 
 
@@ -612,57 +687,35 @@ def chapter_assessment_limit(request, chapter_id):
     user: User = request.user
     chapter = get_object_or_404(Chapter, id=chapter_id)
 
-    attempts_count = AssessmentResult.objects.filter(
-        user=user,
-        assessment__chapter=chapter,
-        assessment__class_owner=user.enrolled_class
-    ).count()
-
-    max_attempts = 3
-    remaining_attempts = max(max_attempts - attempts_count, 0)
-
     return Response({
-        "remaining_attempts": remaining_attempts,
-        "max_attempts": max_attempts
+        "remaining_attempts": CHAPTER_ASSESSMENT_ATTEMPTS.remaining(user, chapter.id),
+        "max_attempts": CHAPTER_ASSESSMENT_ATTEMPTS.max_attempts
     })
 
 
 @api_view(['GET'])
 @auth_required("student")
+@rate_limit(CHAPTER_ASSESSMENT_ATTEMPTS)
 def take_chapter_assessment(request, chapter_id):
     user: User = request.user
     chapter = get_object_or_404(Chapter, id=chapter_id)
 
-    # Check if the student has exceeded attempts
-    attempts_count = AssessmentResult.objects.filter(
-        user=user,
-        assessment__chapter=chapter,
-        assessment__class_owner=user.enrolled_class
-    ).count()
-
-    max_attempts = 3
-    if attempts_count >= max_attempts:
-        return Response(
-            {"error": "Maximum of 3 quiz attempts reached."},
-            status=status.HTTP_403_FORBIDDEN
-        )
-
     no_of_questions = 20
     all_questions = list(Question.objects.filter(category__subcategory__name=chapter.name))
     selected_questions = random.sample(list(all_questions), no_of_questions)
 
-    chapter_assessment = Assessment.objects.create(
+    chapter_assessment, _ = create_assessment_with_questions(
+        [question.id for question in selected_questions],
+        category_ids=[chapter.lesson_id],
+        start_for=user,
         name=f'Chapter Quiz: {chapter.name}',
         chapter=chapter,
-        class_owner=user.enrolled_class,
+        class_owner_id=user.enrolled_class_id,
         type='quiz',
         question_source='previous_exam',
         source='chapter_generated',
     )
 
-    chapter_assessment.selected_categories.set([chapter.lesson.id])
-    chapter_assessment.questions.set(selected_questions)
-
     quiz_data = {
         'quiz_id': chapter_assessment.id,
         'questions': [
@@ -676,31 +729,18 @@ def take_chapter_assessment(request, chapter_id):
         ]
     }
 
-    AssessmentResult.objects.create(assessment=chapter_assessment, user=user, start_time=now())
-
     return Response(quiz_data, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET'])
 @auth_required("student")
+@rate_limit(TEACHER_ASSESSMENT_ATTEMPTS)
 def take_teacher_assessment(request, assessment_id):
     user: User = request.user
 
     assessment = get_object_or_404(Assessment.objects.prefetch_related("questions"), id=assessment_id,
                                    is_active=True)
 
-    attempts_count = AssessmentResult.objects.filter(
-        user=user,
-        assessment=assessment
-    ).count()
-
-    max_attempts = 3
-    if attempts_count >= max_attempts:
-        return Response(
-            {"error": "Maximum of 3 quiz attempts reached."},
-            status=status.HTTP_403_FORBIDDEN
-        )
-
     if user.enrolled_class != assessment.class_owner:
         return Response({'error': "Student doesn't belong to the class."}, status=status.HTTP_403_FORBIDDEN)
 
@@ -717,7 +757,7 @@ def take_teacher_assessment(request, assessment_id):
             }
             for question in assessment.questions.all()
         ],
-        'attempts': attempts_count
+        'attempts': TEACHER_ASSESSMENT_ATTEMPTS.count(user, assessment.id)
     }
 
     return Response(quiz_data, status=status.HTTP_200_OK)
@@ -728,20 +768,11 @@ def take_teacher_assessment(request, assessment_id):
 def teacher_assessment_limit(request, assessment_id):
     user: User = request.user
 
-    assessment = get_object_or_404(Assessment.objects.prefetch_related("questions"), id=assessment_id,
-                                   is_active=True)
-
-    attempts_count = AssessmentResult.objects.filter(
-        user=user,
-        assessment=assessment,
-    ).count()
-
-    max_attempts = 3
-    remaining_attempts = max(max_attempts - attempts_count, 0)
+    assessment = get_object_or_404(Assessment, id=assessment_id, is_active=True)
 
     return Response({
-        "remaining_attempts": remaining_attempts,
-        "max_attempts": max_attempts
+        "remaining_attempts": TEACHER_ASSESSMENT_ATTEMPTS.remaining(user, assessment.id),
+        "max_attempts": TEACHER_ASSESSMENT_ATTEMPTS.max_attempts
     })
 
 
@@ -767,29 +798,22 @@ def submit_assessment(request, assessment_id):
         defaults={
             "is_submitted": False,
             "start_time": current_time,
+            "expires_at": get_expires_at(assessment, current_time),
         }
     )
 
-    if result.is_submitted:
+    if result.status != AssessmentResult.IN_PROGRESS:
         return Response({'error': 'Assessment was already submitted.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    is_auto_submission = False
-
-    if assessment.time_limit or assessment.deadline:
-        end_time = result.start_time + timedelta(seconds=assessment.time_limit) if assessment.time_limit else None
-        deadline_time = assessment.deadline if assessment.deadline else None
+    flush_answers(result)
 
-        if end_time and deadline_time:
-            final_end_time = min(end_time, deadline_time)
-        elif end_time:
-            final_end_time = end_time
-        else:
-            final_end_time = deadline_time
+    is_auto_submission = False
 
-        if current_time >= final_end_time - timedelta(seconds=AUTO_SUBMISSION_GRACE_PERIOD):
+    if result.expires_at:
+        if current_time >= result.expires_at - timedelta(seconds=AUTO_SUBMISSION_GRACE_PERIOD):
             is_auto_submission = True
 
-        if not is_auto_submission and current_time >= final_end_time:
+        if not is_auto_submission and current_time >= result.expires_at:
             return Response({'error': 'Submission not allowed. Time limit or deadline exceeded.'},
                             status=status.HTTP_400_BAD_REQUEST)
 
@@ -798,71 +822,28 @@ def submit_assessment(request, assessment_id):
     if not answers:
         return Response({'error': 'No answers provided.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    result.time_take = (current_time - result.start_time).seconds
-
-    assessment_questions = {q.id: q for q in assessment.questions.all()}
-    answer_dict = {a["question_id"]: a for a in answers}
-
-    existing_answers = {a.question_id: a for a in Answer.objects.filter(assessment_result=result)}
-
-    score = 0
-    answers_to_update = []
-    answers_to_create = []
-
-    for question_id, question in assessment_questions.items():
-        answer_data = answer_dict.get(question_id)
-        if not answer_data:
-            continue  # Skip if no answer is provided
-
-        chosen_answer = answer_data.get('answer')
-        time_spent = answer_data.get('time_spent', 0)
-        correct_answer = question.choices[question.correct_answer]
-        is_correct = chosen_answer == correct_answer
-        score += int(is_correct)
-
-        if question_id in existing_answers:
-            # Update the existing answer
-            existing_answer = existing_answers[question_id]
-            existing_answer.chosen_answer = chosen_answer
-            existing_answer.is_correct = is_correct
-            existing_answer.time_spent = time_spent
-            answers_to_update.append(existing_answer)
-        else:
-            # Create a new answer
-            answers_to_create.append(Answer(
-                assessment_result=result,
-                question=question,
-                time_spent=time_spent,
-                chosen_answer=chosen_answer,
-                is_correct=is_correct
-            ))
-
-    # Bulk update existing answers
-    if answers_to_update:
-        Answer.objects.bulk_update(answers_to_update, ['chosen_answer', 'is_correct', 'time_spent'])
-
-    # Bulk create new answers
-    if answers_to_create:
-        Answer.objects.bulk_create(answers_to_create)
-
-    result.time_taken = (current_time - result.start_time).seconds
-    result.score = score
-    result.is_submitted = True
-    result.save()
-
-    rl_agent = DQNAgent()
-    updated_abilities = update_rl_model(rl_agent, assessment_id=assessment_id, user=user)
+    with transaction.atomic():
+        ingest_answers(result, answers)
+        # Answers autosaved through the buffer and flushed above count as much as the submitted ones
+        result.score = Answer.objects.filter(assessment_result=result, is_correct=True).count()
+        result.time_taken = (current_time - result.start_time).seconds
+        result.is_submitted = True
+        result.status = AssessmentResult.SUBMITTED
+        result.save()
 
-    user.abilities = updated_abilities
-    user.save()
+    forget_session_clock(user.id, assessment_id)
+    mark_submitted(assessment_id, user.id)
 
-    rl_agent.save_state_to_db()
+    # The same update the sweeper gives a session that timed out
+    update_session_abilities([result])
 
     return Response({'message': 'Assessment was submitted successfully'}, status=status.HTTP_201_CREATED)
 
 
 @api_view(['POST'])
 @auth_required("student")
+@rate_limit(TEACHER_ASSESSMENT_ATTEMPTS, error='Maximum attempts has been reached.',
+            status_code=status.HTTP_400_BAD_REQUEST)
 def submit_class_assessment(request, assessment_id):
     user: User = request.user
     assessment = get_object_or_404(Assessment, id=assessment_id, is_active=True)
@@ -875,22 +856,6 @@ def submit_class_assessment(request, assessment_id):
             return Response({'error': 'You are not allowed to submit answers on this assessment'},
                             status=status.HTTP_403_FORBIDDEN)
 
-    previous_results = AssessmentResult.objects.filter(
-        user=user,
-        assessment_id=assessment_id,
-    )
-
-    if previous_results.count() == 3:
-        return Response({
-            'error': 'Maximum attempts has been reached.',
-        }, status=status.HTTP_400_BAD_REQUEST)
-
-    result = AssessmentResult.objects.create(
-        user=user,
-        assessment_id=assessment_id,
-        start_time=timezone.now(),
-    )
-
     is_auto_submission = False
 
     current_time = timezone.now()
@@ -909,57 +874,24 @@ def submit_class_assessment(request, assessment_id):
     if not answers:
         return Response({'error': 'No answers provided.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    result.time_take = (current_time - result.start_time).seconds
-
-    assessment_questions = {q.id: q for q in assessment.questions.all()}
-    answer_dict = {a["question_id"]: a for a in answers}
-
-    existing_answers = {a.question_id: a for a in Answer.objects.filter(assessment_result=result)}
-
-    score = 0
-    answers_to_update = []
-    answers_to_create = []
-
-    for question_id, question in assessment_questions.items():
-        answer_data = answer_dict.get(question_id)
-        if not answer_data:
-            continue  # Skip if no answer is provided
-
-        chosen_answer = answer_data.get('answer')
-        time_spent = answer_data.get('time_spent', 0)
-        correct_answer = question.choices[question.correct_answer]
-        is_correct = chosen_answer == correct_answer
-        score += int(is_correct)
-
-        if question_id in existing_answers:
-            # Update the existing answer
-            existing_answer = existing_answers[question_id]
-            existing_answer.chosen_answer = chosen_answer
-            existing_answer.is_correct = is_correct
-            existing_answer.time_spent = time_spent
-            answers_to_update.append(existing_answer)
-        else:
-            # Create a new answer
-            answers_to_create.append(Answer(
-                assessment_result=result,
-                question=question,
-                time_spent=time_spent,
-                chosen_answer=chosen_answer,
-                is_correct=is_correct
-            ))
-
-    # Bulk update existing answers
-    if answers_to_update:
-        Answer.objects.bulk_update(answers_to_update, ['chosen_answer', 'is_correct', 'time_spent'])
+    with transaction.atomic():
+        # Rejected submissions no longer leave a running attempt behind to use up the attempt limit
+        result = AssessmentResult.objects.create(
+            user=user,
+            assessment_id=assessment_id,
+            start_time=current_time,
+            expires_at=assessment.deadline,
+        )
+        result.score = ingest_answers(result, answers)
+        result.time_taken = (current_time - result.start_time).seconds
+        result.is_submitted = True
+        result.status = AssessmentResult.SUBMITTED
+        result.save()
 
-    # Bulk create new answers
-    if answers_to_create:
-        Answer.objects.bulk_create(answers_to_create)
+    forget_session_clock(user.id, assessment_id)
+    mark_submitted(assessment_id, user.id)
 
-    result.time_taken = (current_time - result.start_time).seconds
-    result.score = score
-    result.is_submitted = True
-    result.save()
+    cache.delete(_class_assessments_cache_key(user))
 
     return Response({'message': 'Assessment was submitted successfully'}, status=status.HTTP_201_CREATED)
 
@@ -968,30 +900,33 @@ def submit_class_assessment(request, assessment_id):
 @auth_required("student")
 def get_assessment_result(request, assessment_id):
     user = request.user
-    result = AssessmentResult.objects.select_related('assessment', 'user').prefetch_related(
-        Prefetch('answers', queryset=Answer.objects.select_related('question__category')),
-        Prefetch('assessment__questions', queryset=Question.objects.select_related('category'))
+    results = AssessmentResult.objects.select_related('assessment', 'user').prefetch_related(
+        Prefetch('answers', queryset=Answer.objects.select_related('question__category'))
     ).filter(
         assessment__id=assessment_id,
         user=request.user
-    ).order_by('-id').first()
+    ).order_by('-id')
+    result = results.first()
 
     if result is None:
         return Response({'error': 'No Result for Assessment Found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if not result.is_submitted and (result.assessment.time_limit or result.assessment.deadline):
-        time_limit = result.start_time + timedelta(
-            seconds=result.assessment.time_limit) if result.assessment.time_limit else None
-
-        expected_end = min(time_limit, result.assessment.deadline)
-
-        if expected_end > timezone.now():
+    if result.status == AssessmentResult.IN_PROGRESS:
+        # Until the grace period ends the client's own submission may still arrive
+        if result.expires_at and not has_expired(result, grace_period=AUTO_SUBMISSION_GRACE_PERIOD):
             return Response({'error': 'Assessment is still in progress.'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # The prefetched answers predate the flush, so reload once the session is settled
+        if result.expires_at:
+            expire_sessions([result])
+            result = results.first()
+        elif flush_answers(result):
+            result = results.first()
+
     answers = result.answers.all()
     answer_dict = {ans.question.id: ans for ans in answers}
 
-    questions = result.assessment.questions.all()
+    questions = result.assessment.get_questions().select_related('category')
 
     overall_correct_answers = 0
     overall_wrong_answers = 0
@@ -1091,16 +1026,16 @@ def get_class_assessment_result(request, assessment_id):
                         status=status.HTTP_404_NOT_FOUND)
 
     attempts = attempts.prefetch_related(
-        Prefetch('answers', queryset=Answer.objects.select_related('question__category')),
-        Prefetch('assessment__questions', queryset=Question.objects.select_related('category'))
+        Prefetch('answers', queryset=Answer.objects.select_related('question__category'))
     )
+    # Every attempt is on this assessment, whose questions may be its template's
+    questions = list(assessment.get_questions().select_related('category'))
 
     attempt_data = []
     for attempt in attempts:
         # Process each attempt similar to original logic
         answers = attempt.answers.all()
         answer_dict = {ans.question.id: ans for ans in answers}
-        questions = attempt.assessment.questions.all()
 
         overall_correct = 0
         overall_wrong = 0
@@ -1150,7 +1085,7 @@ def get_class_assessment_result(request, assessment_id):
             'start_time': attempt.start_time,
             'time_taken_seconds': time_taken,
             'score': attempt.score,
-            'total_questions': questions.count(),
+            'total_questions': len(questions),
             'correct_answers': overall_correct,
             'wrong_answers': overall_wrong,
             'categories': [
@@ -1182,6 +1117,7 @@ def get_class_assessment_result(request, assessment_id):
 
 @api_view(['GET'])
 @auth_required("student")
+@conditional_get(etags.ability_etag)
 def get_ability(request):
     user: User = request.user
 
@@ -1204,38 +1140,60 @@ def get_ability(request):
 
 @api_view(['GET'])
 @auth_required("student")
+@conditional_get(etags.class_assessments_etag)
 def get_class_assessments(request):
     user: User = request.user
 
-    print('user', user)
+    cache_key = _class_assessments_cache_key(user)
+    assessments = cache.get(cache_key)
+
+    if assessments is None:
+        item_count = Assessment.questions.through.objects.filter(
+            assessment_id=OuterRef('pk')
+        ).values('assessment_id').annotate(total=Count('question_id')).values('total')
+        attempt_count = AssessmentResult.objects.filter(
+            assessment_id=OuterRef('pk'),
+            user=user
+        ).values('assessment_id').annotate(total=Count('id')).values('total')
+
+        assessments = list(
+            Assessment.objects.filter(
+                source='teacher_generated',
+                class_owner_id=user.enrolled_class_id,
+                is_active=True
+            ).annotate(
+                items=Coalesce(Subquery(item_count, output_field=IntegerField()), 0),
+                attempts=Coalesce(Subquery(attempt_count, output_field=IntegerField()), 0),
+            ).order_by('-created_at').values('id', 'name', 'type', 'deadline', 'items', 'attempts')
+        )
+        cache.set(cache_key, assessments, CLASS_ASSESSMENTS_CACHE_TIMEOUT)
 
-    assessments = Assessment.objects.filter(source='teacher_generated', class_owner=user.enrolled_class,
-                                            is_active=True).order_by('-created_at')
+    current_time = timezone.now()
     assessments_data = []
 
     for assessment in assessments:
-        results = AssessmentResult.objects.filter(assessment=assessment, user=user)
-        is_open = assessment.deadline is None or assessment.deadline >= timezone.now()
+        attempts = assessment['attempts']
+        is_open = assessment['deadline'] is None or assessment['deadline'] >= current_time
 
-        if not results:
+        if not attempts:
             assessment_status = 'Not Started'
-        elif results.count() == 3:
+        elif attempts >= 3:
             assessment_status = 'Completed'
         else:
             assessment_status = 'Open'
 
         data = {
-            'id': assessment.id,
-            'name': assessment.name,
-            'type': assessment.type,
-            'items': assessment.questions.count(),
+            'id': assessment['id'],
+            'name': assessment['name'],
+            'type': assessment['type'],
+            'items': assessment['items'],
             'is_open': is_open,
             'status': assessment_status,
-            'attempts_left': 3 - results.count()
+            'attempts_left': max(3 - attempts, 0)
         }
 
-        if assessment.deadline:
-            data.update({'deadline': assessment.deadline})
+        if assessment['deadline']:
+            data.update({'deadline': assessment['deadline']})
 
         assessments_data.append(data)
 
@@ -1274,7 +1232,7 @@ def get_history(request):
             'assessment_id': result.assessment.id,
             'type': result.assessment.type,
             'score': result.score,
-            'total_items': result.assessment.questions.count(),
+            'total_items': result.assessment.get_questions().count(),
             'time_taken': result.time_taken,
             'date_taken': result.assessment.created_at,
             'question_source': result.assessment.question_source,
@@ -1288,90 +1246,112 @@ def get_history(request):
 
 @api_view(['GET'])
 @auth_required("student")
+@conditional_get(etags.lesson_etag)
 def get_lesson(request, lesson_id):
     user: User = request.user
 
-    if user.enrolled_class is None:
+    if user.enrolled_class_id is None:
         return Response({'error': 'You are not enrolled.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    lesson = get_object_or_404(Lesson, id=lesson_id)
+    lesson = get_lesson_tree(lesson_id)
+
+    if lesson is None:
+        return Response({'error': 'Lesson not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if lesson.is_locked:
+    if lesson["is_locked"]:
         return Response(
             {'error': 'Lesson is currently locked. Please wait till the teacher opens it'},
             status=status.HTTP_403_FORBIDDEN
         )
 
-    chapters = lesson.chapters.all().order_by("number")
-    first_chapter = lesson.chapters.first()
-    first_section = first_chapter.sections.first()
+    chapters = lesson["chapters"]
 
-    # Get lesson progress if the user is a student
-    lesson_progress, _ = LessonProgress.objects.get_or_create(
+    if not chapters:
+        return Response({'error': 'Lesson has no chapters yet.'}, status=status.HTTP_404_NOT_FOUND)
+
+    first_chapter = chapters[0]
+    first_section = first_chapter["sections"][0] if first_chapter["sections"] else None
+
+    # Progress is resolved against the lesson tree, so the chapter and section rows are never loaded
+    lesson_progress, _ = LessonProgress.objects.only("id", "current_chapter_id", "current_section_id").get_or_create(
         user=user,
-        lesson=lesson,
+        lesson_id=lesson_id,
         defaults={
-            "current_chapter": first_chapter,
-            "current_section": first_section,
+            "current_chapter_id": first_chapter["id"],
+            "current_section_id": first_section["id"] if first_section else None,
         }
     )
+
+    chapters_by_id = {chapter["id"]: chapter for chapter in chapters}
+    sections_by_id = {section["id"]: section for chapter in chapters for section in chapter["sections"]}
+    current_chapter = chapters_by_id.get(lesson_progress.current_chapter_id, first_chapter)
+    current_section = sections_by_id.get(lesson_progress.current_section_id)
+
+    main_chapter_ids = [chapter["id"] for chapter in chapters if chapter["is_main_chapter"]]
+    completed_quizzes = AssessmentResult.objects.filter(
+        Q(assessment__chapter_id__in=main_chapter_ids) | Q(assessment__lesson_id=lesson_id),
+        user=user,
+        is_submitted=True
+    ).values_list("assessment__chapter_id", "assessment__lesson_id").distinct()
+
+    completed_chapter_ids = set()
+    lesson_quiz_completed = False
+    for chapter_id, quiz_lesson_id in completed_quizzes:
+        if chapter_id is not None:
+            completed_chapter_ids.add(chapter_id)
+        if quiz_lesson_id == lesson_id:
+            lesson_quiz_completed = True
+
     lesson_structure = []
 
     for chapter in chapters:
 
         chapter_data = {
-            "id": chapter.id,
-            "chapter_number": chapter.number,
-            "chapter_name": chapter.name,
-            "is_main_chapter": chapter.is_main_chapter,
-            "is_locked": chapter.is_locked,
+            "id": chapter["id"],
+            "chapter_number": chapter["number"],
+            "chapter_name": chapter["name"],
+            "is_main_chapter": chapter["is_main_chapter"],
+            "is_locked": chapter["is_locked"],
         }
 
-        if not chapter.is_locked:
-            is_chapter_completed = chapter.number < lesson_progress.current_chapter.number
-
-            chapter_data["completed"] = is_chapter_completed
-            chapter_data["structure"] = []
-
-            for section in chapter.sections.all():
-                is_section_completed = (
-                        lesson_progress.current_section is not None
-                        and section.number < lesson_progress.current_section.number
-                )
-
-                chapter_data["structure"].append({
-                    "section_id": section.id,
-                    "section_number": section.number,
-                    "section_name": section.name,
-                    "completed": is_section_completed
-                })
+        if not chapter["is_locked"]:
+            chapter_data["completed"] = chapter["number"] < current_chapter["number"]
+            chapter_data["structure"] = [
+                {
+                    "section_id": section["id"],
+                    "section_number": section["number"],
+                    "section_name": section["name"],
+                    "completed": current_section is not None and section["number"] < current_section["number"]
+                }
+                for section in chapter["sections"]
+            ]
 
-            if chapter.is_main_chapter:
+            if chapter["is_main_chapter"]:
                 chapter_data["structure"].append({
                     "type": "quiz",
-                    "title": f"Quiz for {chapter.name}",
-                    "completed": AssessmentResult.objects.filter(assessment__chapter=chapter).exists()
+                    "title": f"Quiz for {chapter['name']}",
+                    "completed": chapter["id"] in completed_chapter_ids
                 })
 
         lesson_structure.append(chapter_data)
 
     lesson_structure.append({
         "type": "quiz",
-        "title": f"Quiz for {lesson.name}",
-        "completed": AssessmentResult.objects.filter(assessment__lesson=lesson).exists()
+        "title": f"Quiz for {lesson['name']}",
+        "completed": lesson_quiz_completed
     })
 
-    total_chapters = lesson.chapters.count()
-    completed_chapters = lesson_progress.current_chapter.number
+    total_chapters = len(chapters)
+    completed_chapters = current_chapter["number"]
     progress_percentage = (completed_chapters / total_chapters) * 100 if total_chapters > 0 else 0.0
 
     lesson_data = {
-        "id": lesson.id,
-        "lesson_name": lesson.name,
+        "id": lesson["id"],
+        "lesson_name": lesson["name"],
         "structure": lesson_structure,
         "progress": {
-            "current_chapter": lesson_progress.current_chapter.name,
-            "current_section": lesson_progress.current_section.name if lesson_progress.current_section is not None else None,
+            "current_chapter": current_chapter["name"],
+            "current_section": current_section["name"] if current_section is not None else None,
             "progress_percentage": round(progress_percentage, 2)
         }
     }
@@ -1381,10 +1361,14 @@ def get_lesson(request, lesson_id):
 
 @api_view(['GET'])
 @auth_required("student")
+@conditional_get(etags.chapter_etag)
 def get_chapter(request, lesson_id, chapter_id):
-    chapter = get_object_or_404(Chapter, id=chapter_id)
+    chapter = get_chapter_content(chapter_id)
 
-    if chapter.is_locked:
+    if chapter is None:
+        return Response({'error': 'Chapter not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if chapter["is_locked"]:
         return Response(
             {'error': 'Lesson is currently locked. Please wait till the teacher opens it'},
             status=status.HTTP_403_FORBIDDEN
@@ -1392,18 +1376,18 @@ def get_chapter(request, lesson_id, chapter_id):
 
     section_data = []
 
-    for section in chapter.sections.all():
+    for section in chapter["sections"]:
         section_data.append({
-            "id": section.id,
-            "number": section.number,
-            "title": section.name,
-            "content": section.content,
+            "id": section["id"],
+            "number": section["number"],
+            "title": section["name"],
+            "content": section["content"],
         })
 
     chapter_data = {
-        "id": chapter.id,
-        "chapter_number": chapter.number,
-        "chapter_name": chapter.name,
+        "id": chapter["id"],
+        "chapter_number": chapter["number"],
+        "chapter_name": chapter["name"],
         "sections": section_data
     }
 
@@ -1466,27 +1450,13 @@ def final_exam_taken(request):
         return Response({"error": "Student is not enrolled to a class"}, status=status.HTTP_403_FORBIDDEN)
 
     result = AssessmentResult.objects.filter(
-        assessment__class_owner=user.enrolled_class,
+        assessment__class_owner_id=user.enrolled_class_id,
         assessment__is_final=True,
         user=user
-    ).first()
-
-    if not result:
-        return Response({'status': 'not_taken'}, status=status.HTTP_200_OK)
-
-    if result.is_submitted:
-        return Response({'status': 'taken'}, status=status.HTTP_200_OK)
-
-    current_time = timezone.now()
-    time_limit_end = result.start_time + timedelta(seconds=result.assessment.time_limit)
-    deadline = result.assessment.deadline
+    ).only('status', 'expires_at').first()
 
-    if current_time >= time_limit_end or (deadline and current_time >= deadline):
-        result.is_submitted = True
-        result.save()
-        return Response({'status': 'taken'}, status=status.HTTP_200_OK)
-    else:
-        return Response({'status': 'ongoing'}, status=status.HTTP_200_OK)
+    # Timed-out sessions are finalized by the expire_exam_sessions sweeper
+    return Response({'status': EXAM_SESSION_STATUS_LABELS[get_session_status(result)]}, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -1501,8 +1471,7 @@ def take_final_exam(request):
         class_owner=user.enrolled_class,
         is_final=True,
         is_active=True
-    ).select_related("class_owner").prefetch_related("questions").only("id", "time_limit", "deadline",
-                                                                       "class_owner").first()
+    ).only("id", "time_limit", "deadline").first()
 
     if not exam:
         return Response({"error": "Final Exam doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
@@ -1517,65 +1486,49 @@ def take_final_exam(request):
 
     result, created = AssessmentResult.objects.get_or_create(
         assessment=exam, user=user,
-        defaults={"start_time": current_time}
+        defaults={
+            "start_time": current_time,
+            "expires_at": get_expires_at(exam, current_time),
+            "question_seed": generate_question_seed(),
+        }
     )
 
-    expected_end_time = result.start_time + timedelta(seconds=exam.time_limit)
-    end_time = min(expected_end_time, exam.deadline)
-    remaining_time = (end_time - current_time).total_seconds()
-
-    if remaining_time <= 0:
-        return Response({'error': 'Time limit has exceeded'}, status=status.HTTP_400_BAD_REQUEST)
+    if created:
+        mark_started(exam.id, user.id)
 
-    if result.is_submitted:
+    # Finished sessions never depend on the clock; results submitted before expires_at existed have none
+    if result.is_submitted or result.status != AssessmentResult.IN_PROGRESS:
         return Response({'error': 'Student has already taken the exam.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    questions_qs = exam.questions.all().values("id", "image_url", "question_text", "choices")
-    questions_dict = {q["id"]: q for q in questions_qs}
+    remaining_time = get_time_left(result, current_time)
 
-    if not result.question_order:
-        question_list = list(questions_dict.values())
-        random.shuffle(question_list)
-        result.question_order = [q["id"] for q in question_list]
-        result.save()
-    else:
-        question_list = [questions_dict[qid] for qid in result.question_order if qid in questions_dict]
+    if remaining_time is not None and remaining_time <= 0:
+        return Response({'error': 'Time limit has exceeded'}, status=status.HTTP_400_BAD_REQUEST)
 
-    answers = Answer.objects.filter(assessment_result=result)
+    payload = get_exam_payload(exam.id)
 
-    answers_dict = {
-        answer.question_id: {
-            'chosen_answer': answer.chosen_answer,
-            'time_spent': answer.time_spent
-        }
-        for answer in answers
-    }
+    if not result.question_order and result.question_seed is None:
+        result.question_seed = generate_question_seed()
+        result.save(update_fields=['question_seed'])
 
-    questions_data = []
-    for question in question_list:
-        question_data = {
-            'question_id': question["id"],
-            'image_url': question["image_url"],
-            'question_text': question["question_text"],
-            'choices': question["choices"] if isinstance(question["choices"], list)
-            else list(question["choices"].values()),
+    answers = {}
+    if not created:
+        flush_answers(result)
+        answers = {
+            question_id: (chosen_answer, time_spent)
+            for question_id, chosen_answer, time_spent in Answer.objects.filter(
+                assessment_result=result
+            ).values_list('question_id', 'chosen_answer', 'time_spent')
         }
 
-        answer_info = answers_dict.get(question["id"], {})
-        if 'chosen_answer' in answer_info:
-            question_data.update({
-                'chosen_answer': answer_info['chosen_answer'],
-                'time_spent': answer_info.get('time_spent', 0),
-            })
-
-        questions_data.append(question_data)
+    questions_data = render_exam_questions(payload, result.get_question_order(payload), answers)
 
     exam_data = {
         'exam_id': exam.id,
-        'no_of_items': len(question_list),
-        'time_limit': int(remaining_time),
+        'no_of_items': len(questions_data),
+        'time_limit': remaining_time,
         'questions': questions_data,
-        'question_ids': [q["id"] for q in question_list],
+        'question_ids': [question['question_id'] for question in questions_data],
     }
 
     return Response(exam_data, status=status.HTTP_200_OK)
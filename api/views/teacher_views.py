@@ -1,83 +1,118 @@
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils.dateparse import parse_datetime
-from django.db.models import Count, Q, Avg, Max, Prefetch
-from api.models import User, Class, UserAbility, Assessment, AssessmentResult, Question, Lesson, Chapter, Answer
-from api.decorators import auth_required
-import os
+from django.db.models import Count, Q, Avg, Max, Prefetch, F, Value, Subquery, OuterRef, Window, \
+    ExpressionWrapper, FloatField, IntegerField
+from django.db.models.functions import Coalesce, NullIf, RowNumber
+from api.models import User, Class, UserAbility, Assessment, AssessmentResult, Question, Lesson, Chapter, Answer, \
+    ExamBlueprint
+from api.decorators import auth_required, asgi_required, rollup_mode_required
+from api.utils import content_cache
+from api.utils.cache_versions import invalidate_class_assessments
+from api.utils.answer_key import invalidate_question_answer_keys
+from api.utils.exam_payload import build_exam_payload
+from api.utils.exam_sessions import reschedule_sessions
+from api.utils.exam_assembler import assemble_for_class
+from api.utils.assessment_factory import create_assessment_with_questions
+from api.utils.exam_templates import create_exam_from_template, INITIAL_EXAM_TEMPLATE, FINAL_EXAM_TEMPLATE
+from api.utils.live_progress import get_live_progress
+from api.utils.event_stream import event_stream_response, format_event, STREAM_TICK_INTERVAL, STREAM_MAX_DURATION, \
+    STREAM_RETRY_MS
+from asgiref.sync import sync_to_async
+import asyncio
+import logging
 from api.ai.estimate_student_ability import estimate_ability_irt, estimate_ability_elo, estimate_ability_elo_time
 
+logger = logging.getLogger(__name__)
 
-@api_view(['GET'])
-@auth_required("teacher")
-def create_initial_assessment(request, class_id):
-    file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "question_ids.txt")
-    try:
-        with open(file_path, "r") as file:
-            question_ids = [line.strip() for line in file if line.strip()]
-    except FileNotFoundError:
-        return Response({'error': 'Question ID file not found'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    if Assessment.objects.filter(class_owner__id=class_id, is_initial=True).exists():
-        return Response({'error': 'Initial Assessment already exists'}, status=status.HTTP_400_BAD_REQUEST)
+def _create_exam(request, class_owner, template_name, **fields):
+    """
+    Create a class's initial or final exam. With ``blueprint_id`` the form is assembled from that ExamBlueprint
+    for the class (skipping questions it has already seen); otherwise the exam references the shared template.
+    The initial exam is assembled together with a parallel final form, which the final exam then uses unless
+    another blueprint is given.
+    """
+    blueprint_id = request.data.get('blueprint_id') or request.query_params.get('blueprint_id')
 
-    assessment = Assessment.objects.create(
-        name='Initial Assessment',
-        class_owner=Class.objects.get(pk=class_id),
-        type='exam',
-        question_source='previous_exam',
-        source='admin_generated',
-        time_limit=8100,
-        is_initial=True,
-    )
+    has_parallel_form = fields.get('is_final') and class_owner.exam_blueprint_id and class_owner.final_exam_form
+
+    if has_parallel_form and str(blueprint_id or class_owner.exam_blueprint_id) == str(class_owner.exam_blueprint_id):
+        exam, _ = create_assessment_with_questions(
+            class_owner.final_exam_form,
+            class_owner=class_owner,
+            time_limit=class_owner.exam_blueprint.time_limit,
+            **fields
+        )
+        return exam
 
-    questions = Question.objects.filter(pk__in=question_ids)
+    if blueprint_id:
+        blueprint = get_object_or_404(ExamBlueprint, id=blueprint_id)
+        forms = assemble_for_class(blueprint, class_owner.id, forms=2 if fields.get('is_initial') else 1)
 
-    selected_categories = []
-    for question in questions:
-        if question.category not in selected_categories:
-            selected_categories.append(question.category)
+        with transaction.atomic():
+            exam, _ = create_assessment_with_questions(
+                forms[0],
+                class_owner=class_owner,
+                time_limit=blueprint.time_limit,
+                **fields
+            )
 
-    assessment.selected_categories.set(selected_categories)
-    assessment.questions.set(questions)
+            if fields.get('is_initial'):
+                class_owner.exam_blueprint = blueprint
+                class_owner.final_exam_form = forms[1]
+                class_owner.save(update_fields=['exam_blueprint', 'final_exam_form'])
 
-    return Response({"message": "Assessment created"}, status=status.HTTP_201_CREATED)
+        return exam
+
+    return create_exam_from_template(template_name, class_owner=class_owner, **fields)
 
 
 @api_view(['GET'])
 @auth_required("teacher")
-def create_final_assessment(request, class_id):
-    file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "question_ids.txt")
+def create_initial_assessment(request, class_id):
+    if Assessment.objects.filter(class_owner__id=class_id, is_initial=True).exists():
+        return Response({'error': 'Initial Assessment already exists'}, status=status.HTTP_400_BAD_REQUEST)
+
     try:
-        with open(file_path, "r") as file:
-            question_ids = [line.strip() for line in file if line.strip()]
+        _create_exam(
+            request,
+            get_object_or_404(Class, pk=class_id),
+            INITIAL_EXAM_TEMPLATE,
+            name='Initial Assessment',
+            type='exam',
+            question_source='previous_exam',
+            source='admin_generated',
+            is_initial=True,
+        )
     except FileNotFoundError:
         return Response({'error': 'Question ID file not found'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    if Assessment.objects.filter(class_owner__id=class_id, is_final=True).exists():
-        return Response({'error': 'Final Assessment already exists'}, status=status.HTTP_400_BAD_REQUEST)
-
-    assessment = Assessment.objects.create(
-        name='Final Assessment',
-        class_owner=Class.objects.get(pk=class_id),
-        type='exam',
-        question_source='previous_exam',
-        source='admin_generated',
-        time_limit=8100,
-        is_final=True,
-    )
+    return Response({"message": "Assessment created"}, status=status.HTTP_201_CREATED)
 
-    questions = Question.objects.filter(pk__in=question_ids)
 
-    selected_categories = []
-    for question in questions:
-        if question.category not in selected_categories:
-            selected_categories.append(question.category)
+@api_view(['GET'])
+@auth_required("teacher")
+def create_final_assessment(request, class_id):
+    if Assessment.objects.filter(class_owner__id=class_id, is_final=True).exists():
+        return Response({'error': 'Final Assessment already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
-    assessment.selected_categories.set(selected_categories)
-    assessment.questions.set(questions)
+    try:
+        _create_exam(
+            request,
+            get_object_or_404(Class, pk=class_id),
+            FINAL_EXAM_TEMPLATE,
+            name='Final Assessment',
+            type='exam',
+            question_source='previous_exam',
+            source='admin_generated',
+            is_final=True,
+        )
+    except FileNotFoundError:
+        return Response({'error': 'Question ID file not found'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     return Response({"message": "Final Assessment created"}, status=status.HTTP_201_CREATED)
 
@@ -93,35 +128,20 @@ def create_class(request):
 
     new_class = Class.objects.create(name=class_name, teacher=user)
 
-    file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "question_ids.txt")
     try:
-        with open(file_path, "r") as file:
-            question_ids = [line.strip() for line in file if line.strip()]
+        _create_exam(
+            request,
+            new_class,
+            INITIAL_EXAM_TEMPLATE,
+            name='Initial Assessment',
+            type='exam',
+            question_source='previous_exam',
+            source='admin_generated',
+            is_initial=True,
+        )
     except FileNotFoundError:
         return Response({'error': 'Question ID file not found'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    if Assessment.objects.filter(class_owner=new_class, is_initial=True).exists():
-        return Response({'error': 'Initial Assessment already exists'}, status=status.HTTP_400_BAD_REQUEST)
-
-    assessment = Assessment.objects.create(
-        name='Initial Assessment',
-        class_owner=new_class,
-        type='exam',
-        question_source='previous_exam',
-        source='admin_generated',
-        time_limit=8100,
-        is_initial=True,
-    )
-
-    questions = Question.objects.filter(pk__in=question_ids)
-
-    selected_categories = []
-    for question in questions:
-        if question.category not in selected_categories:
-            selected_categories.append(question.category)
-
-    assessment.selected_categories.set(selected_categories)
-    assessment.questions.set(questions)
     return Response(
         {"message": "Class created successfully", "class_id": new_class.id, "class_code": new_class.class_code},
         status=201)
@@ -202,6 +222,9 @@ def open_initial_exam(request, class_id):
     exam.deadline = deadline
     exam.save()
 
+    # The whole class opens the exam at once, so serialize its questions before the first request arrives
+    build_exam_payload(exam.id)
+
     return Response({'message': 'Initial Exam is Opened'}, status=status.HTTP_200_OK)
 
 
@@ -222,7 +245,7 @@ def get_student_data(request, student_id):
             'assessment_id': assessment.id,
             'type': assessment.type,
             'score': assessment_result.score,
-            'total_items': assessment.questions.count(),
+            'total_items': assessment.get_questions().count(),
             'time_taken': assessment_result.time_taken,
             'date_taken': assessment.created_at,
             'categories': [category.name for category in assessment.selected_categories.all()]
@@ -262,22 +285,16 @@ def create_assessment(request, class_id):
     if not question_source:
         return Response({'error': 'Question source not provided'}, status=status.HTTP_400_BAD_REQUEST)
 
-    assessment = Assessment.objects.create(
-        name=request.data.get('name'),
-        class_owner=class_obj
-    )
-
     if question_source == "previous_exam":
-
-        selected_questions = list(Question.objects.filter(id__in=questions))
-        selected_categories = {q.category.id for q in selected_questions}
-        assessment.selected_categories.set(selected_categories)
-        assessment.questions.set(selected_questions)
-        assessment.deadline = parse_datetime(request.data.get('deadline')) if request.data.get('deadline') else None
-        assessment.no_of_questions = request.data.get('no_of_questions')
-        assessment.type = assessment_type
-        assessment.source = "teacher_generated"
-        assessment.save()
+        create_assessment_with_questions(
+            questions or [],
+            name=request.data.get('name'),
+            class_owner=class_obj,
+            deadline=parse_datetime(request.data.get('deadline')) if request.data.get('deadline') else None,
+            type=assessment_type,
+            source="teacher_generated",
+        )
+        invalidate_class_assessments(class_obj.id)
 
     elif question_source == "mixed":
         return Response({'message': 'AI-generated questions feature has not been implemented yet.'},
@@ -307,7 +324,7 @@ def get_class_assessments(request, class_id):
             "name": assessment.name,
             "type": assessment.type,
             "question_source": assessment.question_source,
-            "number_of_questions": assessment.questions.count(),
+            "number_of_questions": assessment.get_questions().count(),
             "created_at": assessment.created_at,
             "deadline": assessment.deadline,
             "categories": list(assessment.selected_categories.values_list('name', flat=True))
@@ -322,13 +339,13 @@ def get_class_assessments(request, class_id):
 @auth_required("teacher")
 def get_assessment_data(request, assessment_id):
     assessment = get_object_or_404(
-        Assessment.objects.prefetch_related("questions"),
+        Assessment,
         id=assessment_id,
         is_active=True
     )
 
     questions_data = list(
-        assessment.questions.values("id", "question_text", "choices", "correct_answer")
+        assessment.get_questions().values("id", "question_text", "choices", "correct_answer")
     )
 
     response_data = {
@@ -337,8 +354,9 @@ def get_assessment_data(request, assessment_id):
         "type": assessment.type,
         "question_source": assessment.question_source,
         "source": assessment.source,
-        "no_of_items": assessment.questions.count(),
+        "no_of_items": len(questions_data),
         "questions": questions_data,
+        "template_id": assessment.template_id,
     }
 
     if assessment.deadline is not None:
@@ -347,11 +365,6 @@ def get_assessment_data(request, assessment_id):
     return Response(response_data, status=status.HTTP_200_OK)
 
 
-import time
-from django.db import connection
-from django.db import reset_queries
-
-
 @api_view(['GET'])
 @auth_required("teacher")
 def get_assessment_results_students(request, assessment_id):
@@ -361,7 +374,6 @@ def get_assessment_results_students(request, assessment_id):
         is_active=True
     )
 
-    section_start = time.time()
     students = User.objects.filter(
         enrolled_class=assessment.class_owner
     ).select_related('enrolled_class')
@@ -394,7 +406,7 @@ def get_assessment_results_students(request, assessment_id):
                 "correct": stat['correct'],
                 "wrong": stat['wrong'],
                 "blank": stat['blank'],
-                "skipped": assessment.questions.count() - stat['total_answers'],
+                "skipped": assessment.get_questions().count() - stat['total_answers'],
             })
             total_score += stat['score']
             students_with_results += 1
@@ -421,7 +433,7 @@ def get_assessment_results_students(request, assessment_id):
 @auth_required("teacher")
 def get_assessment_results_questions(request, assessment_id):
     assessment = get_object_or_404(
-        Assessment.objects.prefetch_related('questions'),
+        Assessment,
         id=assessment_id,
         is_active=True
     )
@@ -450,7 +462,7 @@ def get_assessment_results_questions(request, assessment_id):
 
     questions_data = []
     count = 1
-    for question in assessment.questions.all():
+    for question in assessment.get_questions():
         count += 1
 
         # Get stats for all students
@@ -519,6 +531,34 @@ def get_assessment_results_questions(request, assessment_id):
     }, status=status.HTTP_200_OK)
 
 
+async def _live_progress_events(assessment_id, student_ids):
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+
+    loop = asyncio.get_running_loop()
+    stream_end = loop.time() + STREAM_MAX_DURATION
+
+    while loop.time() < stream_end:
+        progress = await sync_to_async(get_live_progress)(assessment_id, student_ids)
+        yield format_event('progress', {'total_students': len(student_ids), **progress})
+        await asyncio.sleep(STREAM_TICK_INTERVAL)
+
+
+@api_view(['GET'])
+@asgi_required
+@auth_required("teacher")
+def stream_assessment_progress(request, assessment_id):
+    """
+    Server-Sent Events with live progress on an open assessment: how many students started, how many
+    questions each has answered and how many submitted. Fed from the autosave path, not the results tables.
+    """
+    assessment = get_object_or_404(Assessment, id=assessment_id, is_active=True)
+    student_ids = list(
+        User.objects.filter(enrolled_class_id=assessment.class_owner_id, role='student').values_list('id', flat=True)
+    )
+
+    return event_stream_response(_live_progress_events(assessment.id, student_ids))
+
+
 @api_view(['POST'])
 @auth_required("teacher")
 def update_assessment(request, assessment_id):
@@ -527,9 +567,9 @@ def update_assessment(request, assessment_id):
     questions = request.data.get("questions", [])
 
     if "deadline" in request.data:
-        print("Deadline", request.data["deadline"])
         assessment.deadline = parse_datetime(request.data["deadline"]) if request.data["deadline"] else None
         assessment.save(update_fields=["deadline"])
+        reschedule_sessions(assessment)
 
     question_ids = [q["id"] for q in questions]
     existing_questions = {q.id: q for q in Question.objects.filter(id__in=question_ids)}
@@ -545,6 +585,13 @@ def update_assessment(request, assessment_id):
 
     if updated_questions:
         Question.objects.bulk_update(updated_questions, ["question_text", "choices", "correct_answer"])
+        # Edited questions may be shared with other assessments, so every key that uses them is stale
+        invalidate_question_answer_keys([question.id for question in updated_questions])
+
+    invalidate_class_assessments(assessment.class_owner_id)
+
+    if assessment.deadline and (assessment.is_initial or assessment.is_final):
+        build_exam_payload(assessment.id)
 
     return Response({"message": "Quiz was successfully updated"}, status=status.HTTP_200_OK)
 
@@ -558,53 +605,55 @@ def delete_assessment(request, assessment_id):
     )
     assessment.is_active = False
     assessment.save(update_fields=["is_active"])
+    invalidate_class_assessments(assessment.class_owner_id)
     return Response({"success": "Assessment deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['GET'])
 @auth_required("teacher")
 def get_lessons(request):
-    lessons_data = list(Lesson.objects.values("id", "name"))
+    lessons_data = [{"id": lesson["id"], "name": lesson["name"]} for lesson in content_cache.get_lessons()]
     return Response(lessons_data, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 @auth_required("teacher")
 def get_lesson(request, lesson_id):
-    lesson = get_object_or_404(
-        Lesson.objects.prefetch_related("chapters__sections"),
-        id=lesson_id
-    )
+    lesson = content_cache.get_lesson_tree(lesson_id)
+
+    if lesson is None:
+        return Response({'error': 'Lesson not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if lesson.is_locked:
+    if lesson["is_locked"]:
         return Response(
             {'error': 'Lesson is currently locked. Please wait till the teacher opens it'},
             status=status.HTTP_403_FORBIDDEN
         )
 
-    has_completed_assessment = AssessmentResult.objects.filter(assessment__lesson=lesson).exists()
+    has_completed_assessment = AssessmentResult.objects.filter(assessment__lesson_id=lesson_id).exists()
 
     lesson_structure = [
         {
-            "id": chapter.id,
-            "chapter_number": chapter.number,
-            "chapter_name": chapter.name,
-            "is_main_chapter": chapter.is_main_chapter,
-            "is_locked": chapter.is_locked,
+            "id": chapter["id"],
+            "chapter_number": chapter["number"],
+            "chapter_name": chapter["name"],
+            "is_main_chapter": chapter["is_main_chapter"],
+            "is_locked": chapter["is_locked"],
             "structure": (
                     [
                         {
-                            "section_id": section.id,
-                            "section_number": section.number,
-                            "section_name": section.name,
+                            "section_id": section["id"],
+                            "section_number": section["number"],
+                            "section_name": section["name"],
                         }
-                        for section in chapter.sections.all()
+                        for section in chapter["sections"]
                     ] + (
-                        [{"type": "quiz", "title": f"Quiz for {chapter.name}"}] if chapter.is_main_chapter else []
+                        [{"type": "quiz", "title": f"Quiz for {chapter['name']}"}]
+                        if chapter["is_main_chapter"] else []
                     )
-            ) if not chapter.is_locked else None
+            ) if not chapter["is_locked"] else None
         }
-        for chapter in lesson.chapters.all()
+        for chapter in lesson["chapters"]
     ]
 
     lesson_structure.append({
@@ -614,8 +663,8 @@ def get_lesson(request, lesson_id):
     })
 
     return Response({
-        "id": lesson.id,
-        "lesson_name": lesson.name,
+        "id": lesson["id"],
+        "lesson_name": lesson["name"],
         "structure": lesson_structure,
     }, status=status.HTTP_200_OK)
 
@@ -623,58 +672,94 @@ def get_lesson(request, lesson_id):
 @api_view(['GET'])
 @auth_required("teacher")
 def get_chapter(request, lesson_id, chapter_id):
-    chapter = get_object_or_404(
-        Chapter.objects.prefetch_related("sections"), id=chapter_id
-    )
+    chapter = content_cache.get_chapter_content(chapter_id)
 
-    if chapter.is_locked:
+    if chapter is None:
+        return Response({'error': 'Chapter not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if chapter["is_locked"]:
         return Response(
             {'error': 'Chapter is currently locked. Please wait till the teacher opens it'},
             status=status.HTTP_403_FORBIDDEN
         )
 
     chapter_data = {
-        "id": chapter.id,
-        "chapter_number": chapter.number,
-        "chapter_name": chapter.name,
+        "id": chapter["id"],
+        "chapter_number": chapter["number"],
+        "chapter_name": chapter["name"],
         "sections": [
             {
-                "id": section.id,
-                "number": section.number,
-                "title": section.name,
-                "content": section.content,
+                "id": section["id"],
+                "number": section["number"],
+                "title": section["name"],
+                "content": section["content"],
             }
-            for section in chapter.sections.all()
+            for section in chapter["sections"]
         ]
     }
 
     return Response(chapter_data, status=status.HTTP_200_OK)
 
 
-@api_view(['GET'])
-@auth_required("teacher")
-def get_lesson_quiz_data(request, class_id, lesson_id):
-    students = User.objects.filter(enrolled_class_id=class_id)
-    lesson = get_object_or_404(Lesson, id=lesson_id)
-    assessments = Assessment.objects.filter(lesson=lesson, class_owner__id=class_id, is_active=True)
-    assessment_results = AssessmentResult.objects.filter(assessment__in=assessments, user__in=students).select_related(
-        "assessment")
-    assessment_results_lookup = {ar.user_id: ar for ar in assessment_results}
+QUIZ_ROLLUP_MODES = ('best', 'latest', 'average')
+
+
+def _quiz_rollup(results, group_field, mode):
+    """
+    Roll quiz attempts up to one percentage per (group, student) in a single query.
+
+    ``group_field`` is the lookup the attempts are grouped by (e.g. ``assessment__lesson_id``) and ``mode``
+    picks the best attempt, the latest attempt, or the average over all attempts.
+    """
+    question_count = Subquery(
+        Assessment.questions.through.objects.filter(assessment_id=OuterRef('assessment_id'))
+        .values('assessment_id')
+        .annotate(total=Count('question_id'))
+        .values('total'),
+        output_field=IntegerField()
+    )
+
+    results = results.annotate(
+        group_id=F(group_field),
+        question_count=question_count,
+    ).annotate(
+        score_pct=Coalesce(
+            ExpressionWrapper(F('score') * 100.0 / NullIf(F('question_count'), 0), output_field=FloatField()),
+            Value(0.0),
+        )
+    )
+
+    if mode == 'latest':
+        partition = [F('group_id'), F('user_id')]
+        rows = results.annotate(
+            position=Window(RowNumber(), partition_by=partition, order_by=[F('start_time').desc(), F('id').desc()]),
+            attempts=Window(Count('id'), partition_by=partition),
+            percentage=F('score_pct'),
+        ).filter(position=1).values('group_id', 'user_id', 'percentage', 'attempts')
+    else:
+        aggregate = Max if mode == 'best' else Avg
+        rows = results.values('group_id', 'user_id').annotate(
+            percentage=aggregate('score_pct'),
+            attempts=Count('id'),
+        )
+
+    return {(row['group_id'], row['user_id']): row for row in rows}
 
+
+def _quiz_summary(students, rollup, group_id):
     students_data = []
     total_score = 0
-    student_count = students.count()
 
     for student in students:
-        assessment_result = assessment_results_lookup.get(student.id)
+        row = rollup.get((group_id, student.id))
 
-        if assessment_result:
-            question_count = assessment_result.assessment.questions.count()
-            score_pct = (assessment_result.score / question_count) * 100 if question_count else 0
+        if row:
+            score_pct = row['percentage'] or 0
             students_data.append({
                 "student_id": student.id,
                 "student_name": student.full_name,
                 "taken": True,
+                "attempts": row['attempts'],
                 "score_percentage": round(score_pct, 2)
             })
             total_score += score_pct
@@ -685,59 +770,118 @@ def get_lesson_quiz_data(request, class_id, lesson_id):
                 "taken": False,
             })
 
-    average_score = total_score / student_count if student_count > 0 else 0
+    average_score = total_score / len(students) if students else 0
+
+    return round(average_score, 2), students_data
+
+
+@api_view(['GET'])
+@auth_required("teacher")
+@rollup_mode_required(QUIZ_ROLLUP_MODES)
+def get_lesson_quiz_data(request, class_id, lesson_id, mode):
+    lesson = get_object_or_404(Lesson, id=lesson_id)
+    students = list(User.objects.filter(enrolled_class_id=class_id).only("id", "first_name", "last_name"))
+    assessment_results = AssessmentResult.objects.filter(
+        assessment__lesson=lesson,
+        assessment__class_owner__id=class_id,
+        assessment__is_active=True,
+        user__enrolled_class_id=class_id
+    )
+
+    rollup = _quiz_rollup(assessment_results, 'assessment__lesson_id', mode)
+    average_score, students_data = _quiz_summary(students, rollup, lesson.id)
 
     return Response({
         "lesson_id": lesson_id,
         "lesson_name": lesson.name,
-        "average_percentage": round(average_score, 2),
+        "mode": mode,
+        "average_percentage": average_score,
         "students_data": students_data,
     }, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 @auth_required("teacher")
-def get_chapter_quiz(request, class_id, chapter_id):
+@rollup_mode_required(QUIZ_ROLLUP_MODES)
+def get_chapter_quiz(request, class_id, chapter_id, mode):
     chapter = get_object_or_404(Chapter.objects.select_related("lesson"), id=chapter_id)
-    students = User.objects.filter(enrolled_class_id=class_id)
-    assessments = Assessment.objects.filter(chapter=chapter, class_owner_id=class_id)
-    assessment_results = AssessmentResult.objects.filter(assessment__in=assessments, user__in=students).select_related(
-        "assessment")
-    assessment_results_lookup = {ar.user_id: ar for ar in assessment_results}
+    students = list(User.objects.filter(enrolled_class_id=class_id).only("id", "first_name", "last_name"))
+    assessment_results = AssessmentResult.objects.filter(
+        assessment__chapter=chapter,
+        assessment__class_owner_id=class_id,
+        user__enrolled_class_id=class_id
+    )
 
-    students_data = []
-    total_score = 0
-    student_count = students.count()
+    rollup = _quiz_rollup(assessment_results, 'assessment__chapter_id', mode)
+    average_score, students_data = _quiz_summary(students, rollup, chapter.id)
 
-    for student in students:
-        assessment_result = assessment_results_lookup.get(student.id)
+    return Response({
+        "chapter_id": chapter.id,
+        "chapter_name": chapter.name,
+        "lesson_name": chapter.lesson.name,
+        "mode": mode,
+        "average_percentage": average_score,
+        "students_data": students_data,
+    }, status=status.HTTP_200_OK)
 
-        if assessment_result:
-            question_count = assessment_result.assessment.questions.count()
-            score_pct = (assessment_result.score / question_count) * 100 if question_count else 0
 
-            students_data.append({
-                "student_id": student.id,
-                "student_name": student.full_name,
-                "taken": True,
-                "score_percentage": round(score_pct, 2)
-            })
-            total_score += score_pct
-        else:
-            students_data.append({
-                "student_id": student.id,
-                "student_name": student.full_name,
-                "taken": False,
+@api_view(['GET'])
+@auth_required("teacher")
+@rollup_mode_required(QUIZ_ROLLUP_MODES)
+def get_class_quiz_results(request, class_id, mode):
+    class_obj = get_object_or_404(Class, id=class_id)
+    students = list(User.objects.filter(enrolled_class=class_obj).only("id", "first_name", "last_name"))
+    lessons = Lesson.objects.prefetch_related(
+        Prefetch("chapters", queryset=Chapter.objects.filter(is_main_chapter=True))
+    ).order_by("id")
+
+    lesson_rollup = _quiz_rollup(
+        AssessmentResult.objects.filter(
+            assessment__lesson__isnull=False,
+            assessment__class_owner=class_obj,
+            assessment__is_active=True,
+            user__enrolled_class=class_obj
+        ),
+        'assessment__lesson_id',
+        mode
+    )
+    chapter_rollup = _quiz_rollup(
+        AssessmentResult.objects.filter(
+            assessment__chapter__isnull=False,
+            assessment__class_owner=class_obj,
+            user__enrolled_class=class_obj
+        ),
+        'assessment__chapter_id',
+        mode
+    )
+
+    lessons_data = []
+    for lesson in lessons:
+        average_score, students_data = _quiz_summary(students, lesson_rollup, lesson.id)
+
+        chapters_data = []
+        for chapter in lesson.chapters.all():
+            chapter_average, chapter_students = _quiz_summary(students, chapter_rollup, chapter.id)
+            chapters_data.append({
+                "chapter_id": chapter.id,
+                "chapter_name": chapter.name,
+                "average_percentage": chapter_average,
+                "students_data": chapter_students,
             })
 
-    average_score = total_score / student_count if student_count > 0 else 0
+        lessons_data.append({
+            "lesson_id": lesson.id,
+            "lesson_name": lesson.name,
+            "average_percentage": average_score,
+            "students_data": students_data,
+            "chapters": chapters_data,
+        })
 
     return Response({
-        "chapter_id": chapter.id,
-        "chapter_name": chapter.name,
-        "lesson_name": chapter.lesson.name,
-        "average_percentage": round(average_score, 2),
-        "students_data": students_data,
+        "class_id": class_obj.id,
+        "class_name": class_obj.name,
+        "mode": mode,
+        "lessons": lessons_data,
     }, status=status.HTTP_200_OK)
 
 
@@ -745,12 +889,9 @@ def get_chapter_quiz(request, class_id, chapter_id):
 @auth_required("teacher")
 def estimate_ability_students(request, class_id):
     students = User.objects.filter(enrolled_class__id=class_id)
-    count = 1
     response_data = []
-    for student in students:
-        print("Estimating Ability of ", student.full_name)
-        print("Count: ", count)
-        count += 1
+    for count, student in enumerate(students, start=1):
+        logger.debug('Estimating ability of student %s (%s of class %s)', student.id, count, class_id)
 
         assessment = Assessment.objects.filter(class_owner_id=class_id, is_initial=True).first()
         if AssessmentResult.objects.filter(assessment=assessment, user=student).exists():